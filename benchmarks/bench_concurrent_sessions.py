@@ -0,0 +1,130 @@
+"""
+Concurrent chat sessions served by a single worker's event loop.
+
+Runs N sessions at once through ConversationService.process_message, each with
+one turn, against a fake LLM that takes --delay seconds per call (a turn makes two
+calls: extraction and reply). Two modes:
+    async    - the LLM is awaited (ainvoke), as the chat pipeline does now
+    blocking - the LLM call blocks the event loop, as the former invoke() did
+
+With the LLM awaited the wall time stays near one turn's latency however many
+sessions run; blocking calls serialize them, so it grows with every session.
+Language detection is stubbed, embeddings come from the offline hashing provider
+and no index is loaded, so the LLM dominates.
+
+Usage:
+    python benchmarks/bench_concurrent_sessions.py [--sessions 200] [--blocking-sessions 5] [--delay 2.0]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from langchain_core.language_models.llms import LLM
+
+MESSAGE = "Hola, mi pedido ABC123 no ha llegado todavía"
+
+
+class SlowFakeLLM(LLM):
+    """Fake LLM answering after a fixed delay: JSON to extraction prompts, a short reply otherwise."""
+
+    delay: float = 2.0
+    blocking: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        if "Respond with valid JSON" in prompt:
+            return '{"order_id": "ABC123", "category": "shipping"}'
+        return "Siento el retraso, reviso el estado de tu pedido ABC123."
+
+    def _call(self, prompt: str, stop: Optional[List[str]]=None, run_manager: Any=None, **kwargs: Any) -> str:
+        time.sleep(self.delay)
+        return self._answer(prompt)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]]=None, run_manager: Any=None, **kwargs: Any) -> str:
+        if self.blocking:
+            time.sleep(self.delay)
+        else:
+            await asyncio.sleep(self.delay)
+        return self._answer(prompt)
+
+
+async def run_sessions(service, sessions: int, label: str) -> dict:
+    """Run one turn of `sessions` sessions concurrently and time each of them."""
+    from beans.schemas.conversations.chat_request_dto import ChatRequest
+
+    async def turn(number: int) -> float:
+        start = time.perf_counter()
+        await service.process_message(ChatRequest(session_id=f"{label}-{number:05d}", message=MESSAGE))
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies = sorted(await asyncio.gather(*(turn(number) for number in range(sessions))))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": label,
+        "sessions": sessions,
+        "seconds": round(elapsed, 2),
+        "turns_per_second": round(sessions / elapsed, 2),
+        "p50": round(statistics.median(latencies), 2),
+        "p99": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2)
+    }
+
+
+async def language_stub(text: str) -> dict:
+    """Offline stand-in for the translator-based language detection."""
+    return {"texto_original": text, "idioma_detectado": "es", "texto_traducido": text, "confianza": 1}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--blocking-sessions", type=int, default=5,
+                        help="Sessions of the blocking run, which takes about 2 * delay seconds each")
+    parser.add_argument("--delay", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        from config.settings import settings
+        settings.embeddings_provider = "hashing"
+        settings.vectorstore_path = str(Path(tmp) / "vectorstore")
+        settings.conversation_storage_path = str(Path(tmp) / "conversations")
+
+        llm = SlowFakeLLM(delay=args.delay)
+        with patch("llm.models.get_llm", return_value=llm), \
+                patch("services.conversation.get_language_data", language_stub):
+            from services.conversation import ConversationService
+            service = ConversationService()
+
+            results = []
+            for label, sessions, blocking in (("async", args.sessions, False),
+                                              ("blocking", args.blocking_sessions, True)):
+                if sessions <= 0:
+                    continue
+                llm.blocking = blocking
+                results.append(asyncio.run(run_sessions(service, sessions, label)))
+
+    print(f"LLM delay: {args.delay}s per call, 2 calls per turn")
+    print(f"{'mode':>9} {'sessions':>9} {'seconds':>8} {'turns/s':>8} {'p50 s':>7} {'p99 s':>7}")
+    for result in results:
+        print(f"{result['mode']:>9} {result['sessions']:>9} {result['seconds']:>8} "
+              f"{result['turns_per_second']:>8} {result['p50']:>7} {result['p99']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Recall@k against exact (flat) search and per-query latency for each FAISS index type.
+
+Vectors are synthetic and clustered so that approximate indexes behave like they do on
+real embeddings. Index parameters come from settings (.env) unless overridden here.
+
+Usage:
+    python benchmarks/bench_index_types.py [--vectors 100000] [--dim 768] [--queries 500] [--k 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config.settings import settings  # noqa: E402
+from rag.index_factory import resolve_index_config, build_index  # noqa: E402
+
+INDEX_TYPES = ["flat", "ivf_flat", "ivf_pq", "hnsw"]
+
+
+def clustered_vectors(count: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Gaussian blobs around random centres, L2-normalized like most text embeddings."""
+    centres = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    vectors = centres[labels] + 0.35 * rng.standard_normal((count, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--types", nargs="+", default=INDEX_TYPES, choices=INDEX_TYPES)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = clustered_vectors(args.vectors + args.queries, args.dim, clusters=200, rng=rng)
+    corpus, queries = data[:args.vectors], data[args.vectors:]
+    train = corpus[rng.choice(len(corpus), size=min(len(corpus), settings.vectorstore_train_sample_size), replace=False)]
+
+    ground_truth = None
+    print(f"vectors: {args.vectors}, dim: {args.dim}, queries: {args.queries}, k: {args.k}")
+    print(f"{'type':>9} {'factory':>16} {'build s':>8} {f'recall@{args.k}':>9} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for index_type in ["flat"] + [t for t in args.types if t != "flat"]:
+        settings.vectorstore_index_type = index_type
+        config = resolve_index_config(args.dim, len(train))
+
+        start = time.perf_counter()
+        index = build_index(config, train)
+        index.add(corpus)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        results = np.empty((len(queries), args.k), dtype=np.int64)
+        for i, query in enumerate(queries):
+            start = time.perf_counter()
+            _, ids = index.search(query.reshape(1, -1), args.k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            results[i] = ids[0]
+
+        if ground_truth is None:
+            ground_truth = results
+        recall = np.mean([len(set(found) & set(truth)) / args.k for found, truth in zip(results, ground_truth)])
+
+        if index_type in args.types:
+            print(f"{index_type:>9} {config.factory_string():>16} {build_seconds:>8.2f} {recall:>9.3f} "
+                  f"{np.percentile(latencies, 50):>8.3f} {np.percentile(latencies, 99):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Peak memory of knowledge base ingestion for synthetic KBs of growing size.
+
+Each size runs in its own subprocess so peak RSS (ru_maxrss) is not shared between
+runs. Embeddings come from the offline hashing provider, so no network or model
+download is needed.
+
+Usage:
+    python benchmarks/bench_ingest_memory.py [--sizes 1000 10000 100000] [--dim 1536]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+PARAGRAPH = (
+    "Los pedidos se envian en 24-48 horas laborables. Si tu pedido no ha llegado, "
+    "revisa el numero de seguimiento en tu cuenta o contacta con soporte. "
+)
+
+
+def make_kb(kb_dir: Path, files: int) -> None:
+    """Write `files` markdown files of a few chunks each."""
+    for i in range(files):
+        sub_dir = kb_dir / f"section_{i // 1000:03d}"
+        sub_dir.mkdir(parents=True, exist_ok=True)
+        (sub_dir / f"article_{i:06d}.md").write_text(
+            f"# Article {i}\n\n" + f"Reference {i}. " + PARAGRAPH * 8,
+            encoding="utf-8"
+        )
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_one(files: int, dim: int) -> dict:
+    """Ingest a synthetic KB of `files` files in this process and report peak RSS."""
+    sys.path.insert(0, str(SRC_DIR))
+    from llm.hashing_embeddings import HashingEmbeddings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kb_dir = Path(tmp) / "kb"
+        make_kb(kb_dir, files)
+        baseline = peak_rss_mb()
+
+        from config.settings import settings
+        from rag.ingest import ingest_knowledge_base
+        from rag.store import VectorStoreManager
+
+        settings.vectorstore_path = str(Path(tmp) / "vectorstore")
+        manager = VectorStoreManager()
+
+        start = time.perf_counter()
+        with patch("rag.ingest.get_embeddings", return_value=HashingEmbeddings(dim=dim)), \
+                patch("rag.ingest.get_vector_store_manager", return_value=manager):
+            stats = ingest_knowledge_base(str(kb_dir), full_rebuild=True)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "files": files,
+            "chunks": stats.chunks_added,
+            "seconds": round(elapsed, 2),
+            "baseline_rss_mb": round(baseline, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1)
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child, args.dim)))
+        return
+
+    print(f"{'files':>8} {'chunks':>8} {'seconds':>8} {'baseline MB':>12} {'peak MB':>8}")
+    for size in args.sizes:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", str(size), "--dim", str(args.dim)],
+            capture_output=True, text=True, check=True, env={**os.environ, "PYTHONUNBUFFERED": "1"}
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{result['files']:>8} {result['chunks']:>8} {result['seconds']:>8} "
+              f"{result['baseline_rss_mb']:>12} {result['peak_rss_mb']:>8}")
+
+
+if __name__ == "__main__":
+    main()
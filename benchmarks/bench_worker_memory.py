@@ -0,0 +1,125 @@
+"""
+Per-worker memory of the resident vectorstore for each way of loading it:
+    writable - index and every chunk in memory (what ingestion loads)
+    read     - index in memory, chunk texts read from disk per hit
+    mmap     - index memory-mapped, chunk texts read from disk per hit
+
+Builds a synthetic index once, then starts N worker processes (like the uvicorn
+workers in MAIN.py) that each load it, run some searches and report, while all
+are alive:
+    load - seconds to load the vectorstore
+    RSS - resident pages, counting shared page-cache pages in every worker
+    PSS - shared pages divided between the processes mapping them
+    USS - pages private to the worker (what each extra worker really costs)
+
+Linux only (reads /proc/self/smaps_rollup).
+
+Usage:
+    python benchmarks/bench_worker_memory.py [--chunks 100000] [--dim 1536] [--workers 4]
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+CHUNK_TEXT = "Los pedidos se envian en 24-48 horas laborables. Consulta el seguimiento en tu cuenta. " * 10
+
+
+def memory_mb() -> dict:
+    """RSS, PSS and USS of this process in MB."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                values[key] = int(rest.split()[0]) / 1024
+    return {
+        "rss": round(values["Rss"], 1),
+        "pss": round(values["Pss"], 1),
+        "uss": round(values["Private_Clean"] + values["Private_Dirty"], 1)
+    }
+
+
+def build_index(store_path: str, chunks: int, dim: int) -> None:
+    """Save a synthetic flat index with `chunks` chunks."""
+    import numpy as np
+    from config.settings import settings
+    from rag.index_factory import create_empty_vectorstore
+    from rag.store import VectorStoreManager
+
+    settings.vectorstore_path = store_path
+    settings.vectorstore_index_type = "flat"
+    vectors = np.random.default_rng(0).random((chunks, dim), dtype=np.float32)
+    vectorstore, _ = create_empty_vectorstore(Mock(), vectors[:1])
+    for start in range(0, chunks, 10000):
+        batch = range(start, min(chunks, start + 10000))
+        vectorstore.add_embeddings(
+            [(f"{i} {CHUNK_TEXT}", vectors[i].tolist()) for i in batch],
+            metadatas=[{"source": f"article_{i}.md"} for i in batch],
+            ids=[f"chunk-{i:08d}" for i in batch]
+        )
+    VectorStoreManager().save_vectorstore(vectorstore)
+
+
+def worker(store_path: str, mode: str, dim: int, barrier, results) -> None:
+    """Load the index like a server worker, search, and report memory once all workers are up."""
+    import numpy as np
+    from config.settings import settings
+    from rag.store import VectorStoreManager
+
+    settings.vectorstore_path = store_path
+    settings.vectorstore_mmap = mode == "mmap"
+    before = memory_mb()
+    start = time.perf_counter()
+    vectorstore = VectorStoreManager().load_vectorstore(Mock(), writable=mode == "writable")
+    load_seconds = time.perf_counter() - start
+
+    queries = np.random.default_rng(1).random((50, dim), dtype=np.float32)
+    for query in queries:
+        vectorstore.similarity_search_by_vector(query.tolist(), k=5)
+
+    barrier.wait()
+    results.put({"before": before, "after": memory_mb(), "load_seconds": load_seconds})
+    barrier.wait()
+
+
+def run(store_path: str, mode: str, workers: int, dim: int) -> list:
+    """Start the workers and collect their reports."""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(store_path, mode, dim, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return reports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as store_path:
+        build_index(store_path, args.chunks, args.dim)
+        print(f"chunks: {args.chunks}, dim: {args.dim}, workers: {args.workers}")
+        print(f"{'mode':>8} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} {'load s':>8}  (per worker, after load minus before)")
+
+        for mode in ("writable", "read", "mmap"):
+            reports = run(store_path, mode, args.workers, args.dim)
+            deltas = {key: [r["after"][key] - r["before"][key] for r in reports] for key in ("rss", "pss", "uss")}
+            load_seconds = sum(r["load_seconds"] for r in reports) / len(reports)
+            print(f"{mode:>8} " + " ".join(f"{sum(v) / len(v):>8.1f}" for v in deltas.values()) + f" {load_seconds:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import Optional
+from pydantic import BaseModel, field_validator
+from utils.validators import validate_index_name
+
+
+class IndexRollbackRequest(BaseModel):
+    """Request to serve a previous version of an index."""
+    index_name: Optional[str] = None
+    version: Optional[str] = None
+
+    @field_validator("index_name")
+    @classmethod
+    def validate_index_name_format(cls, v: Optional[str]) -> Optional[str]:
+        """Validate index name format."""
+        if v is None:
+            return v
+
+        is_valid, error = validate_index_name(v)
+        if not is_valid:
+            raise ValueError(error)
+
+        return v
@@ -0,0 +1,14 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class IndexVersionsResponse(BaseModel):
+    """Saved versions of an index."""
+    index_name: str
+    current: Optional[str] = None
+    versions: List[str] = []
@@ -3,9 +3,26 @@ Created on 6 nov 2025
 
 @author: chispas
 '''
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, field_validator
+from utils.validators import validate_index_name
 
 
 class IngestRequest(BaseModel):
     """Request to trigger ingestion."""
     kb_path: str = None
+    full_rebuild: bool = False
+    index_name: Optional[str] = None
+
+    @field_validator("index_name")
+    @classmethod
+    def validate_index_name_format(cls, v: Optional[str]) -> Optional[str]:
+        """Validate index name format."""
+        if v is None:
+            return v
+
+        is_valid, error = validate_index_name(v)
+        if not is_valid:
+            raise ValueError(error)
+
+        return v
@@ -3,10 +3,14 @@ Created on 6 nov 2025
 
 @author: chispas
 '''
+from typing import Optional
 from pydantic import BaseModel
+from beans.schemas.ingest.ingest_stats_dto import IngestStats
 
 
 class IngestResponse(BaseModel):
     """Ingestion response."""
     status: str
     message: str
+    stats: Optional[IngestStats] = None
+    job_id: Optional[str] = None
@@ -6,6 +6,7 @@ Created on 6 nov 2025
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 from config.settings import settings
+from utils.validators import validate_index_name
 
 
 class ChatRequest(BaseModel):
@@ -15,6 +16,7 @@ class ChatRequest(BaseModel):
     message: str = Field(..., description="User message", min_length=1)
     language: Optional[str] = Field(None, description="Optional language hint")
     audio_response: bool = Field(False, description="If sound response is needed")
+    index_name: Optional[str] = Field(None, description="Knowledge base index to search, the default one if omitted")
 
     @field_validator("message")
     @classmethod
@@ -33,3 +35,16 @@ class ChatRequest(BaseModel):
             raise ValueError("Session ID must be at least 3 characters")
 
         return v.strip()
+
+    @field_validator("index_name")
+    @classmethod
+    def validate_index_name_format(cls, v: Optional[str]) -> Optional[str]:
+        """Validate index name format."""
+        if v is None:
+            return v
+
+        is_valid, error = validate_index_name(v)
+        if not is_valid:
+            raise ValueError(error)
+
+        return v
@@ -19,3 +19,4 @@ class ConversationTurn(BaseModel):
     sentiment: schemas_litrerals.Sentiment = Field(..., description="Detected sentiment")
     sentiment_polarity_value: float = Field(..., description="Detected sentiment value")
     extracted_delta: extracted_data_dto.ExtractedData = Field(..., description="New data extracted this turn")
+    rag_context_tokens: int = Field(0, description="Knowledge base tokens injected into the prompt")
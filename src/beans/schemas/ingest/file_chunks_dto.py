@@ -0,0 +1,17 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import Optional
+from pydantic import BaseModel, Field
+from langchain_core.documents.base import Document
+
+
+class FileChunks(BaseModel):
+    """Result of loading and splitting one KB file."""
+
+    source: str = Field(..., description="KB-relative path of the file")
+    file_hash: Optional[str] = Field(None, description="SHA-256 of the file content")
+    chunks: Optional[list[Document]] = Field(None, description="Chunks, None when the file is unchanged or failed")
+    error: Optional[str] = Field(None, description="Error message if the file could not be processed")
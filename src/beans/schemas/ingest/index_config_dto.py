@@ -0,0 +1,33 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import Literal
+from pydantic import BaseModel, Field
+
+
+class IndexConfig(BaseModel):
+    """FAISS index type and parameters, saved next to the index."""
+
+    requested_type: Literal["flat", "ivf_flat", "ivf_pq", "hnsw"] = Field(..., description="Index type configured in settings")
+    index_type: Literal["flat", "ivf_flat", "ivf_pq", "hnsw"] = Field(..., description="Index type actually built")
+    dim: int = Field(..., description="Vector dimension")
+    nlist: int = Field(0, description="IVF inverted lists")
+    nprobe: int = Field(0, description="IVF lists visited per query")
+    pq_m: int = Field(0, description="PQ sub-quantizers")
+    pq_nbits: int = Field(0, description="Bits per PQ code")
+    hnsw_m: int = Field(0, description="HNSW neighbours per node")
+    ef_construction: int = Field(0, description="HNSW candidate list size while building")
+    ef_search: int = Field(0, description="HNSW candidate list size while searching")
+    trained_on: int = Field(0, description="Vectors used to train the index")
+
+    def factory_string(self) -> str:
+        """Get the faiss.index_factory description of this index."""
+        if self.index_type == "ivf_flat":
+            return f"IVF{self.nlist},Flat"
+        if self.index_type == "ivf_pq":
+            return f"IVF{self.nlist},PQ{self.pq_m}x{self.pq_nbits}"
+        if self.index_type == "hnsw":
+            return f"HNSW{self.hnsw_m},Flat"
+        return "Flat"
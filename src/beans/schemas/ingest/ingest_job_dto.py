@@ -0,0 +1,27 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+from beans.schemas.ingest.ingest_progress_dto import IngestProgress
+from beans.schemas.ingest.ingest_stats_dto import IngestStats
+
+
+class IngestJob(BaseModel):
+    """Background knowledge base ingestion job."""
+
+    job_id: str = Field(..., description="Job identifier")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field("queued", description="Job status")
+    kb_path: Optional[str] = Field(None, description="Knowledge base directory requested")
+    index_name: Optional[str] = Field(None, description="Index built or updated, the default one if None")
+    full_rebuild: bool = Field(False, description="Whether the index is rebuilt from scratch")
+    created_at: str = Field(..., description="ISO timestamp the job was submitted")
+    started_at: Optional[str] = Field(None, description="ISO timestamp the ingestion started")
+    finished_at: Optional[str] = Field(None, description="ISO timestamp the ingestion ended")
+    progress: IngestProgress = Field(default_factory=IngestProgress, description="Live progress")
+    chunks_per_second: float = Field(0.0, description="Embedding throughput so far")
+    eta_seconds: Optional[float] = Field(None, description="Estimated seconds until embedding finishes")
+    stats: Optional[IngestStats] = Field(None, description="Outcome, once succeeded")
+    error: Optional[str] = Field(None, description="Failure reason, once failed")
@@ -0,0 +1,42 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from pydantic import BaseModel, Field
+
+
+class ManifestFileEntry(BaseModel):
+    """Content hash and chunk ids of one ingested KB file."""
+
+    file_hash: str = Field(..., description="SHA-256 of the file content")
+    chunk_ids: list[str] = Field(default_factory=list, description="Ids of the chunks indexed for this file")
+    duplicate_of: dict[str, str] = Field(
+        default_factory=dict,
+        description="Ids of the chunks dropped as near-duplicates, mapped to the indexed chunk they duplicate"
+    )
+
+
+class IngestManifest(BaseModel):
+    """Manifest saved next to the FAISS index describing what it contains."""
+
+    embeddings_provider: str = Field(..., description="Embeddings provider used to build the index")
+    embeddings_model: str = Field(..., description="Embeddings model used to build the index")
+    chunking_mode: str = Field("recursive", description="Splitter used: recursive or markdown")
+    chunk_size: int = Field(..., description="Chunk size used when splitting, in characters or tokens in markdown mode")
+    chunk_overlap: int = Field(..., description="Chunk overlap used when splitting, in characters or tokens in markdown mode")
+    files: dict[str, ManifestFileEntry] = Field(default_factory=dict, description="Entries by KB-relative path")
+
+    def chunk_ids(self) -> set[str]:
+        """Get the ids of every chunk in the index."""
+        return {chunk_id for entry in self.files.values() for chunk_id in entry.chunk_ids}
+
+    def is_compatible(self, other: "IngestManifest") -> bool:
+        """Check whether vectors built under `other` can be reused under this manifest."""
+        return (
+            self.embeddings_provider == other.embeddings_provider
+            and self.embeddings_model == other.embeddings_model
+            and self.chunking_mode == other.chunking_mode
+            and self.chunk_size == other.chunk_size
+            and self.chunk_overlap == other.chunk_overlap
+        )
@@ -0,0 +1,17 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import Literal
+from pydantic import BaseModel, Field
+
+
+class IngestProgress(BaseModel):
+    """Live progress of a running ingestion."""
+
+    stage: Literal["listing", "embedding", "saving", "done"] = Field("listing", description="Current ingestion stage")
+    files_total: int = Field(0, description="KB files to process")
+    files_done: int = Field(0, description="KB files loaded and split so far")
+    chunks_queued: int = Field(0, description="New chunks found so far, waiting for or done embedding")
+    chunks_embedded: int = Field(0, description="New chunks embedded so far")
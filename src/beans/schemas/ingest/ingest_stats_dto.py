@@ -0,0 +1,23 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class IngestStats(BaseModel):
+    """Outcome of a knowledge base ingestion."""
+
+    full_rebuild: bool = Field(False, description="Whether the index was rebuilt from scratch")
+    files_total: int = Field(0, description="KB files found")
+    files_changed: int = Field(0, description="New or modified KB files")
+    files_failed: int = Field(0, description="KB files that could not be read or split")
+    chunks_added: int = Field(0, description="Chunks embedded and added to the index")
+    chunks_removed: int = Field(0, description="Chunks deleted from the index")
+    chunks_unchanged: int = Field(0, description="Chunks kept without re-embedding")
+    chunks_duplicate: int = Field(0, description="New chunks dropped as near-duplicates before embedding")
+    version: Optional[str] = Field(None, description="Index version saved, None if the index was left as it was")
+    language_partitions: list[str] = Field(default_factory=list, description="Languages whose partition index was rebuilt")
+    stage_seconds: dict[str, float] = Field(default_factory=dict, description="Elapsed seconds by ingestion stage")
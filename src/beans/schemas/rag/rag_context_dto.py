@@ -0,0 +1,28 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class RagContext(BaseModel):
+    """Knowledge base context selected for one prompt."""
+
+    retrieval: Literal["vector", "lexical", "hybrid"] = Field("vector", description="Rankings the chunks were selected from")
+    language: Optional[str] = Field(None, description="Language partition searched, None for the whole index")
+    chunks: list[str] = Field(default_factory=list, description="Chunk texts injected into the prompt, best first")
+    scores: list[float] = Field(
+        default_factory=list,
+        description="Ranking score of each injected chunk: cosine similarity, lexical coverage or fused RRF score"
+    )
+    tokens: int = Field(0, description="Tokens of the injected chunks")
+    candidates: int = Field(0, description="Chunks returned by the similarity search")
+    below_threshold: int = Field(0, description="Candidates dropped for scoring below the relevance threshold")
+    over_budget: int = Field(0, description="Relevant candidates dropped to stay within the token budget")
+
+    @property
+    def text(self) -> str:
+        """Injected chunks joined for the prompt."""
+        return "\n\n".join(self.chunks)
@@ -11,3 +11,4 @@ class HealthResponse(BaseModel):
 
     status: str = Field("ok", description="Service status")
     version: str = Field(..., description="API version")
+    ready: bool = Field(True, description="Whether this worker finished its warm-up")
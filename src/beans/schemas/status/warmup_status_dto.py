@@ -0,0 +1,17 @@
+'''
+Created on 6 nov 2025
+
+@author: chispas
+'''
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class WarmupStatus(BaseModel):
+    """Progress of the warm-up a worker runs before accepting traffic."""
+
+    status: Literal["pending", "warming", "ready"] = Field("pending", description="Warm-up state")
+    stage: Optional[str] = Field(None, description="Stage running, while warming")
+    stage_seconds: dict[str, float] = Field(default_factory=dict, description="Elapsed seconds by warm-up stage")
+    failed_stages: list[str] = Field(default_factory=list, description="Stages that failed; the worker serves them cold")
+    total_seconds: float = Field(0.0, description="Elapsed seconds of the whole warm-up")
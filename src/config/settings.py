@@ -42,18 +42,98 @@ class Settings(BaseSettings):
     kb_path: str = Field(default="../kb")
 
     # Embeddings
-    embeddings_provider: Literal["openai", "huggingface"] = "openai"
+    embeddings_provider: Literal["openai", "huggingface", "hashing"] = "openai"
     embeddings_model: str = "text-embedding-3-large"
 
+    # Hashing embeddings (offline and deterministic, for benchmarks and CI; embeddings_model is ignored)
+    hashing_embeddings_dim: int = 1024
+    hashing_embeddings_word_ngrams: int = 2
+    hashing_embeddings_char_ngrams: int = 3
+
+    # Embedding Cache (persistent, shared by ingestion and queries)
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = "./data/embedding_cache"
+    embedding_cache_max_entries: int = 200000
+
     # Vector Store
     vectorstore_path: str = "./data/vectorstore"
     vectorstore_index_name: str = "faiss_index"
+    vectorstore_mmap: bool = True
+    # Named indexes kept loaded per process (LRU), by count and by size of their files (0 = no size limit)
+    vectorstore_max_loaded_indexes: int = 8
+    vectorstore_max_loaded_mb: int = 2048
+    # Saved versions kept per index for rollback, the current one included
+    vectorstore_keep_versions: int = 3
+
+    # Vector Index Type (flat = exact search; IVF/HNSW trade recall for speed and memory)
+    vectorstore_index_type: Literal["flat", "ivf_flat", "ivf_pq", "hnsw"] = "flat"
+    vectorstore_ivf_nlist: int = 256
+    vectorstore_ivf_nprobe: int = 16
+    vectorstore_pq_m: int = 64
+    vectorstore_pq_nbits: int = 8
+    vectorstore_hnsw_m: int = 32
+    vectorstore_hnsw_ef_construction: int = 80
+    vectorstore_hnsw_ef_search: int = 64
+    vectorstore_train_sample_size: int = 16384
 
     # RAG Configuration
     rag_top_k: int = 5
-    rag_score_threshold: float = 0.7
+    # Minimum cosine similarity for a chunk to be injected (embeddings are unit length)
+    rag_score_threshold: float = 0.4
+    rag_context_max_tokens: int = 1500
+
+    # Retrieval mode (vector = embeddings only; hybrid = BM25 fast path, fused with vectors when not confident)
+    rag_retrieval_mode: Literal["vector", "hybrid"] = "hybrid"
+    rag_lexical_min_coverage: float = 0.9
+    rag_lexical_min_margin: float = 1.5
+    # Query terms (stopwords excluded) BM25 coverage needs to override the score threshold, unless one is an id
+    rag_lexical_min_terms: int = 2
+    rag_rrf_k: int = 60
+
+    # Search the partition of the question's language first (built at ingestion), then the whole index
+    rag_language_routing: bool = True
+
+    # Threads running FAISS/BM25 searches for async retrieval, per worker
+    rag_search_workers: int = 4
+
+    # Contextual compression of get_retriever(use_compression=True): extractive keeps the sentences
+    # most similar to the query within rag_compression_max_tokens, llm makes one LLM call per document
+    rag_compression_mode: Literal["extractive", "llm"] = "extractive"
+    rag_compression_max_tokens: int = 500
+    rag_compression_min_similarity: float = 0.2
+
+    # Chunking: recursive (chunk_size/chunk_overlap in characters) or markdown (one header
+    # section per chunk, small sibling sections packed up to chunk_max_tokens tokens)
+    chunking_mode: Literal["recursive", "markdown"] = "recursive"
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    chunk_max_tokens: int = 300
+    # Overlap between the pieces of a markdown section longer than chunk_max_tokens
+    chunk_overlap_tokens: int = 0
+
+    # Ingestion loading/splitting (process pool, 0 or 1 = in-process)
+    ingest_parallel_workers: int = 0
+
+    # Ingestion embedding (batched, concurrent, rate limited; 0 tokens/min = unlimited)
+    ingest_embed_batch_size: int = 64
+    ingest_embed_workers: int = 4
+    ingest_tokens_per_minute: int = 0
+    ingest_embed_max_retries: int = 3
+    ingest_inflight_batches: int = 8
+
+    # New chunks whose word shingles overlap an earlier chunk this much (MinHash Jaccard) are not embedded, 0 disables
+    ingest_dedup_threshold: float = 0.9
+    ingest_dedup_num_perm: int = 64
+    ingest_jobs_path: str = "./data/ingest_jobs"
+
+    # Query Embedding Cache (in-process LRU with TTL, 0 disables)
+    query_embedding_cache_size: int = 1024
+    query_embedding_cache_ttl_seconds: int = 3600
+
+    # Semantic Answer Cache (replies reused for similar questions, size 0 disables)
+    answer_cache_size: int = 512
+    answer_cache_ttl_seconds: int = 3600
+    answer_cache_threshold: float = 0.95
 
     # Conversation
     max_conversation_turns: int = 50
@@ -76,11 +156,20 @@ class Settings(BaseSettings):
     stt_enabled: bool = False
     stt_provider: str = "none"
 
+    # Warm-up before accepting traffic (GET /api/health/ready is 503 until it finishes)
+    warmup_enabled: bool = True
+    # Synthetic turn through language detection, extraction, retrieval and reply. Costs a translation,
+    # an embedding and two paid LLM calls per worker start (4 workers, 4 turns per deploy), so off by default
+    warmup_dry_request: bool = False
+    warmup_message: str = "Hola, ¿cuánto tarda en llegar mi pedido?"
+    # Named indexes loaded besides the default one, comma separated
+    warmup_index_names: str = ""
+
     # Languages
     default_language: str = "es"
     supported_languages: str = "es,en"
 
-    @field_validator("vectorstore_path", "conversation_storage_path")
+    @field_validator("vectorstore_path", "conversation_storage_path", "embedding_cache_path", "ingest_jobs_path")
     @classmethod
     def create_directories(cls, v: str) -> str:
         """Ensure directories exist."""
@@ -93,6 +182,11 @@ class Settings(BaseSettings):
         """Get list of supported languages."""
         return [lang.strip() for lang in self.supported_languages.split(",")]
 
+    @property
+    def warmup_index_names_list(self) -> List[str]:
+        """Get list of named indexes to load at warm-up."""
+        return [name.strip() for name in self.warmup_index_names.split(",") if name.strip()]
+
     def validate_api_keys(self) -> None:
         """Validate that required API keys are set based on provider."""
         if self.llm_provider == "openai" and not self.openai_api_key:
@@ -1,7 +1,7 @@
 """
 LangChain chains for RAG, extraction, and summarization.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import json
 
 from langchain_classic.chains.conversational_retrieval.base import ConversationalRetrievalChain
@@ -9,6 +9,9 @@ from langchain_core.prompts.prompt import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from llm import models, prompts
 
+# Reply sent when the LLM call fails
+RESPONSE_FALLBACK = "I apologize, but I'm having trouble processing your request. Please try again."
+
 
 class ChainManager:
     """Manages different LangChain chains for various tasks."""
@@ -40,6 +43,24 @@ class ChainManager:
 
         return chain
 
+    def _extraction_chain(self):
+        """Build the extraction chain."""
+        prompt_template = prompts.get_extraction_prompt_template()
+        # Use modern RunnableSequence with | operator
+        return prompt_template | self.llm | StrOutputParser()
+
+    @staticmethod
+    def _parse_extraction(result: str) -> Dict[str, Any]:
+        """Parse the JSON answered by the extraction chain, {} if it is not valid JSON."""
+        try:
+            extracted = json.loads(result.replace('```json', '').replace('```', '').strip())
+        except json.JSONDecodeError as e:
+            print(f"Failed to parse extraction JSON, error: {str(e)}, response: {result}")
+            return {}
+
+        print(f"Successfully extracted structured info, fields: {list(extracted.keys())}")
+        return extracted
+
     def extract_structured_info(
         self,
         message: str,
@@ -51,32 +72,60 @@ class ChainManager:
         Args:
             message: User message
             history: Conversation history
-            language: Language code
 
         Returns:
             Dictionary with extracted fields
         """
-
-        prompt_template = prompts.get_extraction_prompt_template()
-        # Use modern RunnableSequence with | operator
-        chain = prompt_template | self.llm | StrOutputParser()
-
         try:
-            result = chain.invoke({'message': message, 'history': history})
+            result = self._extraction_chain().invoke({'message': message, 'history': history})
+            return self._parse_extraction(result)
+        except Exception as e:
+            print(f"Extraction failed, error: {str(e)}")
+            return {}
 
-            # Parse JSON response
-            extracted = json.loads(result.replace('```json', '').replace('```', '').strip())
+    async def aextract_structured_info(
+        self,
+        message: str,
+        history: str
+    ) -> Dict[str, Any]:
+        """
+        Extract structured information from message without blocking the event loop.
 
-            print(f"Successfully extracted structured info, fields: {list(extracted.keys())}")
-            return extracted
+        Args:
+            message: User message
+            history: Conversation history
 
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse extraction JSON, error: {str(e)}, response: {result}")
-            return {}
+        Returns:
+            Dictionary with extracted fields
+        """
+        try:
+            result = await self._extraction_chain().ainvoke({'message': message, 'history': history})
+            return self._parse_extraction(result)
         except Exception as e:
             print(f"Extraction failed, error: {str(e)}")
             return {}
 
+    def _summary_chain(self, extracted_data: Dict[str, Any], language: str) -> Tuple[Any, Dict[str, Any]]:
+        """Build the summary chain and its inputs, less the conversation."""
+        print(f"Generating conversation summary, language: {language}")
+
+        summary_prompt = prompts.get_summary_prompt(language)
+
+        prompt_template = PromptTemplate(
+            template=summary_prompt,
+            input_variables=["conversation", "order_id", "category", "description", "urgency"]
+        )
+
+        # Use modern RunnableSequence with | operator
+        chain = prompt_template | self.llm | StrOutputParser()
+        inputs = {
+            "order_id": extracted_data.get("order_id", "N/A"),
+            "category": extracted_data.get("category", "N/A"),
+            "description": extracted_data.get("description", "N/A"),
+            "urgency": extracted_data.get("urgency", "N/A")
+        }
+        return chain, inputs
+
     def generate_summary(
         self,
         conversation: str,
@@ -94,26 +143,39 @@ class ChainManager:
         Returns:
             Summary text
         """
-        print(f"Generating conversation summary, language: {language}")
+        chain, inputs = self._summary_chain(extracted_data, language)
 
-        summary_prompt = prompts.get_summary_prompt(language)
+        try:
+            summary = chain.invoke({"conversation": conversation, **inputs})
 
-        prompt_template = PromptTemplate(
-            template=summary_prompt,
-            input_variables=["conversation", "order_id", "category", "description", "urgency"]
-        )
+            print("Successfully generated summary")
+            return summary.strip()
 
-        # Use modern RunnableSequence with | operator
-        chain = prompt_template | self.llm | StrOutputParser()
+        except Exception as e:
+            print(f"Summary generation failed, error: {str(e)}")
+            return "Error generating summary"
+
+    async def agenerate_summary(
+        self,
+        conversation: str,
+        extracted_data: Dict[str, Any],
+        language: str="es"
+    ) -> str:
+        """
+        Generate conversation summary without blocking the event loop.
+
+        Args:
+            conversation: Full conversation text
+            extracted_data: Extracted structured data
+            language: Language code
+
+        Returns:
+            Summary text
+        """
+        chain, inputs = self._summary_chain(extracted_data, language)
 
         try:
-            summary = chain.invoke({
-                "conversation": conversation,
-                "order_id": extracted_data.get("order_id", "N/A"),
-                "category": extracted_data.get("category", "N/A"),
-                "description": extracted_data.get("description", "N/A"),
-                "urgency": extracted_data.get("urgency", "N/A")
-            })
+            summary = await chain.ainvoke({"conversation": conversation, **inputs})
 
             print("Successfully generated summary")
             return summary.strip()
@@ -122,6 +184,22 @@ class ChainManager:
             print(f"Summary generation failed, error: {str(e)}")
             return "Error generating summary"
 
+    def _response_chain(self, language: str, sentiment: str):
+        """Build the reply chain for a language and sentiment."""
+        system_prompt = prompts.get_system_prompt(language)
+
+        # Adjust tone based on sentiment
+        if sentiment == "negative":
+            system_prompt += "\n\nIMPORTANT: The user seems frustrated. Be extra empathetic and helpful."
+
+        prompt_template = PromptTemplate(
+            template=f"{system_prompt}\n\nContext:\n{{context}}\n\nUser: {{message}}\n\nAssistant:",
+            input_variables=["context", "message"]
+        )
+
+        # Use modern RunnableSequence with | operator
+        return prompt_template | self.llm | StrOutputParser()
+
     def generate_response(
         self,
         message: str,
@@ -141,26 +219,42 @@ class ChainManager:
         Returns:
             Generated response
         """
-        system_prompt = prompts.get_system_prompt(language)
+        chain = self._response_chain(language, sentiment)
 
-        # Adjust tone based on sentiment
-        if sentiment == "negative":
-            system_prompt += "\n\nIMPORTANT: The user seems frustrated. Be extra empathetic and helpful."
+        try:
+            response = chain.invoke({"context": context, "message": message})
+            return response.strip()
+        except Exception as e:
+            print(f"Response generation failed, error: {str(e)}")
+            return RESPONSE_FALLBACK
 
-        prompt_template = PromptTemplate(
-            template=f"{system_prompt}\n\nContext:\n{{context}}\n\nUser: {{message}}\n\nAssistant:",
-            input_variables=["context", "message"]
-        )
+    async def agenerate_response(
+        self,
+        message: str,
+        context: str,
+        language: str="es",
+        sentiment: str="neutral"
+    ) -> str:
+        """
+        Generate contextual response without blocking the event loop.
 
-        # Use modern RunnableSequence with | operator
-        chain = prompt_template | self.llm | StrOutputParser()
+        Args:
+            message: User message
+            context: Conversation context
+            language: Language code
+            sentiment: Detected sentiment
+
+        Returns:
+            Generated response
+        """
+        chain = self._response_chain(language, sentiment)
 
         try:
-            response = chain.invoke({"context": context, "message": message})
+            response = await chain.ainvoke({"context": context, "message": message})
             return response.strip()
         except Exception as e:
             print(f"Response generation failed, error: {str(e)}")
-            return "I apologize, but I'm having trouble processing your request. Please try again."
+            return RESPONSE_FALLBACK
 
 
 # Global chain manager
@@ -0,0 +1,436 @@
+"""
+Persistent on-disk embedding cache.
+
+Vectors live in a memory-mapped float32 file with one fixed-size slot per
+entry; a SQLite key index maps sha256(text) to its slot and tracks last use
+for LRU eviction. There is one cache directory per (provider, model) pair,
+so the full key is (embeddings_provider, embeddings_model, sha256(text)).
+"""
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from config.settings import settings
+
+# Slots added to the vectors file each time it has to grow
+_GROWTH_SLOTS = 1024
+
+# Cache hits whose last use is buffered before it is written to the key index
+_USAGE_FLUSH_ENTRIES = 256
+
+
+class EmbeddingCacheStore:
+    """Memory-mapped vector slots plus a SQLite key index for one embeddings model."""
+
+    def __init__(self, cache_dir: Path, max_entries: int):
+        """
+        Initialize cache store.
+
+        Args:
+            cache_dir: Directory for this provider/model namespace
+            max_entries: Maximum number of cached vectors before LRU eviction
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, max_entries)
+        self.vectors_path = self.cache_dir / "vectors.f32"
+        self.fingerprints_path = self.cache_dir / "fingerprints.u64"
+
+        self.hits = 0
+        self.misses = 0
+        # Counters are updated from the retrieval and ingestion threads
+        self._stats_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        # Last use of the keys hit since the last write, so lookups do not commit
+        self._usage: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.cache_dir / "index.sqlite3"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+        self._conn.commit()
+
+        self._dim: Optional[int] = self._read_meta("dim")
+        self._vectors: Optional[np.memmap] = None
+        self._fingerprints: Optional[np.memmap] = None
+
+    def _read_meta(self, name: str) -> Optional[int]:
+        """Read an integer from the meta table."""
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return int(row[0]) if row else None
+
+    @staticmethod
+    def _fingerprint(key: str) -> int:
+        """Get the non-zero 63-bit fingerprint stored alongside each slot."""
+        return (int(key[:16], 16) & 0x7FFFFFFFFFFFFFFF) or 1
+
+    def _capacity(self) -> int:
+        """Number of slots currently present in the vectors file."""
+        if self._dim is None or not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self._dim * 4)
+
+    def _map(self, min_slots: int=0) -> None:
+        """(Re)map the files, growing them to at least `min_slots` slots."""
+        capacity = self._capacity()
+        if min_slots > capacity:
+            capacity = min(max(min_slots, capacity + _GROWTH_SLOTS), max(min_slots, self.max_entries))
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(capacity * self._dim * 4)
+            with open(self.fingerprints_path, "ab") as f:
+                f.truncate(capacity * 8)
+
+        if capacity == 0:
+            self._vectors = None
+            self._fingerprints = None
+            return
+
+        if self._vectors is None or self._vectors.shape[0] != capacity:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+            self._fingerprints = np.memmap(self.fingerprints_path, dtype=np.uint64, mode="r+", shape=(capacity,))
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached vectors.
+
+        Args:
+            keys: Text hashes to look up
+
+        Returns:
+            Dictionary with the vectors found, by key
+        """
+        if not keys or self._dim is None:
+            return {}
+
+        with self._lock:
+            found: Dict[str, List[float]] = {}
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                if not rows:
+                    continue
+
+                self._map()
+                if self._vectors is None:
+                    return {}
+
+                for key, slot in rows:
+                    if slot >= self._vectors.shape[0]:
+                        continue
+                    expected = self._fingerprint(key)
+                    # Slot may be rewritten by another process: check fingerprint before and after
+                    if int(self._fingerprints[slot]) != expected:
+                        continue
+                    vector = np.array(self._vectors[slot])
+                    if int(self._fingerprints[slot]) != expected:
+                        continue
+                    found[key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self._usage.update((key, now) for key in found)
+                if len(self._usage) >= _USAGE_FLUSH_ENTRIES:
+                    try:
+                        self._write_usage()
+                        self._conn.commit()
+                    except sqlite3.Error as e:
+                        self._conn.rollback()
+                        print(f"Failed to write embedding cache usage, error: {str(e)}")
+
+            return found
+
+    def _write_usage(self) -> None:
+        """Write the buffered last use of hit keys; the caller holds the lock and commits."""
+        if self._usage:
+            self._conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key, now in self._usage.items()]
+            )
+            self._usage.clear()
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """
+        Store vectors, evicting the least recently used entries when full.
+
+        Args:
+            items: Vectors to store, by key
+        """
+        if not items:
+            return
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                # Eviction below picks victims by last use, so buffered hits count
+                self._write_usage()
+
+                if self._dim is None:
+                    self._dim = self._read_meta("dim") or len(next(iter(items.values())))
+                    self._conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('dim', ?)", (self._dim,))
+
+                keys = list(items)
+                existing = set()
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    existing.update(
+                        row[0] for row in self._conn.execute(
+                            f"SELECT key FROM entries WHERE key IN ({','.join('?' * len(batch))})", batch
+                        )
+                    )
+                pending = [
+                    (key, vector) for key, vector in items.items()
+                    if key not in existing and len(vector) == self._dim
+                ][:self.max_entries]
+                if not pending:
+                    self._conn.commit()
+                    return
+
+                count, last_slot = self._conn.execute("SELECT COUNT(*), MAX(slot) FROM entries").fetchone()
+                next_slot = 0 if last_slot is None else last_slot + 1
+                free_slots = max(0, min(len(pending), self.max_entries - count))
+
+                # New slots at the end, then reuse the least recently used ones
+                slots = list(range(next_slot, next_slot + free_slots))
+                evict = len(pending) - free_slots
+                if evict > 0:
+                    victims = self._conn.execute(
+                        "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (evict,)
+                    ).fetchall()
+                    self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+                    slots.extend(slot for _, slot in victims)
+
+                self._map(max(slots) + 1)
+                now = time.time()
+                for (key, vector), slot in zip(pending, slots):
+                    self._fingerprints[slot] = 0
+                    self._vectors[slot] = np.asarray(vector, dtype=np.float32)
+                    self._fingerprints[slot] = self._fingerprint(key)
+                self._vectors.flush()
+                self._fingerprints.flush()
+
+                self._conn.executemany(
+                    "INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                    [(key, slot, now) for (key, _), slot in zip(pending, slots)]
+                )
+                self._conn.commit()
+
+            except Exception as e:
+                self._conn.rollback()
+                print(f"Failed to write embedding cache, error: {str(e)}")
+
+    def record(self, hits: int, misses: int) -> None:
+        """
+        Count cache hits and misses.
+
+        Args:
+            hits: Texts served from the cache
+            misses: Texts sent to the embeddings model
+        """
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+
+    def __len__(self) -> int:
+        """Number of cached vectors."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters for this process.
+
+        Returns:
+            Dictionary with hits, misses, hit_ratio and entries
+        """
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+            "entries": len(self)
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves repeated texts from the on-disk cache.
+    Only texts never seen before by this provider/model reach the wrapped model.
+    """
+
+    def __init__(self, embeddings: Embeddings, store: EmbeddingCacheStore):
+        """
+        Initialize cached embeddings.
+
+        Args:
+            embeddings: Underlying embeddings model
+            store: Cache store for this provider/model
+        """
+        self.embeddings = embeddings
+        self.store = store
+
+    @staticmethod
+    def _key(text: str) -> str:
+        """Get the cache key of a text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], Dict[str, str]]:
+        """
+        Look up texts in the cache and count hits and misses.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Tuple of (key per text, cached vectors by key, uncached texts by key)
+        """
+        keys = [self._key(text) for text in texts]
+        cached = self.store.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        misses = sum(1 for key in keys if key in missing)
+        self.store.record(len(texts) - misses, misses)
+        return keys, cached, missing
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, computing only the cache misses.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per text, in order
+        """
+        keys, cached, missing = self._lookup(texts)
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.store.put_many(computed)
+            cached.update(computed)
+
+        return [cached[key] for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents with the wrapped model's async client, computing only the cache misses.
+        Cache reads and writes run in a thread, so the event loop never waits for the disk.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per text, in order
+        """
+        keys, cached, missing = await asyncio.to_thread(self._lookup, texts)
+
+        if missing:
+            vectors = await self.embeddings.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            await asyncio.to_thread(self.store.put_many, computed)
+            cached.update(computed)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, served from cache when possible.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Query vector
+        """
+        keys, cached, _ = self._lookup([text])
+        if keys[0] in cached:
+            return cached[keys[0]]
+
+        vector = self.embeddings.embed_query(text)
+        self.store.put_many({keys[0]: vector})
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Embed a query with the wrapped model's async client, served from cache when possible.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Query vector
+        """
+        keys, cached, _ = await asyncio.to_thread(self._lookup, [text])
+        if keys[0] in cached:
+            return cached[keys[0]]
+
+        vector = await self.embeddings.aembed_query(text)
+        await asyncio.to_thread(self.store.put_many, {keys[0]: vector})
+        return vector
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters of the underlying store.
+
+        Returns:
+            Dictionary with hits, misses, hit_ratio and entries
+        """
+        return self.store.stats()
+
+
+# Cache stores by provider/model namespace
+_stores: Dict[str, EmbeddingCacheStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_cache_store(provider: str, model: str) -> EmbeddingCacheStore:
+    """
+    Get the shared cache store for an embeddings provider and model.
+
+    Args:
+        provider: Embeddings provider name
+        model: Embeddings model name
+
+    Returns:
+        EmbeddingCacheStore instance
+    """
+    namespace = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{provider}__{model}")
+    with _stores_lock:
+        if namespace not in _stores:
+            _stores[namespace] = EmbeddingCacheStore(
+                Path(settings.embedding_cache_path) / namespace,
+                settings.embedding_cache_max_entries
+            )
+        return _stores[namespace]
+
+
+def get_embedding_cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Get counters of every cache store opened by this process.
+
+    Returns:
+        Dictionary of stats by provider/model namespace
+    """
+    with _stores_lock:
+        stores = dict(_stores)
+    return {namespace: store.stats() for namespace, store in stores.items()}
@@ -0,0 +1,102 @@
+"""
+Offline, deterministic embeddings from feature-hashed n-grams.
+
+Each text becomes a bag of word n-grams and character n-grams, hashed into a
+fixed number of signed buckets and L2-normalized. No model, no network and the
+same vector for the same text in every process, so ingestion, FAISS search and
+the chat pipeline can be benchmarked or tested at scale on an offline box. Texts
+sharing words or word pieces get similar vectors, which also makes it a cheap
+lexical first-stage retriever.
+"""
+import re
+import zlib
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from rag.lexical import fold
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Character n-gram features are prefixed so they never hash like a word
+_CHAR_PREFIX = "#"
+
+
+class HashingEmbeddings(Embeddings):
+    """Feature-hashed bag of word and character n-grams."""
+
+    def __init__(self, dim: int=1024, word_ngrams: int=2, char_ngrams: int=3):
+        """
+        Initialize embeddings.
+
+        Args:
+            dim: Vector dimension (number of hash buckets)
+            word_ngrams: Longest word n-gram, 1 for single words only
+            char_ngrams: Length of the character n-grams taken inside words, 0 disables them
+        """
+        if dim < 1:
+            raise ValueError(f"Hashing embeddings dimension must be positive, dim: {dim}")
+        self.dim = dim
+        self.word_ngrams = max(1, word_ngrams)
+        self.char_ngrams = max(0, char_ngrams)
+
+    def _features(self, text: str) -> List[str]:
+        """Get the n-gram features of a text: case-folded, accents removed."""
+        words = _WORD.findall(fold(text))
+        features = list(words)
+
+        for n in range(2, self.word_ngrams + 1):
+            features.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+
+        if self.char_ngrams:
+            size = self.char_ngrams
+            for word in words:
+                padded = f"<{word}>"
+                features.extend(_CHAR_PREFIX + padded[i:i + size] for i in range(len(padded) - size + 1))
+
+        return features
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into an L2-normalized float32 matrix.
+        The low bits of each feature's CRC-32 pick its bucket and the top bit its sign,
+        so collisions tend to cancel out instead of piling up.
+        """
+        rows: List[int] = []
+        hashes: List[int] = []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            hashes.extend(zlib.crc32(feature.encode("utf-8")) for feature in features)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if hashes:
+            hashed = np.asarray(hashes, dtype=np.uint32)
+            signs = np.where(hashed >> 31, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix, (np.asarray(rows), hashed % self.dim), signs)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One unit-length vector per text, all zeros for texts without words
+        """
+        return self._embed(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Unit-length vector
+        """
+        return self._embed([text])[0].tolist()
@@ -9,6 +9,8 @@ from langchain.embeddings.base import Embeddings
 from config.settings import settings
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain_community.llms.ollama import Ollama
+from llm.embedding_cache import CachedEmbeddings, get_embedding_cache_store
+from llm.hashing_embeddings import HashingEmbeddings
 
 
 def get_llm(temperature: Optional[float]=None, max_tokens: Optional[int]=None) -> BaseLanguageModel:
@@ -64,6 +66,39 @@ def get_llm(temperature: Optional[float]=None, max_tokens: Optional[int]=None) -
 def get_embeddings() -> Embeddings:
     """
     Get embeddings model based on configuration.
+    Wrapped with the persistent embedding cache when enabled, except for hashing
+    embeddings, which are cheaper to compute than to look up.
+
+    Returns:
+        LangChain embeddings instance
+    """
+    embeddings = _create_embeddings()
+
+    if not settings.embedding_cache_enabled or settings.embeddings_provider == "hashing":
+        return embeddings
+
+    store = get_embedding_cache_store(settings.embeddings_provider, settings.embeddings_model)
+    return CachedEmbeddings(embeddings, store)
+
+
+def get_embeddings_model_name() -> str:
+    """
+    Get the name of the configured embeddings model as recorded in ingestion manifests.
+    Hashing embeddings are named after their parameters, since vectors built with
+    different ones are not comparable.
+
+    Returns:
+        Embeddings model name
+    """
+    if settings.embeddings_provider == "hashing":
+        return (f"hashing-d{settings.hashing_embeddings_dim}-w{settings.hashing_embeddings_word_ngrams}"
+                f"-c{settings.hashing_embeddings_char_ngrams}")
+    return settings.embeddings_model
+
+
+def _create_embeddings() -> Embeddings:
+    """
+    Create the provider embeddings model based on configuration.
 
     Returns:
         LangChain embeddings instance
@@ -84,6 +119,14 @@ def get_embeddings() -> Embeddings:
                 encode_kwargs={'normalize_embeddings': True}
             )
 
+        elif settings.embeddings_provider == "hashing":
+            print(f"Initializing hashing embeddings, dim: {settings.hashing_embeddings_dim}")
+            return HashingEmbeddings(
+                dim=settings.hashing_embeddings_dim,
+                word_ngrams=settings.hashing_embeddings_word_ngrams,
+                char_ngrams=settings.hashing_embeddings_char_ngrams
+            )
+
         else:
             raise ValueError(f"Unsupported embeddings provider: {settings.embeddings_provider}")
 
@@ -0,0 +1,210 @@
+"""
+Semantic cache of chat replies for FAQ-style questions.
+
+Replies are indexed by query embedding in exact inner-product FAISS indexes, one per
+scope (knowledge base index, language, the exact set of fields still to collect).
+Only session-agnostic replies belong here: the caller must not store replies built
+from a conversation history or from extracted values, since any session asking a
+similar question gets them.
+A question close enough to a cached one gets the stored reply without retrieval or
+an LLM call. Entries expire after a TTL, the least recently used are evicted beyond
+the size limit, and an index's entries are dropped when the version it serves changes
+(a new ingestion or a rollback), not when it is merely reloaded.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import faiss
+import numpy as np
+from config.settings import settings
+from rag.store import get_vector_store_manager
+
+# (index_name, language, sorted missing fields)
+Scope = Tuple[str, str, Tuple[str, ...]]
+
+
+class AnswerCache:
+    """Bounded semantic cache of replies with per-entry time to live."""
+
+    def __init__(self, threshold: float, max_size: int, ttl_seconds: float):
+        """
+        Initialize cache.
+
+        Args:
+            threshold: Minimum cosine similarity between questions to reuse a reply
+            max_size: Maximum number of entries, 0 disables the cache
+            ttl_seconds: Seconds an entry stays valid, 0 means no expiry
+        """
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._indexes: Dict[Scope, faiss.IndexIDMap2] = {}
+        # Entry id -> (scope, stored_at, reply), least recently used first
+        self._entries: "OrderedDict[int, Tuple[Scope, float, str]]" = OrderedDict()
+        self._next_id = 0
+        # Version of each KB index the cached replies were generated with
+        self._versions: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _as_query(embedding: List[float]) -> np.ndarray:
+        vector = np.array([embedding], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _sync_version(self, index_name: Optional[str]) -> str:
+        """
+        Drop the entries of a KB index if the version it serves changed since they were stored.
+
+        Returns:
+            Resolved index name
+        """
+        store_manager = get_vector_store_manager()
+        name = index_name or store_manager.index_name
+        version = store_manager.served_version(name)
+
+        if name not in self._versions or self._versions[name] != version:
+            stale = [entry_id for entry_id, (scope, _, _) in self._entries.items() if scope[0] == name]
+            if stale:
+                self.invalidations += 1
+                print(f"Answer cache invalidated, index_name: {name}, entries: {len(stale)}, version: {version}")
+            for entry_id in stale:
+                self._remove(entry_id)
+            self._versions[name] = version
+
+        return name
+
+    @staticmethod
+    def _scope(name: str, language: str, missing_fields: Iterable[str]) -> Scope:
+        return name, language, tuple(sorted(set(missing_fields)))
+
+    def _remove(self, entry_id: int) -> None:
+        scope, _, _ = self._entries.pop(entry_id)
+        self._indexes[scope].remove_ids(np.array([entry_id], dtype=np.int64))
+
+    def lookup(
+        self,
+        embedding: List[float],
+        language: str,
+        missing_fields: Iterable[str],
+        index_name: Optional[str]=None
+    ) -> Optional[str]:
+        """
+        Get the reply cached for a similar question in the same scope.
+
+        Args:
+            embedding: Query embedding of the user message
+            language: Detected language
+            missing_fields: Required fields the session still has to collect; the reply asks for them
+            index_name: KB index the reply was generated from, defaults to settings.vectorstore_index_name
+
+        Returns:
+            Cached reply or None if no similar, unexpired question is cached
+        """
+        if self.max_size <= 0:
+            return None
+
+        with self._lock:
+            name = self._sync_version(index_name)
+
+            index = self._indexes.get(self._scope(name, language, missing_fields))
+            if index is not None and index.ntotal:
+                similarities, ids = index.search(self._as_query(embedding), 1)
+                entry_id = int(ids[0][0])
+                if entry_id >= 0 and similarities[0][0] >= self.threshold:
+                    _, stored_at, reply = self._entries[entry_id]
+                    if not self.ttl_seconds or time.monotonic() - stored_at < self.ttl_seconds:
+                        self._entries.move_to_end(entry_id)
+                        self.hits += 1
+                        return reply
+                    self._remove(entry_id)
+
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        embedding: List[float],
+        language: str,
+        missing_fields: Iterable[str],
+        reply: str,
+        index_name: Optional[str]=None
+    ) -> None:
+        """
+        Cache a reply, evicting the least recently used entries when full.
+
+        Args:
+            embedding: Query embedding of the user message
+            language: Detected language
+            missing_fields: Required fields the session still has to collect; the reply asks for them
+            reply: Generated reply
+            index_name: KB index the reply was generated from, defaults to settings.vectorstore_index_name
+        """
+        if self.max_size <= 0:
+            return
+
+        vector = self._as_query(embedding)
+        with self._lock:
+            name = self._sync_version(index_name)
+
+            scope = self._scope(name, language, missing_fields)
+            index = self._indexes.get(scope)
+            if index is None:
+                index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+                self._indexes[scope] = index
+
+            entry_id = self._next_id
+            self._next_id += 1
+            index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = (scope, time.monotonic(), reply)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._indexes.clear()
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit_ratio, size, evictions and invalidations
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+# Global answer cache
+_answer_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get global answer cache instance."""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = AnswerCache(
+            threshold=settings.answer_cache_threshold,
+            max_size=settings.answer_cache_size,
+            ttl_seconds=settings.answer_cache_ttl_seconds
+        )
+    return _answer_cache
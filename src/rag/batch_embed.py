@@ -0,0 +1,192 @@
+"""
+Batched, concurrent embedding of chunks during ingestion.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+from config.settings import settings
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate used for rate limiting (about 4 characters per token).
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated number of tokens
+    """
+    return len(text) // 4 + 1
+
+
+class TokenBudget:
+    """Token bucket enforcing a tokens-per-minute budget across threads."""
+
+    def __init__(self, tokens_per_minute: int):
+        """
+        Initialize token budget.
+
+        Args:
+            tokens_per_minute: Tokens allowed per minute, 0 disables the limit
+        """
+        self.tokens_per_minute = tokens_per_minute
+        self._available = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        """
+        Block until `tokens` can be spent without exceeding the budget.
+
+        Args:
+            tokens: Tokens about to be sent
+        """
+        if self.tokens_per_minute <= 0:
+            return
+
+        # A single request larger than the whole budget waits for a full bucket
+        tokens = min(tokens, self.tokens_per_minute)
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.tokens_per_minute / 60.0
+                self._available = min(float(self.tokens_per_minute), self._available + refill)
+                self._updated = now
+
+                if self._available >= tokens:
+                    self._available -= tokens
+                    return
+
+                wait = (tokens - self._available) * 60.0 / self.tokens_per_minute
+
+            time.sleep(wait)
+
+
+def iter_embedded_batches(
+    batches: Iterable[Tuple[List[str], Any]],
+    embeddings: Embeddings,
+    max_workers: Optional[int]=None,
+    max_inflight: Optional[int]=None,
+    tokens_per_minute: Optional[int]=None,
+    max_retries: Optional[int]=None,
+    retry_backoff_seconds: float=1.0
+) -> Iterator[Tuple[Any, List[List[float]]]]:
+    """
+    Embed batches concurrently through a bounded thread pool, yielding them in input order.
+    At most `max_inflight` batches are pulled from `batches` and held at any time, so a
+    lazy input keeps memory bounded. Each failed batch is retried on its own with
+    exponential backoff.
+
+    Args:
+        batches: Iterable of (texts, payload) pairs; the payload is passed through untouched
+        embeddings: Embeddings model
+        max_workers: Maximum concurrent requests
+        max_inflight: Maximum batches submitted but not yet yielded
+        tokens_per_minute: Token budget, 0 for unlimited
+        max_retries: Retries per failed batch
+        retry_backoff_seconds: Delay before the first retry, doubled on each attempt
+
+    Yields:
+        (payload, vectors) for each batch, in input order
+
+    Raises:
+        RuntimeError: If a batch still fails after all retries
+    """
+    max_workers = max(1, max_workers or settings.ingest_embed_workers)
+    max_inflight = max(max_workers, max_inflight or settings.ingest_inflight_batches)
+    max_retries = settings.ingest_embed_max_retries if max_retries is None else max_retries
+    budget = TokenBudget(settings.ingest_tokens_per_minute if tokens_per_minute is None else tokens_per_minute)
+
+    def embed_batch(batch_number: int, batch: List[str]) -> List[List[float]]:
+        tokens = sum(estimate_tokens(text) for text in batch)
+
+        for attempt in range(max_retries + 1):
+            budget.acquire(tokens)
+            try:
+                vectors = embeddings.embed_documents(batch)
+                if len(vectors) != len(batch):
+                    raise ValueError(f"expected {len(batch)} vectors, got {len(vectors)}")
+                return vectors
+            except TypeError:
+                # Programming error, not a transient provider failure
+                raise
+            except Exception as e:
+                if attempt == max_retries:
+                    raise RuntimeError(f"Embedding batch {batch_number} failed after {attempt + 1} attempts: {str(e)}") from e
+                print(f"Embedding batch failed, retrying, batch: {batch_number}, attempt: {attempt + 1}, error: {str(e)}")
+                time.sleep(retry_backoff_seconds * (2 ** attempt))
+
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embed")
+    pending = deque()
+    try:
+        for batch_number, (texts, payload) in enumerate(batches):
+            pending.append((payload, executor.submit(embed_batch, batch_number, texts)))
+            if len(pending) >= max_inflight:
+                payload, future = pending.popleft()
+                yield payload, future.result()
+
+        while pending:
+            payload, future = pending.popleft()
+            yield payload, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def embed_texts_batched(
+    texts: List[str],
+    embeddings: Embeddings,
+    batch_size: Optional[int]=None,
+    max_workers: Optional[int]=None,
+    tokens_per_minute: Optional[int]=None,
+    max_retries: Optional[int]=None,
+    retry_backoff_seconds: float=1.0
+) -> List[List[float]]:
+    """
+    Embed texts in batches dispatched concurrently through a bounded thread pool.
+    Each failed batch is retried on its own with exponential backoff; vectors are
+    returned in the same order as `texts`.
+
+    Args:
+        texts: Texts to embed
+        embeddings: Embeddings model
+        batch_size: Texts per embedding request
+        max_workers: Maximum concurrent requests
+        tokens_per_minute: Token budget, 0 for unlimited
+        max_retries: Retries per failed batch
+        retry_backoff_seconds: Delay before the first retry, doubled on each attempt
+
+    Returns:
+        One vector per text
+
+    Raises:
+        RuntimeError: If a batch still fails after all retries
+    """
+    batch_size = max(1, batch_size or settings.ingest_embed_batch_size)
+    batches = [(texts[start:start + batch_size], None) for start in range(0, len(texts), batch_size)]
+    if not batches:
+        return []
+
+    print(f"Embedding chunks in batches, chunks: {len(texts)}, batches: {len(batches)}")
+
+    vectors: List[List[float]] = []
+    for _, batch_vectors in iter_embedded_batches(
+        batches,
+        embeddings,
+        max_workers=max_workers,
+        max_inflight=len(batches),
+        tokens_per_minute=tokens_per_minute,
+        max_retries=max_retries,
+        retry_backoff_seconds=retry_backoff_seconds
+    ):
+        vectors.extend(batch_vectors)
+
+    return vectors
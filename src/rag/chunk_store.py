@@ -0,0 +1,162 @@
+"""
+Memory-mappable chunk store saved next to the FAISS index.
+
+Chunk records live in one file addressed by an offsets array, so a process only
+pages in the chunks it actually returns and the OS page cache holds a single copy
+shared by every worker.
+"""
+import json
+import mmap
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents.base import Document
+
+# Chunk records (UTF-8 JSON, one after another in FAISS position order)
+CHUNKS_FILE_NAME = "chunks.bin"
+# int64 offsets into the chunks file, one more than the number of chunks
+OFFSETS_FILE_NAME = "chunks_offsets.npy"
+# Chunk ids in FAISS position order
+IDS_FILE_NAME = "chunks_ids.npy"
+# Chunk ids sorted, with their FAISS positions, for id lookups
+SORTED_IDS_FILE_NAME = "chunks_ids_sorted.npy"
+SORTED_POSITIONS_FILE_NAME = "chunks_ids_sorted_positions.npy"
+
+
+def write_chunk_store(directory: Path, ids: List[str], documents: List[Document]) -> None:
+    """
+    Write chunks in FAISS position order.
+
+    Args:
+        directory: Index directory
+        ids: Docstore id of each FAISS position
+        documents: Chunk of each FAISS position
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    offsets = np.zeros(len(documents) + 1, dtype=np.int64)
+
+    with open(directory / CHUNKS_FILE_NAME, "wb") as f:
+        for position, document in enumerate(documents):
+            record = json.dumps(
+                {"text": document.page_content, "metadata": document.metadata},
+                ensure_ascii=False
+            ).encode("utf-8")
+            f.write(record)
+            offsets[position + 1] = offsets[position] + len(record)
+
+    encoded_ids = np.array([chunk_id.encode("utf-8") for chunk_id in ids], dtype=bytes)
+    order = np.argsort(encoded_ids, kind="stable")
+    np.save(directory / OFFSETS_FILE_NAME, offsets)
+    np.save(directory / IDS_FILE_NAME, encoded_ids)
+    np.save(directory / SORTED_IDS_FILE_NAME, encoded_ids[order])
+    np.save(directory / SORTED_POSITIONS_FILE_NAME, order.astype(np.int64))
+
+
+def chunk_store_exists(directory: Path) -> bool:
+    """Check whether a chunk store has been written to `directory`."""
+    return all((directory / name).exists() for name in (
+        CHUNKS_FILE_NAME, OFFSETS_FILE_NAME, IDS_FILE_NAME, SORTED_IDS_FILE_NAME, SORTED_POSITIONS_FILE_NAME
+    ))
+
+
+class PositionIdMap(Mapping):
+    """Read-only FAISS position -> docstore id mapping backed by a memory-mapped array."""
+
+    def __init__(self, ids: np.ndarray):
+        """
+        Initialize mapping.
+
+        Args:
+            ids: Encoded chunk ids in FAISS position order
+        """
+        self._ids = ids
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < len(self._ids):
+            raise KeyError(position)
+        return self._ids[position].decode("utf-8")
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self._ids)))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class ChunkStore(Docstore):
+    """Read-only docstore over a chunk store directory, reading records on demand."""
+
+    def __init__(self, directory: Path):
+        """
+        Open a chunk store.
+
+        Args:
+            directory: Index directory the store was written to
+        """
+        self.directory = Path(directory)
+        self._offsets = np.load(self.directory / OFFSETS_FILE_NAME, mmap_mode="r")
+        self._ids = np.load(self.directory / IDS_FILE_NAME, mmap_mode="r")
+        self._sorted_ids = np.load(self.directory / SORTED_IDS_FILE_NAME, mmap_mode="r")
+        self._sorted_positions = np.load(self.directory / SORTED_POSITIONS_FILE_NAME, mmap_mode="r")
+
+        self._data: Union[mmap.mmap, bytes] = b""
+        with open(self.directory / CHUNKS_FILE_NAME, "rb") as f:
+            if self._offsets[-1] > 0:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def position_ids(self) -> PositionIdMap:
+        """Get the FAISS position -> docstore id mapping."""
+        return PositionIdMap(self._ids)
+
+    def position_of(self, chunk_id: str) -> Optional[int]:
+        """
+        Find the FAISS position of a chunk.
+
+        Args:
+            chunk_id: Docstore id
+
+        Returns:
+            Position or None if the id is not stored
+        """
+        key = chunk_id.encode("utf-8")
+        index = int(np.searchsorted(self._sorted_ids, key))
+        if index < len(self._sorted_ids) and self._sorted_ids[index] == key:
+            return int(self._sorted_positions[index])
+        return None
+
+    def get(self, position: int) -> Document:
+        """
+        Read the chunk stored at a FAISS position.
+
+        Args:
+            position: FAISS position
+
+        Returns:
+            Chunk document
+        """
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        record = json.loads(self._data[start:end])
+        return Document(id=self._ids[position].decode("utf-8"), page_content=record["text"], metadata=record["metadata"])
+
+    def search(self, search: str) -> Union[str, Document]:
+        """
+        Look up a chunk by docstore id (LangChain Docstore interface).
+
+        Args:
+            search: Docstore id
+
+        Returns:
+            Chunk document, or an error string if not found
+        """
+        position = self.position_of(search)
+        if position is None:
+            return f"ID {search} not found."
+        return self.get(position)
+
+    def __iter__(self) -> Iterator[Document]:
+        return (self.get(position) for position in range(len(self)))
@@ -0,0 +1,119 @@
+"""
+Extractive context compression without LLM calls.
+
+Retrieved chunks are split into sentences, each sentence is scored by cosine
+similarity to the query embedding, and only the best sentences that fit a token
+budget are kept, in their original order. Sentence embeddings go through the
+configured embeddings model (and its persistent cache), so repeated KB sentences
+are embedded once.
+"""
+import re
+from typing import Callable, List, Optional, Sequence
+import numpy as np
+from pydantic import ConfigDict
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents.base import Document
+from langchain_core.documents.compressor import BaseDocumentCompressor
+from langchain_core.embeddings import Embeddings
+from utils.tokens import count_tokens
+
+# Chunk metadata key with the similarity of the best sentence kept
+COMPRESSION_SCORE_METADATA_KEY = "compression_score"
+
+# Sentence ends (". ", "? ", "! ", "… ") and line breaks; markdown list items and headers stay whole
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        Non-empty sentences in order
+    """
+    return [sentence.strip() for sentence in _SENTENCE_BREAK.split(text) if sentence and sentence.strip()]
+
+
+class ExtractiveCompressor(BaseDocumentCompressor):
+    """Keeps the sentences of retrieved documents most similar to the query, within a token budget."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    embeddings: Embeddings
+    """Embeddings model of the index, used for the sentences"""
+
+    max_tokens: int = 500
+    """Token budget of the sentences kept across all documents"""
+
+    min_similarity: float = 0.0
+    """Sentences less similar to the query than this are dropped, unless none would be kept"""
+
+    embed_query: Optional[Callable[[str], List[float]]] = None
+    """Query embedding function, e.g. one backed by the query cache; embeddings.embed_query if None"""
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Callbacks=None
+    ) -> Sequence[Document]:
+        """
+        Compress retrieved documents to their sentences most relevant to the query.
+
+        Args:
+            documents: Retrieved documents, best first
+            query: User question
+            callbacks: Unused, no model is called
+
+        Returns:
+            Documents that kept at least one sentence, in retrieval order, with only those sentences
+        """
+        sentences: List[str] = []
+        owners: List[int] = []
+        for number, document in enumerate(documents):
+            for sentence in split_sentences(document.page_content):
+                sentences.append(sentence)
+                owners.append(number)
+
+        if not sentences:
+            return []
+
+        embed_query = self.embed_query or self.embeddings.embed_query
+        query_vector = np.asarray(embed_query(query), dtype=np.float32)
+        matrix = np.asarray(self.embeddings.embed_documents(sentences), dtype=np.float32)
+
+        norms = np.linalg.norm(matrix, axis=1) * max(float(np.linalg.norm(query_vector)), 1e-12)
+        scores = (matrix @ query_vector) / np.maximum(norms, 1e-12)
+
+        kept = np.zeros(len(sentences), dtype=bool)
+        used_tokens = 0
+        for position in np.argsort(-scores, kind="stable"):
+            if kept.any() and scores[position] < self.min_similarity:
+                break
+            tokens = count_tokens(sentences[position])
+            if used_tokens + tokens > self.max_tokens:
+                # The best sentence is kept even over budget, so there is always some context
+                if kept.any():
+                    continue
+            kept[position] = True
+            used_tokens += tokens
+
+        owner_of = np.asarray(owners)
+        compressed: List[Document] = []
+        for number, document in enumerate(documents):
+            positions = np.flatnonzero(kept & (owner_of == number))
+            if not len(positions):
+                continue
+            metadata = {**document.metadata, COMPRESSION_SCORE_METADATA_KEY: float(scores[positions].max())}
+            compressed.append(Document(
+                id=document.id,
+                page_content=" ".join(sentences[position] for position in positions),
+                metadata=metadata
+            ))
+
+        print(f"Compressed retrieved context, documents: {len(documents)}->{len(compressed)}, "
+              f"sentences: {len(sentences)}->{int(kept.sum())}, tokens: {used_tokens}")
+        return compressed
@@ -0,0 +1,156 @@
+"""
+Near-duplicate chunk detection with MinHash and locality-sensitive hashing.
+
+Each chunk is reduced to the set of its word shingles, and a MinHash signature
+estimates the Jaccard similarity between two sets without comparing them. LSH
+buckets the signatures by bands, so a new chunk is only compared with the chunks
+sharing at least one band instead of every indexed chunk.
+"""
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from rag.lexical import fold
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Chance that two chunks exactly at the threshold share an LSH band and get compared
+MIN_CANDIDATE_PROBABILITY = 0.98
+
+# Prime just above 2**32, the range of the shingle hashes
+_PRIME = np.uint64(4294967311)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Split a signature into (bands, rows): the most rows per band, so the fewest
+    dissimilar candidates, that still compare pairs at the threshold with
+    MIN_CANDIDATE_PROBABILITY.
+    """
+    for rows in sorted((rows for rows in range(1, num_perm + 1) if num_perm % rows == 0), reverse=True):
+        bands = num_perm // rows
+        if 1.0 - (1.0 - threshold ** rows) ** bands >= MIN_CANDIDATE_PROBABILITY:
+            return bands, rows
+    return num_perm, 1
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index answering "is there an indexed chunk this similar?"."""
+
+    def __init__(self, threshold: float, num_perm: int=64, seed: int=1):
+        """
+        Initialize index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity of word shingles to count as duplicates
+            num_perm: Hash permutations per signature; more is more precise and slower
+            seed: Seed of the permutations, fixed so runs are reproducible
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = _lsh_bands(num_perm, threshold)
+
+        rng = np.random.default_rng(seed)
+        # a < 2**31 and hashes < 2**32 keep a * hash + b within uint64
+        self._a = rng.integers(1, 2 ** 31, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, size=(num_perm, 1), dtype=np.uint64)
+
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+        self._keys: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Get the MinHash signature of a text's word shingles.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            uint32 array of num_perm minimums, None for texts without words
+        """
+        words = _WORD.findall(fold(text))
+        if not words:
+            return None
+
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def find(self, signature: np.ndarray) -> Optional[str]:
+        """
+        Get an indexed chunk whose estimated similarity reaches the threshold.
+
+        Args:
+            signature: Signature of the chunk to check
+
+        Returns:
+            Key of the most similar indexed chunk, or None
+        """
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best, best_similarity = None, self.threshold
+        for number in candidates:
+            similarity = float(np.mean(self._signatures[number] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = self._keys[number], similarity
+        return best
+
+    def add(self, key: str, signature: np.ndarray) -> None:
+        """
+        Index a chunk.
+
+        Args:
+            key: Chunk id
+            signature: Signature of the chunk
+        """
+        number = len(self._keys)
+        self._keys.append(key)
+        self._signatures.append(signature)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, []).append(number)
+
+    def add_text(self, key: str, text: str) -> None:
+        """
+        Index a chunk that is kept regardless of duplicates, e.g. one already embedded.
+
+        Args:
+            key: Chunk id
+            text: Chunk text
+        """
+        signature = self.signature(text)
+        if signature is not None:
+            self.add(key, signature)
+
+    def check_and_add(self, key: str, text: str) -> Optional[str]:
+        """
+        Check a chunk against the index, indexing it when it is not a duplicate.
+
+        Args:
+            key: Chunk id
+            text: Chunk text
+
+        Returns:
+            Key of the indexed chunk it duplicates, or None if it was indexed
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        duplicate_of = self.find(signature)
+        if duplicate_of is None:
+            self.add(key, signature)
+        return duplicate_of
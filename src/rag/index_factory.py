@@ -0,0 +1,235 @@
+"""
+FAISS index construction for the index type selected in settings.
+"""
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+from config.settings import settings
+from beans.schemas.ingest.index_config_dto import IndexConfig
+
+# k-means needs about this many training points per centroid to be stable
+MIN_POINTS_PER_CENTROID = 39
+
+IVF_TYPES = ("ivf_flat", "ivf_pq")
+
+
+def training_sample_size() -> int:
+    """
+    Get how many vectors ingestion should collect before building the index.
+
+    Returns:
+        Sample size, 1 for index types that need no training
+    """
+    if settings.vectorstore_index_type in IVF_TYPES:
+        return max(1, settings.vectorstore_train_sample_size)
+    return 1
+
+
+def _largest_divisor(dim: int, limit: int) -> int:
+    """Largest divisor of `dim` not greater than `limit`."""
+    for candidate in range(min(dim, max(1, limit)), 0, -1):
+        if dim % candidate == 0:
+            return candidate
+    return 1
+
+
+def resolve_index_config(dim: int, n_train: int) -> IndexConfig:
+    """
+    Resolve the settings into index parameters that can be trained on `n_train` vectors.
+    IVF falls back to fewer lists, and to flat, when there are too few vectors to train.
+
+    Args:
+        dim: Vector dimension
+        n_train: Vectors available for training
+
+    Returns:
+        IndexConfig to build
+    """
+    requested = settings.vectorstore_index_type
+    config = IndexConfig(requested_type=requested, index_type=requested, dim=dim)
+
+    if requested == "hnsw":
+        config.hnsw_m = settings.vectorstore_hnsw_m
+        config.ef_construction = settings.vectorstore_hnsw_ef_construction
+        config.ef_search = settings.vectorstore_hnsw_ef_search
+        return config
+
+    if requested not in IVF_TYPES:
+        return config
+
+    nlist = min(settings.vectorstore_ivf_nlist, n_train // MIN_POINTS_PER_CENTROID)
+    if nlist < 2:
+        print(f"Too few vectors to train an IVF index, using flat, vectors: {n_train}")
+        config.index_type = "flat"
+        return config
+
+    config.nlist = nlist
+    config.nprobe = min(settings.vectorstore_ivf_nprobe, nlist)
+    config.trained_on = n_train
+
+    if requested == "ivf_pq":
+        if n_train < MIN_POINTS_PER_CENTROID * (2 ** settings.vectorstore_pq_nbits):
+            print(f"Too few vectors to train PQ codebooks, using ivf_flat, vectors: {n_train}")
+            config.index_type = "ivf_flat"
+        else:
+            config.pq_m = _largest_divisor(dim, settings.vectorstore_pq_m)
+            config.pq_nbits = settings.vectorstore_pq_nbits
+
+    return config
+
+
+def apply_search_params(index: faiss.Index, config: IndexConfig) -> None:
+    """
+    Apply the query-time parameters from settings (nprobe, efSearch) to an index.
+    They do not change the stored vectors, so they can be tuned without re-ingesting.
+
+    Args:
+        index: FAISS index
+        config: Config the index was built with
+    """
+    parameters = faiss.ParameterSpace()
+    if config.index_type in IVF_TYPES:
+        parameters.set_index_parameter(index, "nprobe", min(settings.vectorstore_ivf_nprobe, config.nlist))
+    elif config.index_type == "hnsw":
+        parameters.set_index_parameter(index, "efSearch", settings.vectorstore_hnsw_ef_search)
+
+
+def build_index(config: IndexConfig, train_vectors: np.ndarray) -> faiss.Index:
+    """
+    Create an empty FAISS index and train it when the type requires it.
+
+    Args:
+        config: Index config
+        train_vectors: float32 matrix used for training
+
+    Returns:
+        Trained, empty FAISS index
+    """
+    index = faiss.index_factory(config.dim, config.factory_string(), faiss.METRIC_L2)
+
+    if config.index_type == "hnsw":
+        index.hnsw.efConstruction = config.ef_construction
+
+    if not index.is_trained:
+        print(f"Training FAISS index, type: {config.index_type}, vectors: {len(train_vectors)}")
+        index.train(train_vectors)
+
+    apply_search_params(index, config)
+    return index
+
+
+def read_index(path: Path, config: Optional[IndexConfig], mmap: bool) -> faiss.Index:
+    """
+    Read a saved FAISS index, optionally memory-mapped and read-only.
+    Mapped indexes keep their vectors in the OS page cache, shared by every process
+    that maps the same file, instead of a private copy per worker.
+
+    Args:
+        path: index.faiss file
+        config: Config the index was built with, None for legacy flat indexes
+        mmap: Map the index instead of reading it into memory
+
+    Returns:
+        FAISS index with the search parameters from settings applied
+    """
+    index_type = config.index_type if config else "flat"
+    flags = 0
+    if mmap:
+        # IVF maps its inverted lists; flat and HNSW map their code storage
+        flags = faiss.IO_FLAG_MMAP if index_type in IVF_TYPES else faiss.IO_FLAG_MMAP_IFC
+        flags |= faiss.IO_FLAG_READ_ONLY
+
+    index = faiss.read_index(str(path), flags)
+    if config is not None:
+        apply_search_params(index, config)
+    return index
+
+
+def create_empty_vectorstore(embeddings: Embeddings, sample_vectors: Sequence[List[float]]) -> Tuple[FAISS, IndexConfig]:
+    """
+    Create an empty FAISS vectorstore with the index type selected in settings.
+
+    Args:
+        embeddings: Embeddings model the vectorstore queries with
+        sample_vectors: Vectors to train on (also fix the dimension); not added to the index
+
+    Returns:
+        Tuple of (vectorstore, index_config)
+    """
+    train_vectors = np.asarray(sample_vectors, dtype=np.float32)
+    config = resolve_index_config(train_vectors.shape[1], len(train_vectors))
+    index = build_index(config, train_vectors)
+
+    vectorstore = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={}
+    )
+    print(f"Created FAISS index, type: {config.index_type}, factory: {config.factory_string()}")
+    return vectorstore, config
+
+
+def remove_vectors(vectorstore: FAISS, ids: List[str], config: IndexConfig) -> None:
+    """
+    Delete chunks from a vectorstore.
+    HNSW graphs cannot drop nodes, so the index is rebuilt from the vectors that remain.
+
+    Args:
+        vectorstore: FAISS vectorstore
+        ids: Docstore ids to delete
+        config: Config the index was built with
+    """
+    if not ids:
+        return
+
+    if config.index_type != "hnsw":
+        vectorstore.delete(ids)
+        return
+
+    removed = set(ids)
+    positions = sorted(vectorstore.index_to_docstore_id)
+    kept = [position for position in positions if vectorstore.index_to_docstore_id[position] not in removed]
+
+    vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)[kept]
+    index = build_index(config, vectors[:0])
+    if len(vectors):
+        index.add(vectors)
+
+    vectorstore.docstore.delete(ids)
+    vectorstore.index = index
+    vectorstore.index_to_docstore_id = {
+        new_position: vectorstore.index_to_docstore_id[old_position]
+        for new_position, old_position in enumerate(kept)
+    }
+    print(f"Rebuilt HNSW index without removed chunks, removed: {len(ids)}, remaining: {len(kept)}")
+
+
+def reconstruct_vectors(index: faiss.Index, positions: List[int], config: IndexConfig) -> np.ndarray:
+    """
+    Get the stored vectors at some positions of an in-memory index.
+    IVF indexes need a temporary direct map, dropped afterwards so vectors can still
+    be removed; PQ codes decode to approximations of the original embeddings.
+
+    Args:
+        index: FAISS index
+        positions: Positions to read
+        config: Config the index was built with
+
+    Returns:
+        float32 matrix with one row per position
+    """
+    keys = np.asarray(positions, dtype=np.int64)
+    if config.index_type not in IVF_TYPES:
+        return index.reconstruct_batch(keys)
+
+    ivf = faiss.extract_index_ivf(index)
+    ivf.make_direct_map()
+    try:
+        return index.reconstruct_batch(keys)
+    finally:
+        ivf.set_direct_map_type(faiss.DirectMap.NoMap)
@@ -1,17 +1,33 @@
 """
 Document ingestion and FAISS index creation.
 """
+import hashlib
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 # from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 # from langchain.schema import Document
 from config.settings import settings
-from llm.models import get_embeddings
+from llm.models import get_embeddings, get_embeddings_model_name
 from rag.store import get_vector_store_manager
+from rag.batch_embed import embed_texts_batched, iter_embedded_batches
+from rag.index_factory import training_sample_size, create_empty_vectorstore, remove_vectors
+from rag.dedup import NearDuplicateIndex
+from rag.languages import LANGUAGE_METADATA_KEY, document_language, file_language, update_language_partitions
 from langchain_core.documents.base import Document
 from langchain_text_splitters.character import RecursiveCharacterTextSplitter
+from rag.markdown_splitter import MarkdownSectionSplitter
+from beans.schemas.ingest.ingest_manifest_dto import IngestManifest, ManifestFileEntry
+from beans.schemas.ingest.ingest_stats_dto import IngestStats
+from beans.schemas.ingest.ingest_progress_dto import IngestProgress
+from beans.schemas.ingest.file_chunks_dto import FileChunks
+from beans.schemas.ingest.index_config_dto import IndexConfig
+from utils.timing import stage_timer, timed_iter
 
 
 def load_documents(kb_path: str=settings.kb_path) -> List[Document]:
@@ -46,6 +62,29 @@ def load_documents(kb_path: str=settings.kb_path) -> List[Document]:
     return documents
 
 
+def _chunking_params() -> Tuple[str, int, int]:
+    """
+    Get the configured chunking as (mode, chunk_size, chunk_overlap).
+    Sizes are characters in recursive mode and tokens in markdown mode.
+    """
+    if settings.chunking_mode == "markdown":
+        return "markdown", settings.chunk_max_tokens, settings.chunk_overlap_tokens
+    return "recursive", settings.chunk_size, settings.chunk_overlap
+
+
+def _get_text_splitter(chunk_size: int, chunk_overlap: int, chunking_mode: str="recursive"):
+    """Get the text splitter for the given chunking parameters."""
+    if chunking_mode == "markdown":
+        return MarkdownSectionSplitter(max_tokens=chunk_size, overlap_tokens=chunk_overlap)
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+
 def split_documents(documents: List[Document]) -> List[Document]:
     """
     Split documents into chunks.
@@ -58,12 +97,8 @@ def split_documents(documents: List[Document]) -> List[Document]:
     """
     print("Splitting documents into chunks")
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=settings.chunk_size,
-        chunk_overlap=settings.chunk_overlap,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]
-    )
+    chunking_mode, chunk_size, chunk_overlap = _chunking_params()
+    text_splitter = _get_text_splitter(chunk_size, chunk_overlap, chunking_mode)
 
     chunks = text_splitter.split_documents(documents)
     print(f"Created document chunks, count: {len(chunks)}")
@@ -71,12 +106,194 @@ def split_documents(documents: List[Document]) -> List[Document]:
     return chunks
 
 
-def create_vectorstore(chunks: List[Document]) -> FAISS:
+def list_kb_files(kb_path: str) -> List[Path]:
+    """
+    List the markdown files of a knowledge base in a deterministic order.
+
+    Args:
+        kb_path: Path to knowledge base directory
+
+    Returns:
+        Sorted list of file paths, hidden files and directories excluded
+    """
+    kb_dir = Path(kb_path)
+
+    if not kb_dir.exists():
+        print(f"Knowledge base directory not found, path: {kb_path}")
+        raise FileNotFoundError(f"KB directory not found: {kb_path}")
+
+    return sorted(
+        path for path in kb_dir.glob("**/*.md")
+        if path.is_file() and not any(part.startswith(".") for part in path.relative_to(kb_dir).parts)
+    )
+
+
+def _load_and_split_file(
+    path: str,
+    source: str,
+    previous_hash: Optional[str],
+    chunk_size: int,
+    chunk_overlap: int,
+    chunking_mode: str="recursive"
+) -> FileChunks:
+    """
+    Load and split one KB file. Runs in worker processes, so it never raises.
+    Chunks are tagged with the file's language when it can be told.
+
+    Args:
+        path: File path
+        source: KB-relative path of the file
+        previous_hash: Hash recorded in the last manifest, if any
+        chunk_size: Chunk size, characters or tokens in markdown mode
+        chunk_overlap: Chunk overlap, characters or tokens in markdown mode
+        chunking_mode: "recursive" or "markdown"
+
+    Returns:
+        FileChunks with chunks=None when the file is unchanged or failed
+    """
+    try:
+        documents = TextLoader(path, encoding="utf-8").load()
+        file_hash = hash_text("".join(doc.page_content for doc in documents))
+
+        if file_hash == previous_hash:
+            return FileChunks(source=source, file_hash=file_hash)
+
+        chunks = _get_text_splitter(chunk_size, chunk_overlap, chunking_mode).split_documents(documents)
+        language = file_language(source, "".join(doc.page_content for doc in documents))
+        if language:
+            for chunk in chunks:
+                chunk.metadata[LANGUAGE_METADATA_KEY] = language
+        return FileChunks(source=source, file_hash=file_hash, chunks=chunks)
+
+    except Exception as e:
+        return FileChunks(source=source, error=str(e))
+
+
+def iter_load_and_split_files(
+    kb_path: str,
+    previous_hashes: Optional[Dict[str, str]]=None,
+    workers: Optional[int]=None,
+    paths: Optional[List[Path]]=None
+) -> Iterator[FileChunks]:
+    """
+    Lazily load and split KB files, fanning out across a process pool when enabled.
+    Results keep the sorted file order, a failing file does not stop the others and
+    only a fixed window of files is in flight at any time. The KB directory is listed
+    on call, so a missing directory raises before any file is read.
+
+    Args:
+        kb_path: Path to knowledge base directory
+        previous_hashes: File hashes from the last manifest, by KB-relative path
+        workers: Worker processes, 0 or 1 to run in this process
+        paths: Files to process, as returned by list_kb_files; listed from kb_path if None
+
+    Returns:
+        Iterator of one FileChunks per file, in sorted path order
+
+    Raises:
+        FileNotFoundError: If the KB directory does not exist
+    """
+    previous_hashes = previous_hashes or {}
+    workers = settings.ingest_parallel_workers if workers is None else workers
+
+    paths = list_kb_files(kb_path) if paths is None else paths
+    chunking_mode, chunk_size, chunk_overlap = _chunking_params()
+    chunking = (chunk_size, chunk_overlap, chunking_mode)
+    print(f"Loading and splitting KB files, files: {len(paths)}, workers: {workers}")
+
+    file_args = [
+        (str(path), source, previous_hashes.get(source), *chunking)
+        for path, source in ((path, os.path.relpath(path, kb_path)) for path in paths)
+    ]
+    return _iter_file_chunks(file_args, workers)
+
+
+def _iter_file_chunks(file_args: List[tuple], workers: int) -> Iterator[FileChunks]:
+    """
+    Run `_load_and_split_file` over `file_args`, keeping at most `workers * 4` files in flight.
+
+    Args:
+        file_args: Positional arguments for `_load_and_split_file`, one tuple per file
+        workers: Worker processes, 0 or 1 to run in this process
+
+    Yields:
+        One FileChunks per file, in input order
+    """
+    def log_failure(result: FileChunks) -> FileChunks:
+        if result.error:
+            print(f"Failed to load KB file, source: {result.source}, error: {result.error}")
+        return result
+
+    if workers <= 1 or len(file_args) <= 1:
+        for args in file_args:
+            yield log_failure(_load_and_split_file(*args))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = workers * 4
+        pending = deque()
+        for args in file_args:
+            pending.append(executor.submit(_load_and_split_file, *args))
+            if len(pending) >= window:
+                yield log_failure(pending.popleft().result())
+
+        while pending:
+            yield log_failure(pending.popleft().result())
+
+
+def load_and_split_files(
+    kb_path: str,
+    previous_hashes: Optional[Dict[str, str]]=None,
+    workers: Optional[int]=None
+) -> List[FileChunks]:
+    """
+    Load and split every KB file, fanning out across a process pool when enabled.
+
+    Args:
+        kb_path: Path to knowledge base directory
+        previous_hashes: File hashes from the last manifest, by KB-relative path
+        workers: Worker processes, 0 or 1 to run in this process
+
+    Returns:
+        One FileChunks per file, in sorted path order
+    """
+    return list(iter_load_and_split_files(kb_path, previous_hashes, workers))
+
+
+def hash_text(text: str) -> str:
+    """
+    Get the SHA-256 hex digest of a text.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(source: str, text: str) -> str:
     """
-    Create FAISS vectorstore from document chunks.
+    Get the stable docstore id of a chunk.
+
+    Args:
+        source: KB-relative path of the file the chunk comes from
+        text: Chunk text
+
+    Returns:
+        Chunk id
+    """
+    return hash_text(f"{source}\x00{text}")
+
+
+def create_vectorstore(chunks: List[Document], ids: Optional[List[str]]=None) -> FAISS:
+    """
+    Create FAISS vectorstore from document chunks, using the index type selected in settings.
 
     Args:
         chunks: Document chunks
+        ids: Optional docstore ids, one per chunk
 
     Returns:
         FAISS vectorstore
@@ -84,19 +301,223 @@ def create_vectorstore(chunks: List[Document]) -> FAISS:
     print("Creating FAISS vectorstore")
 
     embeddings = get_embeddings()
-    vectorstore = FAISS.from_documents(chunks, embeddings)
+    texts = [chunk.page_content for chunk in chunks]
+    vectors = embed_texts_batched(texts, embeddings)
+
+    vectorstore, _ = create_empty_vectorstore(embeddings, vectors[:max(1, settings.vectorstore_train_sample_size)])
+    vectorstore.add_embeddings(
+        list(zip(texts, vectors)),
+        metadatas=[chunk.metadata for chunk in chunks],
+        ids=ids
+    )
 
     print(f"Created vectorstore, num_vectors: {len(chunks)}")
 
     return vectorstore
 
 
-def ingest_knowledge_base(kb_path: str=settings.kb_path) -> None:
+def _build_manifest() -> IngestManifest:
+    """Get an empty manifest for the current embeddings and chunking settings."""
+    chunking_mode, chunk_size, chunk_overlap = _chunking_params()
+    return IngestManifest(
+        embeddings_provider=settings.embeddings_provider,
+        embeddings_model=get_embeddings_model_name(),
+        chunking_mode=chunking_mode,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+
+def _load_previous_index(
+    store_manager,
+    manifest: IngestManifest,
+    index_name: Optional[str]=None
+) -> tuple[Optional[IngestManifest], Optional[FAISS], Optional[IndexConfig]]:
+    """
+    Load the previous manifest and a private copy of its index if they can be updated in place.
+
+    Args:
+        store_manager: Vector store manager
+        manifest: Manifest for the current settings
+        index_name: Index being updated, defaults to settings.vectorstore_index_name
+
+    Returns:
+        Tuple of (previous_manifest, vectorstore, index_config), all None when a full rebuild is needed
+    """
+    previous = store_manager.load_manifest(index_name)
+    if previous is None or not manifest.is_compatible(previous):
+        print("No compatible ingestion manifest, rebuilding the whole index")
+        return None, None, None
+
+    # Indexes saved before the config file existed are flat
+    index_config = store_manager.load_index_config(index_name)
+    previous_type = index_config.requested_type if index_config else "flat"
+    if previous_type != settings.vectorstore_index_type:
+        print(f"Index type changed, rebuilding the whole index, previous: {previous_type}, "
+              f"current: {settings.vectorstore_index_type}")
+        return None, None, None
+
+    # Fresh copy from disk: the resident instance keeps serving untouched
+    vectorstore = store_manager.load_vectorstore(get_embeddings(), writable=True, index_name=index_name)
+    if vectorstore is None:
+        return None, None, None
+
+    if set(vectorstore.index_to_docstore_id.values()) != previous.chunk_ids():
+        print("Ingestion manifest does not match the saved index, rebuilding the whole index")
+        return None, None, None
+
+    if index_config is None:
+        index_config = IndexConfig(requested_type="flat", index_type="flat", dim=vectorstore.index.d)
+
+    return previous, vectorstore, index_config
+
+
+def _iter_new_chunks(
+    results: Iterable[FileChunks],
+    previous: Optional[IngestManifest],
+    manifest: IngestManifest,
+    stats: IngestStats,
+    progress: Optional[IngestProgress]=None,
+    deduplicator: Optional[NearDuplicateIndex]=None,
+    indexed_text: Optional[Callable[[str], str]]=None,
+    resplit: Optional[Callable[[str], FileChunks]]=None
+) -> Iterator[Tuple[str, Document]]:
+    """
+    Record each file in the manifest and yield the chunks that are not indexed yet.
+
+    With a deduplicator, new chunks that are near-duplicates of a chunk earlier in
+    the KB are dropped before embedding and recorded in the manifest with the chunk
+    they duplicate. Chunks already indexed are kept. An unchanged file whose dropped
+    duplicates lost their original is split again so they get indexed.
+
+    Args:
+        results: Loaded and split files
+        previous: Manifest of the index being updated, None on full rebuild
+        manifest: Manifest being built for the new index
+        stats: Stats updated as files are processed
+        progress: Progress updated with the chunks found
+        deduplicator: Near-duplicate index, None to keep every chunk
+        indexed_text: Gets the text of an indexed chunk by id, to deduplicate against unchanged files
+        resplit: Loads and splits a file again by KB-relative path
+
+    Yields:
+        (chunk_id, chunk) for every new chunk
+    """
+    previous_ids = previous.chunk_ids() if previous else set()
+    # Ids indexed for the files processed so far; duplicates always point back into it
+    kept_ids = set()
+
+    for result in results:
+        stats.files_total += 1
+        previous_entry = previous.files.get(result.source) if previous else None
+
+        if result.chunks is None and not result.error and previous_entry is not None and resplit is not None:
+            known_ids = kept_ids | set(previous_entry.chunk_ids)
+            if any(original not in known_ids for original in previous_entry.duplicate_of.values()):
+                print(f"Near-duplicate chunks lost their original, splitting again, source: {result.source}")
+                result = resplit(result.source)
+
+        # Failed file: keep what was indexed for it rather than dropping it
+        # Unchanged file: reuse its chunk ids without splitting again
+        if result.error or result.chunks is None:
+            if result.error:
+                stats.files_failed += 1
+            if previous_entry is not None:
+                manifest.files[result.source] = previous_entry
+                kept_ids.update(previous_entry.chunk_ids)
+                if deduplicator is not None and indexed_text is not None:
+                    for current_id in previous_entry.chunk_ids:
+                        deduplicator.add_text(current_id, indexed_text(current_id))
+            continue
+
+        stats.files_changed += 1
+        entry = ManifestFileEntry(file_hash=result.file_hash)
+        manifest.files[result.source] = entry
+        seen_ids = set()
+        for chunk in result.chunks:
+            current_id = chunk_id(result.source, chunk.page_content)
+            if current_id in seen_ids:
+                continue
+            seen_ids.add(current_id)
+
+            if deduplicator is not None:
+                if current_id in previous_ids:
+                    deduplicator.add_text(current_id, chunk.page_content)
+                else:
+                    original = deduplicator.check_and_add(current_id, chunk.page_content)
+                    if original is not None:
+                        entry.duplicate_of[current_id] = original
+                        stats.chunks_duplicate += 1
+                        continue
+
+            entry.chunk_ids.append(current_id)
+            kept_ids.add(current_id)
+            if current_id not in previous_ids:
+                if progress is not None:
+                    progress.chunks_queued += 1
+                yield current_id, chunk
+
+
+def _iter_batches(items: Iterable[Tuple[str, Document]], batch_size: int) -> Iterator[Tuple[List[str], List[Tuple[str, Document]]]]:
+    """Group (chunk_id, chunk) pairs into (texts, pairs) embedding batches."""
+    batch: List[Tuple[str, Document]] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield [chunk.page_content for _, chunk in batch], batch
+            batch = []
+    if batch:
+        yield [chunk.page_content for _, chunk in batch], batch
+
+
+def _held_back_vectors(held_back: List[tuple]) -> List[List[float]]:
+    """Flatten the vectors of held-back (batch, vectors) pairs."""
+    return [vector for _, vectors in held_back for vector in vectors]
+
+
+def _add_batches(vectorstore: FAISS, embedded_batches: List[tuple]) -> int:
+    """
+    Add embedded batches of (chunk_id, chunk) pairs to a vectorstore.
+
+    Args:
+        vectorstore: FAISS vectorstore to extend
+        embedded_batches: (batch, vectors) pairs from the embedding stage
+
+    Returns:
+        Number of chunks added
+    """
+    added = 0
+    for batch, vectors in embedded_batches:
+        vectorstore.add_embeddings(
+            list(zip([chunk.page_content for _, chunk in batch], vectors)),
+            metadatas=[chunk.metadata for _, chunk in batch],
+            ids=[current_id for current_id, _ in batch]
+        )
+        added += len(batch)
+    return added
+
+
+def ingest_knowledge_base(
+    kb_path: str=settings.kb_path,
+    full_rebuild: bool=False,
+    on_progress: Optional[Callable[[IngestProgress], None]]=None,
+    index_name: Optional[str]=None
+) -> IngestStats:
     """
     Complete ingestion pipeline: load, split, embed, and save.
+    Files stream through load -> split -> embed -> add-to-index with a fixed window
+    of batches in flight, and the index is written once at the end. Only chunks
+    that are new or changed since the last ingestion are embedded; chunks of
+    removed or modified files are deleted from the index.
 
     Args:
         kb_path: Path to knowledge base directory
+        full_rebuild: Ignore the saved manifest and re-embed everything
+        on_progress: Called with the live progress at each stage and after each embedded batch
+        index_name: Index to build or update, defaults to settings.vectorstore_index_name
+
+    Returns:
+        IngestStats with added/removed/unchanged counts
     """
 
     # Check if kb_path exists
@@ -107,28 +528,155 @@ def ingest_knowledge_base(kb_path: str=settings.kb_path) -> None:
     except Exception:
         kb_path = settings.kb_path
 
-    print(f"Starting knowledge base ingestion, kb_path: {kb_path}")
+    print(f"Starting knowledge base ingestion, kb_path: {kb_path}, index_name: {index_name}")
+
+    progress = IngestProgress()
+    report = on_progress or (lambda _: None)
 
     try:
-        # Load documents
-        documents = load_documents(kb_path)
+        report(progress)
+        store_manager = get_vector_store_manager()
+        manifest = _build_manifest()
+
+        previous, vectorstore, index_config = (None, None, None) if full_rebuild \
+            else _load_previous_index(store_manager, manifest, index_name)
+        stats = IngestStats(full_rebuild=previous is None)
+        timings = stats.stage_seconds
+
+        # Stream: load/split -> new chunks -> batches -> concurrent embedding -> index
+        start = time.perf_counter()
+        previous_hashes = {source: entry.file_hash for source, entry in previous.files.items()} if previous else {}
+        paths = list_kb_files(kb_path)
+        results = timed_iter(iter_load_and_split_files(kb_path, previous_hashes, paths=paths), "load_split", timings)
+        embeddings = vectorstore.embedding_function if vectorstore is not None else get_embeddings()
+        deduplicator = NearDuplicateIndex(settings.ingest_dedup_threshold, settings.ingest_dedup_num_perm) \
+            if settings.ingest_dedup_threshold > 0 else None
+        batches = _iter_batches(
+            _iter_new_chunks(
+                results, previous, manifest, stats, progress,
+                deduplicator=deduplicator,
+                indexed_text=(lambda current_id: vectorstore.docstore.search(current_id).page_content) if previous else None,
+                resplit=lambda source: _load_and_split_file(
+                    str(Path(kb_path) / source), source, None,
+                    manifest.chunk_size, manifest.chunk_overlap, manifest.chunking_mode
+                )
+            ),
+            max(1, settings.ingest_embed_batch_size)
+        )
+        progress.stage, progress.files_total = "embedding", len(paths)
+        report(progress)
+
+        # On a rebuild, batches are held back until there are enough vectors to train the index
+        held_back: List[tuple] = []
+        held_back_count = 0
+        sample_size = training_sample_size()
+
+        for batch, vectors in iter_embedded_batches(batches, embeddings):
+            progress.files_done = stats.files_total
+            progress.chunks_embedded += len(batch)
+            report(progress)
+
+            held_back.append((batch, vectors))
+            held_back_count += len(batch)
+            if vectorstore is None and held_back_count < sample_size:
+                continue
+            if vectorstore is None:
+                vectorstore, index_config = create_empty_vectorstore(embeddings, _held_back_vectors(held_back))
+            stats.chunks_added += _add_batches(vectorstore, held_back)
+            held_back, held_back_count = [], 0
+
+        # Fewer new chunks than the training sample: build from what there is
+        if held_back:
+            if vectorstore is None:
+                vectorstore, index_config = create_empty_vectorstore(embeddings, _held_back_vectors(held_back))
+            stats.chunks_added += _add_batches(vectorstore, held_back)
+
+        timings["embed_index"] = time.perf_counter() - start - timings.get("load_split", 0.0)
+        progress.files_done = stats.files_total
+
+        previous_ids = previous.chunk_ids() if previous else set()
+        current_ids = manifest.chunk_ids()
+        removed_ids = sorted(previous_ids - current_ids)
+        stats.chunks_removed = len(removed_ids)
+        stats.chunks_unchanged = len(current_ids) - stats.chunks_added
+
+        # An index already built keeps going: the chunks of the removed files are deleted,
+        # down to an empty version when no file is left
+        if not current_ids and not previous_ids:
+            print("No documents found in KB" if stats.files_total == 0 else "No chunks produced from KB documents")
+            return stats
+        if not current_ids:
+            print(f"Knowledge base empty, removing every indexed chunk, files: {stats.files_total}")
+
+        if stats.chunks_added == 0 and not removed_ids:
+            # Still writes the partitions missing or out of date on disk, e.g. after enabling routing
+            stats.language_partitions = update_language_partitions(
+                store_manager, vectorstore, index_config, index_name, changed_languages=set()
+            )
+            print("Knowledge base unchanged, keeping current index")
+            return stats
+
+        progress.stage = "saving"
+        report(progress)
+        changed_languages = None if previous is None else {
+            document_language(vectorstore.docstore.search(current_id))
+            for current_id in (current_ids - previous_ids) | set(removed_ids)
+        }
+        remove_vectors(vectorstore, removed_ids, index_config)
+
+        # Save to disk once as a new version and hot-swap the index served by this process
+        previous_version = store_manager.current_version(index_name)
+        with stage_timer("save", timings):
+            stats.version = store_manager.save_vectorstore(vectorstore, index_name, manifest, index_config)
+
+        with stage_timer("language_partitions", timings):
+            stats.language_partitions = update_language_partitions(
+                store_manager, vectorstore, index_config, index_name, changed_languages, previous_version
+            )
+
+        store_manager.swap_vectorstore(vectorstore, index_name)
+
+        for stage, seconds in timings.items():
+            timings[stage] = round(seconds, 4)
+
+        progress.stage = "done"
+        report(progress)
+
+        print(f"Knowledge base ingestion completed successfully, added: {stats.chunks_added}, "
+              f"removed: {stats.chunks_removed}, unchanged: {stats.chunks_unchanged}, "
+              f"near_duplicates: {stats.chunks_duplicate}, "
+              f"failed_files: {stats.files_failed}, stage_seconds: {timings}")
+        return stats
 
-        if not documents:
-            print("No documents found in KB")
-            return
+    except Exception as e:
+        print(f"Knowledge base ingestion failed, error: {str(e)}")
+        raise
 
-        # Split into chunks
-        chunks = split_documents(documents)
 
-        # Create vectorstore
-        vectorstore = create_vectorstore(chunks)
+def rollback_index(index_name: Optional[str]=None, version: Optional[str]=None) -> str:
+    """
+    Serve a saved version of an index again, the one before the current by default.
+    Language partitions are versioned on their own and record the version they were
+    built from, so they are ignored until rebuilt here from the restored vectors.
 
-        # Save to disk
-        store_manager = get_vector_store_manager()
-        store_manager.save_vectorstore(vectorstore)
+    Args:
+        index_name: Index to roll back, defaults to settings.vectorstore_index_name
+        version: Version to restore, one of VectorStoreManager.list_versions()
 
-        print("Knowledge base ingestion completed successfully")
+    Returns:
+        Version now current
 
-    except Exception as e:
-        print(f"Knowledge base ingestion failed, error: {str(e)}")
-        raise
+    Raises:
+        ValueError: If the index has no such version, or none before the current one
+    """
+    store_manager = get_vector_store_manager()
+    restored = store_manager.activate_version(version, index_name) if version else store_manager.rollback(index_name)
+
+    vectorstore = store_manager.load_vectorstore(get_embeddings(), writable=True, index_name=index_name)
+    if vectorstore is not None:
+        index_config = store_manager.load_index_config(index_name) \
+            or IndexConfig(requested_type="flat", index_type="flat", dim=vectorstore.index.d)
+        update_language_partitions(store_manager, vectorstore, index_config, index_name)
+
+    print(f"Index rolled back, index_name: {index_name or store_manager.index_name}, version: {restored}")
+    return restored
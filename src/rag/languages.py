@@ -0,0 +1,254 @@
+"""
+Per-language partitions of a knowledge base index.
+
+Ingestion tags every chunk with the language of its file, taken from the file name
+("faqs_es.md", "es/faqs.md") or detected from its text, and saves one sub-index per
+language next to the global index ("kb" -> "kb/lang/es"). Retrieval can then search
+only the partition of the language detected for the question, a smaller index with
+no chunks in other languages, and fall back to the global index.
+
+Partitions are saved after the global index, so each one records the global version
+it was built from, and retrieval only uses those matching the version being served:
+a failed or interrupted update, or a rollback, never mixes partitions of one version
+with the global index of another.
+"""
+import re
+import shutil
+from collections import Counter
+from pathlib import PurePath
+from typing import Dict, List, Optional, Set, Tuple
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents.base import Document
+from config.settings import settings
+from utils.validators import PARTITIONS_SEGMENT
+from rag.index_factory import create_empty_vectorstore, reconstruct_vectors
+from rag.lexical import fold
+from beans.schemas.ingest.index_config_dto import IndexConfig
+
+# Directory, inside an index directory, holding its language partitions
+PARTITIONS_DIR_NAME = PARTITIONS_SEGMENT
+
+# Chunk metadata key with the chunk's language code
+LANGUAGE_METADATA_KEY = "language"
+
+# Language code suffix of a file name: faqs_es.md, faqs-en.md, faqs.es.md
+_FILE_LANGUAGE = re.compile(r"[._-]([a-z]{2})$")
+
+_WORD = re.compile(r"[a-z]+")
+
+# Frequent function words of each language, used to detect untagged files
+LANGUAGE_STOPWORDS = {
+    "es": frozenset("""
+        el la los las un una de del que y en por para con es son esta estan como pero su sus se lo al
+        no si mas muy tambien hay puede pueden cuando donde usted
+    """.split()),
+    "en": frozenset("""
+        the a an of and to in for with is are this that it be can on by as or from not you your we our
+        will if when which have has
+    """.split()),
+    "fr": frozenset("""
+        le la les un une des du de et en est sont pour avec dans par sur ce cette qui que pas vous nous
+        votre vos au aux il elle
+    """.split()),
+    "pt": frozenset("""
+        o a os as um uma de do da dos das e em no na por para com que nao se seu sua voce sao esta mais
+        como ao pelo pela
+    """.split()),
+    "it": frozenset("""
+        il lo la gli le un una di del della e in per con che non si sono questo questa come anche piu
+        al alla dei nel
+    """.split()),
+    "de": frozenset("""
+        der die das den dem ein eine und ist sind nicht mit fur auf im in zu von sie wir ihr ihre
+        auch als wenn oder
+    """.split())
+}
+
+# Function words a text needs before its language is trusted
+MIN_DETECTION_HITS = 3
+
+
+def language_index_name(index_name: str, language: str) -> str:
+    """
+    Get the name of an index's partition for a language.
+
+    Args:
+        index_name: Global index name
+        language: Language code
+
+    Returns:
+        Partition index name, e.g. "faiss_index/lang/es"
+    """
+    return f"{index_name}/{PARTITIONS_DIR_NAME}/{language}"
+
+
+def language_from_path(source: str) -> Optional[str]:
+    """
+    Get the language a KB file is named for: a code suffix on the file name
+    ("faqs_es.md") or a directory named after a code ("en/faqs.md").
+
+    Args:
+        source: KB-relative path of the file
+
+    Returns:
+        Supported language code or None
+    """
+    supported = settings.supported_languages_list
+    path = PurePath(source.lower())
+
+    match = _FILE_LANGUAGE.search(path.stem)
+    if match and match.group(1) in supported:
+        return match.group(1)
+
+    for part in reversed(path.parent.parts):
+        if part in supported:
+            return part
+    return None
+
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Detect the language of a text by counting frequent function words of each
+    supported language. Cheap and offline, so it can run over every KB file.
+
+    Args:
+        text: Text to classify
+
+    Returns:
+        Supported language code, or None when the text is too short or ambiguous
+    """
+    counts = Counter(_WORD.findall(fold(text)))
+    scores = {
+        language: sum(counts[word] for word in LANGUAGE_STOPWORDS[language])
+        for language in settings.supported_languages_list if language in LANGUAGE_STOPWORDS
+    }
+    if not scores:
+        return None
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best, hits = ranked[0]
+    if hits < MIN_DETECTION_HITS or (len(ranked) > 1 and ranked[1][1] == hits):
+        return None
+    return best
+
+
+def file_language(source: str, text: str) -> Optional[str]:
+    """
+    Get the language of a KB file, from its name or else its content.
+
+    Args:
+        source: KB-relative path of the file
+        text: File content
+
+    Returns:
+        Supported language code or None
+    """
+    return language_from_path(source) or detect_language(text)
+
+
+def document_language(document: Document) -> Optional[str]:
+    """
+    Get the language of an indexed chunk. Chunks indexed before language tagging
+    fall back to their file name and text.
+
+    Args:
+        document: Chunk
+
+    Returns:
+        Supported language code or None
+    """
+    language = document.metadata.get(LANGUAGE_METADATA_KEY)
+    if language:
+        return language
+    # "source" is the loaded path, not KB-relative, so its directories say nothing
+    return file_language(PurePath(str(document.metadata.get("source", ""))).name, document.page_content)
+
+
+def _partition_positions(vectorstore: FAISS) -> Dict[str, List[int]]:
+    """Group the positions of an in-memory vectorstore by chunk language."""
+    positions: Dict[str, List[int]] = {}
+    for position, current_id in sorted(vectorstore.index_to_docstore_id.items()):
+        language = document_language(vectorstore.docstore.search(current_id))
+        if language:
+            positions.setdefault(language, []).append(position)
+    return positions
+
+
+def _build_partition(vectorstore: FAISS, positions: List[int], index_config: IndexConfig) -> Tuple[FAISS, IndexConfig]:
+    """Build the vectorstore of one partition from the stored vectors, without embedding calls."""
+    vectors = reconstruct_vectors(vectorstore.index, positions, index_config)
+    ids = [vectorstore.index_to_docstore_id[position] for position in positions]
+    documents = [vectorstore.docstore.search(current_id) for current_id in ids]
+
+    partition, partition_config = create_empty_vectorstore(
+        vectorstore.embedding_function,
+        vectors[:max(1, settings.vectorstore_train_sample_size)]
+    )
+    partition.add_embeddings(
+        [(document.page_content, vector) for document, vector in zip(documents, vectors)],
+        metadatas=[document.metadata for document in documents],
+        ids=ids
+    )
+    return partition, partition_config
+
+
+def update_language_partitions(
+    store_manager,
+    vectorstore: FAISS,
+    index_config: IndexConfig,
+    index_name: Optional[str]=None,
+    changed_languages: Optional[Set[str]]=None,
+    previous_version: Optional[str]=None
+) -> List[str]:
+    """
+    Save the language partitions of a freshly ingested index.
+    Partitions are rebuilt from the vectors already in the index; only those of the
+    languages whose chunks changed, or that are missing or out of date on disk, are
+    written, and partitions of languages no longer in the KB are deleted. Each one
+    records the global version it matches; unchanged partitions built from the
+    previous version just record the new one. With settings.rag_language_routing
+    off every partition is deleted, so none goes stale.
+
+    Args:
+        store_manager: Vector store manager
+        vectorstore: In-memory global vectorstore
+        index_config: Config the global index was built with
+        index_name: Global index, defaults to settings.vectorstore_index_name
+        changed_languages: Languages of the chunks added or removed, None to rebuild all
+        previous_version: Global version served before this ingestion, which unchanged partitions may match
+
+    Returns:
+        Languages whose partition was written
+    """
+    name = index_name or store_manager.index_name
+    version = store_manager.current_version(name)
+    partitions_path = store_manager.store_path / name / PARTITIONS_DIR_NAME
+    on_disk = {path.name for path in partitions_path.iterdir() if path.is_dir()} if partitions_path.exists() else set()
+
+    groups = _partition_positions(vectorstore) if settings.rag_language_routing else {}
+
+    for language in sorted(on_disk - set(groups)):
+        shutil.rmtree(partitions_path / language, ignore_errors=True)
+        store_manager.release_vectorstore(language_index_name(name, language))
+        print(f"Removed language partition, index_name: {name}, language: {language}")
+
+    written: List[str] = []
+    for language, positions in sorted(groups.items()):
+        partition_name = language_index_name(name, language)
+        if changed_languages is not None and language not in changed_languages and language in on_disk:
+            source_version = store_manager.source_version(partition_name)
+            if source_version == version:
+                continue
+            if source_version is not None and source_version == previous_version:
+                store_manager.set_source_version(partition_name, version)
+                continue
+
+        partition, partition_config = _build_partition(vectorstore, positions, index_config)
+        store_manager.save_vectorstore(partition, partition_name, index_config=partition_config)
+        store_manager.set_source_version(partition_name, version)
+        # Loaded again on its next query, not to take an LRU slot at ingestion
+        store_manager.release_vectorstore(partition_name)
+        written.append(language)
+        print(f"Saved language partition, index_name: {name}, language: {language}, chunks: {len(positions)}")
+
+    return written
@@ -0,0 +1,197 @@
+"""
+BM25 inverted index over the knowledge base chunks.
+
+Built at ingestion from the same chunks as the FAISS index and saved next to it,
+addressed by FAISS position. Exact lookups (order id formats, product names, FAQ
+keywords) can then be answered without a query embedding call.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+# Sorted vocabulary
+TERMS_FILE_NAME = "lexical_terms.npy"
+# int64 offsets into the postings arrays, one more than the number of terms
+TERM_OFFSETS_FILE_NAME = "lexical_term_offsets.npy"
+# FAISS positions and term frequencies of each term's postings
+POSTINGS_FILE_NAME = "lexical_postings.npy"
+FREQUENCIES_FILE_NAME = "lexical_frequencies.npy"
+# Token count of each chunk, by FAISS position
+DOC_LENGTHS_FILE_NAME = "lexical_doc_lengths.npy"
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_/][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a al algo como con cual cuales cuando de del donde el ella ellos en es esta este esto hay la las le les lo los
+me mi mis muy no nos o para pero por que se si sin sobre su sus te tu tus un una uno unos y ya yo
+an and are as at be by can do does for from how i in is it me my no not of on or our so that the this
+to was what when where which who why will with you your
+""".split())
+
+
+def fold(text: str) -> str:
+    """Case-fold text and remove accents ("Envío" -> "envio")."""
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in folded if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lexical terms: case-folded, accents removed, stopwords dropped.
+    Identifiers such as order ids ("ABC-123456") are kept as single terms.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Terms in order of appearance
+    """
+    return [term for term in _TOKEN.findall(fold(text)) if term not in STOPWORDS]
+
+
+def write_lexical_index(directory: Path, texts: Iterable[str]) -> None:
+    """
+    Build the BM25 index of chunks given in FAISS position order and save it.
+
+    Args:
+        directory: Index directory
+        texts: Chunk texts in FAISS position order
+    """
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    doc_lengths: List[int] = []
+
+    for position, text in enumerate(texts):
+        terms = tokenize(text)
+        doc_lengths.append(len(terms))
+        for term, frequency in Counter(terms).items():
+            postings.setdefault(term, []).append((position, frequency))
+
+    vocabulary = sorted(postings)
+    offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    positions: List[int] = []
+    frequencies: List[int] = []
+    for number, term in enumerate(vocabulary):
+        for position, frequency in postings[term]:
+            positions.append(position)
+            frequencies.append(frequency)
+        offsets[number + 1] = len(positions)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    np.save(directory / TERMS_FILE_NAME, np.array([term.encode("utf-8") for term in vocabulary], dtype=bytes))
+    np.save(directory / TERM_OFFSETS_FILE_NAME, offsets)
+    np.save(directory / POSTINGS_FILE_NAME, np.array(positions, dtype=np.int32))
+    np.save(directory / FREQUENCIES_FILE_NAME, np.array(frequencies, dtype=np.int32))
+    np.save(directory / DOC_LENGTHS_FILE_NAME, np.array(doc_lengths, dtype=np.int32))
+
+
+def lexical_index_exists(directory: Path) -> bool:
+    """Check whether a lexical index has been written to `directory`."""
+    return all((directory / name).exists() for name in (
+        TERMS_FILE_NAME, TERM_OFFSETS_FILE_NAME, POSTINGS_FILE_NAME, FREQUENCIES_FILE_NAME, DOC_LENGTHS_FILE_NAME
+    ))
+
+
+class LexicalHit:
+    """One BM25 result."""
+
+    __slots__ = ("position", "score", "coverage")
+
+    def __init__(self, position: int, score: float, coverage: float):
+        """
+        Initialize hit.
+
+        Args:
+            position: FAISS position of the chunk
+            score: BM25 score
+            coverage: Share of the query's IDF weight matched by the chunk (0-1)
+        """
+        self.position = position
+        self.score = score
+        self.coverage = coverage
+
+
+class LexicalIndex:
+    """Read-only BM25 index, memory-mapped like the chunk store."""
+
+    def __init__(self, directory: Path):
+        """
+        Open a lexical index.
+
+        Args:
+            directory: Index directory the index was written to
+        """
+        directory = Path(directory)
+        self._terms = np.load(directory / TERMS_FILE_NAME, mmap_mode="r")
+        self._offsets = np.load(directory / TERM_OFFSETS_FILE_NAME, mmap_mode="r")
+        self._postings = np.load(directory / POSTINGS_FILE_NAME, mmap_mode="r")
+        self._frequencies = np.load(directory / FREQUENCIES_FILE_NAME, mmap_mode="r")
+        self._doc_lengths = np.load(directory / DOC_LENGTHS_FILE_NAME, mmap_mode="r")
+        self._doc_count = len(self._doc_lengths)
+        self._average_length = float(np.mean(self._doc_lengths)) if self._doc_count else 0.0
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    def _idf(self, document_frequency: int) -> float:
+        return math.log(1.0 + (self._doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _postings_of(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        key = term.encode("utf-8")
+        index = int(np.searchsorted(self._terms, key))
+        if index >= len(self._terms) or self._terms[index] != key:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return self._postings[start:end], self._frequencies[start:end]
+
+    def search(self, query: str, k: int) -> List[LexicalHit]:
+        """
+        Rank chunks for a query with BM25.
+
+        Args:
+            query: User question
+            k: Maximum hits to return
+
+        Returns:
+            Hits, best first
+        """
+        terms = set(tokenize(query))
+        if not terms or not self._doc_count:
+            return []
+
+        positions: List[np.ndarray] = []
+        contributions: List[np.ndarray] = []
+        weights: List[np.ndarray] = []
+        total_weight = 0.0
+
+        for term in terms:
+            term_positions, frequencies = self._postings_of(term)
+            idf = self._idf(len(term_positions))
+            # Terms missing from the KB still count against coverage
+            total_weight += idf
+            if not len(term_positions):
+                continue
+
+            frequencies = frequencies.astype(np.float64)
+            lengths = self._doc_lengths[term_positions]
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / max(self._average_length, 1e-9))
+            positions.append(np.asarray(term_positions))
+            contributions.append(idf * frequencies * (BM25_K1 + 1.0) / (frequencies + norm))
+            weights.append(np.full(len(term_positions), idf))
+
+        if not positions:
+            return []
+
+        matched, inverse = np.unique(np.concatenate(positions), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+        coverage = np.bincount(inverse, weights=np.concatenate(weights)) / total_weight
+
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [LexicalHit(int(matched[i]), float(scores[i]), float(coverage[i])) for i in best]
@@ -0,0 +1,157 @@
+"""
+Structure-aware markdown chunking measured in tokens.
+
+Each header section (a FAQ question and its answer) stays in one chunk. Small
+sibling sections are packed together up to the token limit, and only sections
+longer than the limit are split further. Chunks carry the path of the headers
+they belong to as metadata.
+"""
+import re
+from typing import List, Tuple
+from langchain_core.documents.base import Document
+from langchain_text_splitters.character import RecursiveCharacterTextSplitter
+from utils.tokens import count_tokens
+
+# Chunk metadata key with the header path, e.g. "FAQ > Shipping > Can I track my order?"
+HEADER_PATH_METADATA_KEY = "header_path"
+
+HEADER_PATH_SEPARATOR = " > "
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def split_markdown_sections(text: str) -> List[Tuple[List[str], str]]:
+    """
+    Split markdown into header sections. Headers inside fenced code blocks are ignored.
+
+    Args:
+        text: Markdown text
+
+    Returns:
+        (header_path, section_text) pairs in document order; text before the first header has an empty path
+    """
+    sections: List[Tuple[List[str], str]] = []
+    headers: List[Tuple[int, str]] = []
+    lines: List[str] = []
+    in_fence = False
+
+    def flush() -> None:
+        section = "\n".join(lines).strip()
+        if section:
+            sections.append(([title for _, title in headers], section))
+
+    for line in text.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        heading = None if in_fence else _HEADING.match(line)
+        if heading is None:
+            lines.append(line)
+            continue
+
+        flush()
+        level = len(heading.group(1))
+        while headers and headers[-1][0] >= level:
+            headers.pop()
+        headers.append((level, heading.group(2)))
+        lines = [line]
+
+    flush()
+    return sections
+
+
+def _common_path(paths: List[List[str]]) -> List[str]:
+    common = paths[0]
+    for path in paths[1:]:
+        size = 0
+        while size < min(len(common), len(path)) and common[size] == path[size]:
+            size += 1
+        common = common[:size]
+    return common
+
+
+class MarkdownSectionSplitter:
+    """Splits markdown documents into header-bounded chunks of at most `max_tokens` tokens."""
+
+    def __init__(self, max_tokens: int, overlap_tokens: int=0):
+        """
+        Initialize splitter.
+
+        Args:
+            max_tokens: Maximum tokens per chunk
+            overlap_tokens: Token overlap between the pieces of a section longer than max_tokens
+        """
+        self.max_tokens = max_tokens
+        self._long_section_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=max_tokens,
+            chunk_overlap=min(overlap_tokens, max_tokens // 2),
+            length_function=count_tokens,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+
+    def split_text(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Split markdown text into chunks.
+        Sections with no body of their own (a "## Shipping" header followed by its
+        questions) are prepended to the next section; those at the end of the text,
+        with no section after them, hold no content and are dropped. Consecutive
+        sections with the same parent header are packed while they fit.
+
+        Args:
+            text: Markdown text
+
+        Returns:
+            (header_path, chunk_text) pairs in document order
+        """
+        chunks: List[Tuple[str, str]] = []
+        packed: List[str] = []
+        packed_paths: List[List[str]] = []
+        packed_tokens = 0
+        carried: List[str] = []
+
+        def flush() -> None:
+            nonlocal packed, packed_paths, packed_tokens
+            if packed:
+                chunks.append((HEADER_PATH_SEPARATOR.join(_common_path(packed_paths)), "\n\n".join(packed)))
+            packed, packed_paths, packed_tokens = [], [], 0
+
+        for path, section in split_markdown_sections(text):
+            if _HEADING.match(section) and "\n" not in section:
+                carried.append(section)
+                continue
+
+            section = "\n\n".join(carried + [section])
+            carried = []
+            tokens = count_tokens(section)
+
+            if packed and (packed_paths[-1][:-1] != path[:-1] or packed_tokens + tokens > self.max_tokens):
+                flush()
+
+            if tokens > self.max_tokens:
+                header_path = HEADER_PATH_SEPARATOR.join(path)
+                chunks.extend((header_path, piece) for piece in self._long_section_splitter.split_text(section))
+                continue
+
+            packed.append(section)
+            packed_paths.append(path)
+            packed_tokens += tokens
+
+        flush()
+        return chunks
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Split documents into chunks that keep their metadata plus the header path.
+
+        Args:
+            documents: Markdown documents
+
+        Returns:
+            Document chunks
+        """
+        chunks: List[Document] = []
+        for document in documents:
+            for header_path, text in self.split_text(document.page_content):
+                metadata = {**document.metadata, HEADER_PATH_METADATA_KEY: header_path}
+                chunks.append(Document(page_content=text, metadata=metadata))
+        return chunks
@@ -0,0 +1,122 @@
+"""
+In-process LRU cache with TTL for query embeddings on the chat hot path.
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from config.settings import settings
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,;:!?¡¿\"'()[]{}"
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a user message so trivially different openers share a cache entry.
+
+    Args:
+        text: Raw user message
+
+    Returns:
+        Normalized text (NFKC, case-folded, collapsed whitespace, no edge punctuation)
+    """
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    normalized = _WHITESPACE.sub(" ", normalized)
+    return normalized.strip(_EDGE_PUNCTUATION) or normalized.strip()
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU cache of query embeddings with per-entry time to live."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of entries, 0 disables the cache
+            ttl_seconds: Seconds an entry stays valid, 0 means no expiry
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """
+        Get a cached embedding.
+
+        Args:
+            key: Normalized query text
+
+        Returns:
+            Embedding or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, embedding = entry
+                if not self.ttl_seconds or time.monotonic() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        """
+        Store an embedding, evicting the least recently used entry when full.
+
+        Args:
+            key: Normalized query text
+            embedding: Query embedding
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit_ratio and size
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "size": len(self._entries)
+        }
+
+
+# Global query embedding cache
+_query_embedding_cache: Optional[QueryEmbeddingCache] = None
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get global query embedding cache instance."""
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        _query_embedding_cache = QueryEmbeddingCache(
+            max_size=settings.query_embedding_cache_size,
+            ttl_seconds=settings.query_embedding_cache_ttl_seconds
+        )
+    return _query_embedding_cache
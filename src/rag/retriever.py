@@ -1,30 +1,48 @@
 """
 RAG retriever for querying vector store.
 """
-
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 from langchain_classic.retrievers.document_compressors.chain_extract import LLMChainExtractor
 from langchain_classic.retrievers.contextual_compression import ContextualCompressionRetriever
+from rag.compression import ExtractiveCompressor
 from config.settings import settings
-from llm.models import get_embeddings, get_llm
+from llm.models import get_llm
 from rag.store import get_vector_store_manager
+from rag.query_cache import get_query_embedding_cache, normalize_query
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents.base import Document
+from rag.lexical import LexicalHit, LexicalIndex, tokenize
+from rag.languages import language_index_name
+from utils.tokens import count_tokens
+from beans.schemas.rag.rag_context_dto import RagContext
+
+# Bounded pool for blocking retrieval steps of async callers
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_executor_lock = threading.Lock()
 
 
-def get_retriever(use_compression: bool=False):
+def get_retriever(use_compression: bool=False, index_name: Optional[str]=None, compression_mode: Optional[str]=None):
     """
     Get retriever for RAG queries.
 
     Args:
         use_compression: Whether to use contextual compression
+        index_name: Index to search, defaults to settings.vectorstore_index_name
+        compression_mode: extractive (local sentence selection, no LLM calls) or llm
+            (LLMChainExtractor, one LLM call per document); defaults to settings.rag_compression_mode
 
     Returns:
         LangChain retriever
     """
     print("Initializing retriever")
 
-    # Load vectorstore
+    # Resident vectorstore, loaded once per process
     store_manager = get_vector_store_manager()
-    embeddings = get_embeddings()
-    vectorstore = store_manager.load_vectorstore(embeddings)
+    vectorstore = store_manager.get_vectorstore(index_name)
 
     if vectorstore is None:
         print(f"Vectorstore not found, RAG will not be available")
@@ -38,9 +56,19 @@ def get_retriever(use_compression: bool=False):
 
     if use_compression:
         # Add contextual compression
-        print("Using contextual compression retriever")
-        llm = get_llm()
-        compressor = LLMChainExtractor.from_llm(llm)
+        mode = compression_mode or settings.rag_compression_mode
+        print(f"Using contextual compression retriever, mode: {mode}")
+        if mode == "extractive":
+            compressor = ExtractiveCompressor(
+                embeddings=vectorstore.embedding_function,
+                max_tokens=settings.rag_compression_max_tokens,
+                min_similarity=settings.rag_compression_min_similarity,
+                embed_query=partial(embed_question, vectorstore)
+            )
+        elif mode == "llm":
+            compressor = LLMChainExtractor.from_llm(get_llm())
+        else:
+            raise ValueError(f"Unsupported compression mode: {mode}")
         retriever = ContextualCompressionRetriever(
             base_compressor=compressor,
             base_retriever=base_retriever
@@ -50,28 +78,455 @@ def get_retriever(use_compression: bool=False):
     return base_retriever
 
 
-def query_knowledge_base(question: str, k: int=3) -> list[str]:
+def embed_question(vectorstore: FAISS, question: str) -> list[float]:
+    """
+    Embed a user question, served from the query embedding cache when possible.
+
+    Args:
+        vectorstore: Vectorstore whose embeddings model is used
+        question: User question
+
+    Returns:
+        Query embedding
+    """
+    cache = get_query_embedding_cache()
+    key = normalize_query(question)
+
+    embedding = cache.get(key)
+    if embedding is None:
+        embedding = vectorstore.embedding_function.embed_query(key)
+        cache.put(key, embedding)
+
+    return embedding
+
+
+def query_knowledge_base(question: str, k: int=3, index_name: Optional[str]=None) -> list[str]:
     """
     Query knowledge base and return relevant documents.
 
     Args:
         question: Query question
         k: Number of documents to return
+        index_name: Index to search, defaults to settings.vectorstore_index_name
 
     Returns:
         List of relevant document texts
     """
     store_manager = get_vector_store_manager()
-    embeddings = get_embeddings()
-    vectorstore = store_manager.load_vectorstore(embeddings)
+    vectorstore = store_manager.get_vectorstore(index_name)
 
     if vectorstore is None:
         print(f"Vectorstore not available")
         return []
 
     try:
-        docs = vectorstore.similarity_search(question, k=k)
+        embedding = embed_question(vectorstore, question)
+        docs = vectorstore.similarity_search_by_vector(embedding, k=k)
         return [doc.page_content for doc in docs]
     except Exception as e:
         print(f"Failed to query knowledge base, error: {str(e)}")
         return []
+
+
+def relevance_from_distance(distance: float) -> float:
+    """
+    Convert a FAISS L2 distance into cosine similarity.
+    FAISS returns squared L2 distances, and for unit-length embeddings d^2 = 2 - 2 cos.
+
+    Args:
+        distance: Squared L2 distance
+
+    Returns:
+        Cosine similarity, 1.0 for identical vectors
+    """
+    return 1.0 - float(distance) / 2.0
+
+
+def _document_at(vectorstore: FAISS, position: int) -> Optional[Document]:
+    """Get the chunk stored at a FAISS position, or None if it is missing."""
+    chunk_id = vectorstore.index_to_docstore_id.get(position)
+    if chunk_id is None:
+        return None
+
+    doc = vectorstore.docstore.search(chunk_id)
+    return doc if isinstance(doc, Document) else None
+
+
+def _lexical_can_override(question: str) -> bool:
+    """
+    Check whether a question is specific enough for BM25 coverage to make a chunk relevant
+    regardless of its vector score: at least settings.rag_lexical_min_terms terms besides
+    stopwords, or an identifier such as an order id. Greetings and one-word small talk
+    ("hola") are left to the score threshold.
+    """
+    terms = tokenize(question)
+    return len(terms) >= settings.rag_lexical_min_terms or any(char.isdigit() for term in terms for char in term)
+
+
+def _is_confident(hits: List[LexicalHit], question: str) -> bool:
+    """
+    Check whether BM25 alone can answer: the question is specific enough, the best hit
+    matches (nearly) every query term, and clearly outranks the next one.
+    """
+    if not hits or hits[0].coverage < settings.rag_lexical_min_coverage or not _lexical_can_override(question):
+        return False
+
+    return len(hits) == 1 or hits[0].score >= settings.rag_lexical_min_margin * hits[1].score
+
+
+def _fuse_rankings(
+    vector_hits: List[Tuple[Document, float]],
+    lexical_hits: List[LexicalHit],
+    vectorstore: FAISS,
+    score_threshold: float,
+    k: int,
+    lexical_relevance: bool=True
+) -> List[Tuple[Document, float, bool]]:
+    """
+    Merge vector and BM25 rankings with reciprocal rank fusion.
+    A chunk is relevant if its cosine similarity reaches the threshold or it covers the query terms.
+
+    Args:
+        vector_hits: (document, L2 distance) pairs, best first
+        lexical_hits: BM25 hits, best first
+        vectorstore: Vectorstore the lexical positions refer to
+        score_threshold: Minimum cosine similarity
+        k: Maximum candidates to return
+        lexical_relevance: Whether covering the query terms makes a chunk relevant
+
+    Returns:
+        (document, fused score, relevant) tuples, best first
+    """
+    fused: Dict[str, List] = {}
+
+    for rank, (doc, distance) in enumerate(vector_hits):
+        entry = fused.setdefault(doc.id or doc.page_content, [doc, 0.0, False])
+        entry[1] += 1.0 / (settings.rag_rrf_k + rank + 1)
+        entry[2] = entry[2] or relevance_from_distance(distance) >= score_threshold
+
+    for rank, hit in enumerate(lexical_hits):
+        doc = _document_at(vectorstore, hit.position)
+        if doc is None:
+            continue
+        entry = fused.setdefault(doc.id or doc.page_content, [doc, 0.0, False])
+        entry[1] += 1.0 / (settings.rag_rrf_k + rank + 1)
+        entry[2] = entry[2] or (lexical_relevance and hit.coverage >= settings.rag_lexical_min_coverage)
+
+    ranked = sorted(fused.values(), key=lambda entry: entry[1], reverse=True)[:k]
+    return [(doc, score, relevant) for doc, score, relevant in ranked]
+
+
+def _search_lexical(lexical_index: Optional[LexicalIndex], question: str, k: int) -> List[LexicalHit]:
+    """Search the BM25 index in hybrid mode; no hits otherwise."""
+    if settings.rag_retrieval_mode != "hybrid" or lexical_index is None:
+        return []
+
+    return lexical_index.search(question, k)
+
+
+def _lexical_ranking(vectorstore: FAISS, lexical_hits: List[LexicalHit]) -> List[Tuple[Document, float, bool]]:
+    """Rank candidates from BM25 hits alone, scored by query coverage."""
+    ranked = []
+    for hit in lexical_hits:
+        doc = _document_at(vectorstore, hit.position)
+        if doc is not None:
+            ranked.append((doc, hit.coverage, hit.coverage >= settings.rag_lexical_min_coverage))
+    return ranked
+
+
+def _vector_ranking(
+    vectorstore: FAISS,
+    vector_hits: List[Tuple[Document, float]],
+    lexical_hits: List[LexicalHit],
+    score_threshold: float,
+    k: int,
+    question: str
+) -> Tuple[str, List[Tuple[Document, float, bool]]]:
+    """Rank candidates from vector hits, fused with BM25 hits when there are any."""
+    if lexical_hits:
+        return "hybrid", _fuse_rankings(
+            vector_hits, lexical_hits, vectorstore, score_threshold, k, _lexical_can_override(question)
+        )
+
+    ranked = []
+    for doc, distance in vector_hits:
+        relevance = relevance_from_distance(distance)
+        ranked.append((doc, relevance, relevance >= score_threshold))
+    return "vector", ranked
+
+
+def _select_context(retrieval: str, ranked: List[Tuple[Document, float, bool]], max_tokens: int) -> RagContext:
+    """Inject relevant candidates best first until the token budget is reached."""
+    context = RagContext(retrieval=retrieval, candidates=len(ranked))
+    for position, (doc, score, relevant) in enumerate(ranked):
+        if not relevant:
+            context.below_threshold += 1
+            continue
+
+        tokens = count_tokens(doc.page_content)
+        if context.tokens + tokens > max_tokens:
+            # Budget reached: lower-ranked relevant hits are not injected either
+            context.over_budget += sum(1 for _, _, rest_relevant in ranked[position:] if rest_relevant)
+            break
+
+        context.chunks.append(doc.page_content)
+        context.scores.append(round(score, 4))
+        context.tokens += tokens
+
+    print(f"Selected RAG context, retrieval: {context.retrieval}, candidates: {context.candidates}, "
+          f"injected: {len(context.chunks)}, tokens: {context.tokens}, below_threshold: {context.below_threshold}, "
+          f"over_budget: {context.over_budget}")
+    return context
+
+
+def _language_partition(index_name: Optional[str], language: Optional[str]) -> Optional[str]:
+    """
+    Get the language partition to search before the whole index.
+
+    Args:
+        index_name: Global index, defaults to settings.vectorstore_index_name
+        language: Language detected for the question
+
+    Returns:
+        Partition index name, or None if routing is off or the index has no partition for the
+        language built from the version it is serving
+    """
+    if not settings.rag_language_routing or not language:
+        return None
+
+    store_manager = get_vector_store_manager()
+    name = index_name or store_manager.index_name
+    partition = language_index_name(name, language)
+    if not store_manager.exists(partition):
+        return None
+    if store_manager.source_version(partition) != store_manager.current_version(name):
+        print(f"Ignored out of date language partition, index_name: {name}, language: {language}")
+        return None
+    return partition
+
+
+def retrieve_context(
+    question: str,
+    k: Optional[int]=None,
+    score_threshold: Optional[float]=None,
+    max_tokens: Optional[int]=None,
+    index_name: Optional[str]=None,
+    language: Optional[str]=None
+) -> RagContext:
+    """
+    Select knowledge base context for a prompt.
+    Hits scoring below the relevance threshold are dropped, and the rest are added
+    best first until the token budget is reached, so turns the KB cannot help with
+    add no prompt tokens at all.
+
+    In hybrid mode the BM25 index is searched first: when its best hit covers the
+    question and clearly outranks the rest (order ids, product names, FAQ keywords),
+    the context is built from it without embedding the question. Otherwise vector
+    and BM25 rankings are fused.
+
+    With a language, its partition of the index is searched first; the whole index
+    is searched when there is no partition or it has no relevant chunk.
+
+    Args:
+        question: User question
+        k: Candidates to search, defaults to settings.rag_top_k
+        score_threshold: Minimum cosine similarity, defaults to settings.rag_score_threshold
+        max_tokens: Token budget, defaults to settings.rag_context_max_tokens
+        index_name: Index to search, defaults to settings.vectorstore_index_name
+        language: Language detected for the question
+
+    Returns:
+        RagContext with the injected chunks and how many tokens they use
+    """
+    k = k or settings.rag_top_k
+    score_threshold = settings.rag_score_threshold if score_threshold is None else score_threshold
+    max_tokens = settings.rag_context_max_tokens if max_tokens is None else max_tokens
+
+    partition = _language_partition(index_name, language)
+    if partition is not None:
+        context = retrieve_context(question, k, score_threshold, max_tokens, index_name=partition)
+        if context.chunks:
+            context.language = language
+            return context
+
+    vectorstore, lexical_index = get_vector_store_manager().get_search_indexes(index_name)
+    if vectorstore is None:
+        print(f"Vectorstore not available")
+        return RagContext()
+
+    try:
+        lexical_hits = _search_lexical(lexical_index, question, k)
+        if _is_confident(lexical_hits, question):
+            retrieval, ranked = "lexical", _lexical_ranking(vectorstore, lexical_hits)
+        else:
+            embedding = embed_question(vectorstore, question)
+            vector_hits = vectorstore.similarity_search_with_score_by_vector(embedding, k=k)
+            retrieval, ranked = _vector_ranking(vectorstore, vector_hits, lexical_hits, score_threshold, k, question)
+    except Exception as e:
+        print(f"Failed to query knowledge base, error: {str(e)}")
+        return RagContext()
+
+    return _select_context(retrieval, ranked, max_tokens)
+
+
+def get_search_executor() -> ThreadPoolExecutor:
+    """
+    Get the bounded thread pool that runs index loads and searches for async callers.
+    FAISS and numpy release the GIL, so searches run in parallel without blocking the event loop.
+
+    Returns:
+        ThreadPoolExecutor singleton
+    """
+    global _search_executor
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                _search_executor = ThreadPoolExecutor(
+                    max_workers=settings.rag_search_workers,
+                    thread_name_prefix="rag-search"
+                )
+    return _search_executor
+
+
+def shutdown_search_executor() -> None:
+    """Stop the search thread pool, waiting for running searches."""
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is not None:
+            _search_executor.shutdown(wait=True)
+            _search_executor = None
+
+
+async def _run_search(func, *args, **kwargs):
+    """Run a blocking search step on the search executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_search_executor(), partial(func, *args, **kwargs))
+
+
+async def aembed_question(vectorstore: FAISS, question: str) -> list[float]:
+    """
+    Embed a user question without blocking the event loop.
+    Uses the provider's native async client (aembed_query) and the same cache as embed_question.
+
+    Args:
+        vectorstore: Vectorstore whose embeddings model is used
+        question: User question
+
+    Returns:
+        Query embedding
+    """
+    cache = get_query_embedding_cache()
+    key = normalize_query(question)
+
+    embedding = cache.get(key)
+    if embedding is None:
+        embedding = await vectorstore.embedding_function.aembed_query(key)
+        cache.put(key, embedding)
+
+    return embedding
+
+
+async def aembed_user_question(question: str, index_name: Optional[str]=None) -> Optional[list[float]]:
+    """
+    Embed a user question with the resident vectorstore's model, sharing the query
+    embedding cache with retrieval so the question is embedded only once per turn.
+
+    Args:
+        question: User question
+        index_name: Index whose model is used, defaults to settings.vectorstore_index_name
+
+    Returns:
+        Query embedding, or None if the index has not been ingested yet
+    """
+    vectorstore = await _run_search(get_vector_store_manager().get_vectorstore, index_name)
+    if vectorstore is None:
+        return None
+
+    return await aembed_question(vectorstore, question)
+
+
+async def aquery_knowledge_base(question: str, k: int=3, index_name: Optional[str]=None) -> list[str]:
+    """
+    Async query_knowledge_base: the index load and FAISS search run on the search
+    executor and the embedding call is awaited, so the event loop keeps serving requests.
+
+    Args:
+        question: Query question
+        k: Number of documents to return
+        index_name: Index to search, defaults to settings.vectorstore_index_name
+
+    Returns:
+        List of relevant document texts
+    """
+    store_manager = get_vector_store_manager()
+    vectorstore = await _run_search(store_manager.get_vectorstore, index_name)
+
+    if vectorstore is None:
+        print(f"Vectorstore not available")
+        return []
+
+    try:
+        embedding = await aembed_question(vectorstore, question)
+        docs = await _run_search(vectorstore.similarity_search_by_vector, embedding, k=k)
+        return [doc.page_content for doc in docs]
+    except Exception as e:
+        print(f"Failed to query knowledge base, error: {str(e)}")
+        return []
+
+
+async def aretrieve_context(
+    question: str,
+    k: Optional[int]=None,
+    score_threshold: Optional[float]=None,
+    max_tokens: Optional[int]=None,
+    index_name: Optional[str]=None,
+    language: Optional[str]=None
+) -> RagContext:
+    """
+    Async retrieve_context for the event loop.
+    Blocking steps (index load, BM25 and FAISS searches, chunk reads) run on the bounded
+    search executor and the question is embedded with the provider's async client.
+
+    Args:
+        question: User question
+        k: Candidates to search, defaults to settings.rag_top_k
+        score_threshold: Minimum cosine similarity, defaults to settings.rag_score_threshold
+        max_tokens: Token budget, defaults to settings.rag_context_max_tokens
+        index_name: Index to search, defaults to settings.vectorstore_index_name
+        language: Language detected for the question, its partition is searched first
+
+    Returns:
+        RagContext with the injected chunks and how many tokens they use
+    """
+    k = k or settings.rag_top_k
+    score_threshold = settings.rag_score_threshold if score_threshold is None else score_threshold
+    max_tokens = settings.rag_context_max_tokens if max_tokens is None else max_tokens
+
+    partition = await _run_search(_language_partition, index_name, language)
+    if partition is not None:
+        # A fallback search reuses the cached query embedding
+        context = await aretrieve_context(question, k, score_threshold, max_tokens, index_name=partition)
+        if context.chunks:
+            context.language = language
+            return context
+
+    vectorstore, lexical_index = await _run_search(get_vector_store_manager().get_search_indexes, index_name)
+    if vectorstore is None:
+        print(f"Vectorstore not available")
+        return RagContext()
+
+    try:
+        lexical_hits = await _run_search(_search_lexical, lexical_index, question, k)
+        if _is_confident(lexical_hits, question):
+            retrieval, ranked = "lexical", await _run_search(_lexical_ranking, vectorstore, lexical_hits)
+        else:
+            embedding = await aembed_question(vectorstore, question)
+            vector_hits = await _run_search(vectorstore.similarity_search_with_score_by_vector, embedding, k=k)
+            retrieval, ranked = await _run_search(
+                _vector_ranking, vectorstore, vector_hits, lexical_hits, score_threshold, k, question
+            )
+    except Exception as e:
+        print(f"Failed to query knowledge base, error: {str(e)}")
+        return RagContext()
+
+    return _select_context(retrieval, ranked, max_tokens)
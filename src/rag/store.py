@@ -1,15 +1,99 @@
 """
 FAISS vector store management.
 """
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
 from langchain.embeddings.base import Embeddings
 from config.settings import settings
+from llm.models import get_embeddings
+from utils.jsonio import write_json, safe_read_json
+from utils.validators import validate_index_name
+from beans.schemas.ingest.ingest_manifest_dto import IngestManifest
+from beans.schemas.ingest.index_config_dto import IndexConfig
+from rag.index_factory import read_index
+from rag.chunk_store import ChunkStore, chunk_store_exists, write_chunk_store
+from rag.lexical import LexicalIndex, lexical_index_exists, write_lexical_index
+
+# Raw FAISS index, saved inside the index directory
+INDEX_FILE_NAME = "index.faiss"
+
+# Pickled docstore saved by earlier versions (FAISS.save_local)
+LEGACY_DOCSTORE_FILE_NAME = "index.pkl"
+
+# Manifest describing the indexed files, saved inside the index directory
+MANIFEST_FILE_NAME = "manifest.json"
+
+# FAISS index type and parameters, saved inside the index directory
+INDEX_CONFIG_FILE_NAME = "index_config.json"
+
+# Saved versions of an index, one directory each, inside the index directory
+VERSIONS_DIR_NAME = ".versions"
+
+# File naming the version being served, replaced atomically on each save or rollback
+CURRENT_FILE_NAME = "CURRENT"
+
+# File of a derived index (a language partition) naming the version of the index it was built from
+SOURCE_VERSION_FILE_NAME = "SOURCE_VERSION"
+
+# Locks serializing index loads, shared by index name hash so client-chosen names add no state
+LOAD_LOCK_STRIPES = 64
+
+# (inode, mtime) of an index's CURRENT file, None for indexes saved before versioning
+PointerState = Optional[Tuple[int, int]]
+
+
+class ResidentIndex:
+    """A loaded vectorstore, its lexical index and their size on disk."""
+
+    __slots__ = ("vectorstore", "lexical_index", "nbytes", "generation", "version", "pointer")
+
+    def __init__(
+        self,
+        vectorstore: FAISS,
+        lexical_index: Optional[LexicalIndex],
+        nbytes: int,
+        generation: int,
+        version: Optional[str]=None,
+        pointer: PointerState=None
+    ):
+        """
+        Initialize resident index.
+
+        Args:
+            vectorstore: Loaded FAISS vectorstore
+            lexical_index: Loaded BM25 index, if any
+            nbytes: Bytes of the index files, charged against the memory budget
+            generation: Generation of this index when it became resident
+            version: Saved version loaded, None for indexes saved before versioning
+            pointer: State of the CURRENT file when loaded, compared on each query
+        """
+        self.vectorstore = vectorstore
+        self.lexical_index = lexical_index
+        self.nbytes = nbytes
+        self.generation = generation
+        self.version = version
+        self.pointer = pointer
 
 
 class VectorStoreManager:
-    """Manages FAISS vector store persistence."""
+    """
+    Manages FAISS vector store persistence for any number of named indexes.
+    Keeps a bounded LRU of loaded indexes resident per process so queries do not
+    hit the disk on every turn, without loading every KB a process may serve.
+
+    Each save writes a new version directory under `<index>/.versions/` and then
+    atomically points `<index>/CURRENT` at it, so a worker loading mid-ingestion
+    reads either the old or the new index, never a torn one. Workers stat the
+    pointer on each query and reload only when it changed.
+    """
 
     def __init__(self):
         """Initialize vector store manager."""
@@ -17,61 +101,642 @@ class VectorStoreManager:
         self.index_name = settings.vectorstore_index_name
         self.store_path.mkdir(parents=True, exist_ok=True)
 
-    def save_vectorstore(self, vectorstore: FAISS) -> None:
+        # Resident indexes by name, least recently used first; a vectorstore and
+        # its lexical index are swapped together after each ingestion
+        self.max_loaded = max(1, int(settings.vectorstore_max_loaded_indexes))
+        self.max_loaded_bytes = int(settings.vectorstore_max_loaded_mb) * 1024 * 1024
+        self._lock = threading.Lock()
+        self._load_locks = [threading.Lock() for _ in range(LOAD_LOCK_STRIPES)]
+        self._resident: "OrderedDict[str, ResidentIndex]" = OrderedDict()
+        self._embeddings: Optional[Embeddings] = None
+        self._generations: Dict[str, int] = {}
+        self._generation = 0
+        self.keep_versions = max(1, int(settings.vectorstore_keep_versions))
+
+    def _index_path(self, index_name: Optional[str]) -> Path:
+        """Get the directory of an index, the configured one if no name is given."""
+        return self.store_path / self._resolve_name(index_name)
+
+    def _resolve_name(self, index_name: Optional[str]) -> str:
+        """
+        Get the index name to use, the configured one if no name is given.
+
+        Raises:
+            ValueError: If the name could escape the store directory
+        """
+        if index_name is None:
+            return self.index_name
+
+        is_valid, error = validate_index_name(index_name, allow_partitions=True)
+        if not is_valid:
+            raise ValueError(f"Invalid index name: {index_name!r}, {error}")
+        return index_name
+
+    def _versions_path(self, index_name: Optional[str]) -> Path:
+        """Get the directory holding the saved versions of an index."""
+        return self._index_path(index_name) / VERSIONS_DIR_NAME
+
+    def current_version(self, index_name: Optional[str]=None) -> Optional[str]:
+        """
+        Get the version an index is serving.
+
+        Args:
+            index_name: Index name, defaults to settings.vectorstore_index_name
+
+        Returns:
+            Version id or None for indexes never saved, or saved before versioning
+        """
+        try:
+            version = (self._index_path(index_name) / CURRENT_FILE_NAME).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return version or None
+
+    def list_versions(self, index_name: Optional[str]=None) -> List[str]:
+        """
+        Get the saved versions of an index.
+
+        Args:
+            index_name: Index name, defaults to settings.vectorstore_index_name
+
+        Returns:
+            Version ids, oldest first
+        """
+        versions_path = self._versions_path(index_name)
+        if not versions_path.exists():
+            return []
+        return sorted(path.name for path in versions_path.iterdir() if path.is_dir())
+
+    def _current_path(self, index_name: Optional[str]) -> Path:
+        """Get the directory of the version an index is serving, the index directory itself before versioning."""
+        version = self.current_version(index_name)
+        if version is not None:
+            path = self._versions_path(index_name) / version
+            if path.exists():
+                return path
+        return self._index_path(index_name)
+
+    def _pointer_state(self, index_name: Optional[str]) -> PointerState:
+        """Stat the CURRENT file of an index: a cheap check of whether another process saved a new version."""
+        try:
+            stat = os.stat(self._index_path(index_name) / CURRENT_FILE_NAME)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _write_pointer(self, index_name: Optional[str], file_name: str, version: str) -> None:
+        """Atomically write a version file of an index: write a temporary file, fsync it and rename it over."""
+        index_path = self._index_path(index_name)
+        index_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path / f".{file_name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, index_path / file_name)
+        _fsync_directory(index_path)
+
+    def _set_current(self, index_name: Optional[str], version: str) -> None:
+        """Atomically point an index at a version."""
+        self._write_pointer(index_name, CURRENT_FILE_NAME, version)
+
+    def source_version(self, index_name: str) -> Optional[str]:
+        """
+        Get the version of the index a derived index (a language partition) was built from.
+
+        Args:
+            index_name: Derived index name
+
+        Returns:
+            Version id, or None if it was never recorded
+        """
+        try:
+            version = (self._index_path(index_name) / SOURCE_VERSION_FILE_NAME).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return version or None
+
+    def set_source_version(self, index_name: str, version: Optional[str]) -> None:
+        """
+        Record the version of the index a derived index (a language partition) was built from.
+
+        Args:
+            index_name: Derived index name
+            version: Version id of the source index, None for one saved before versioning
+        """
+        self._write_pointer(index_name, SOURCE_VERSION_FILE_NAME, version or "")
+
+    def _prune_versions(self, index_name: Optional[str]) -> None:
+        """Delete the oldest versions beyond settings.vectorstore_keep_versions, never the current one."""
+        index_path = self._index_path(index_name)
+        current = self.current_version(index_name)
+        versions = self.list_versions(index_name)
+        for version in versions[:-self.keep_versions]:
+            if version != current:
+                shutil.rmtree(self._versions_path(index_name) / version, ignore_errors=True)
+                print(f"Pruned index version, path: {str(index_path)}, version: {version}")
+
+        # Files saved straight into the index directory before versioning, no longer read
+        for path in index_path.iterdir():
+            if path.is_file() and path.name not in (CURRENT_FILE_NAME, SOURCE_VERSION_FILE_NAME) \
+                    and not path.name.startswith("."):
+                path.unlink(missing_ok=True)
+
+    def save_vectorstore(
+        self,
+        vectorstore: FAISS,
+        index_name: Optional[str]=None,
+        manifest: Optional[IngestManifest]=None,
+        index_config: Optional[IndexConfig]=None
+    ) -> str:
         """
-        Save FAISS vectorstore to disk.
+        Save FAISS vectorstore to disk as a new version of the index: the raw FAISS
+        index plus a chunk store with the text and metadata of each vector (no
+        pickled docstore), its lexical index, manifest and config.
+        The version is fsynced before CURRENT is switched to it, so a crash or a
+        concurrent load never sees half an index. The newest
+        settings.vectorstore_keep_versions versions are kept for rollback.
 
         Args:
             vectorstore: FAISS vectorstore instance
+            index_name: Index to save, defaults to settings.vectorstore_index_name
+            manifest: Manifest describing the saved index
+            index_config: Config the saved index was built with
+
+        Returns:
+            Version id now current
         """
         try:
-            full_path = self.store_path / self.index_name
-            vectorstore.save_local(str(full_path))
-            print(f"Saved vectorstore, path: {str(full_path)}")
+            version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            full_path = self._versions_path(index_name) / version
+            full_path.mkdir(parents=True)
+
+            faiss.write_index(vectorstore.index, str(full_path / INDEX_FILE_NAME))
+
+            ids = [vectorstore.index_to_docstore_id[position] for position in range(vectorstore.index.ntotal)]
+            documents = [vectorstore.docstore.search(chunk_id) for chunk_id in ids]
+            write_chunk_store(full_path, ids, documents)
+            write_lexical_index(full_path, (document.page_content for document in documents))
+
+            if manifest is not None:
+                write_json(full_path / MANIFEST_FILE_NAME, manifest.model_dump())
+            if index_config is not None:
+                write_json(full_path / INDEX_CONFIG_FILE_NAME, index_config.model_dump())
+
+            _fsync_tree(full_path)
+            self._set_current(index_name, version)
+            self._prune_versions(index_name)
+
+            print(f"Saved vectorstore, path: {str(full_path)}, version: {version}")
+            return version
         except Exception as e:
             print(f"Failed to save vectorstore, error: {str(e)}")
             raise
 
-    def load_vectorstore(self, embeddings: Embeddings) -> Optional[FAISS]:
+    def activate_version(self, version: str, index_name: Optional[str]=None) -> str:
+        """
+        Serve a saved version of an index. Every worker picks it up on its next query.
+
+        Args:
+            version: Version id, one of list_versions()
+            index_name: Index name, defaults to settings.vectorstore_index_name
+
+        Returns:
+            Version id now current
+
+        Raises:
+            ValueError: If the index has no such version
+        """
+        if version not in self.list_versions(index_name):
+            raise ValueError(f"Index version not found, version: {version}")
+
+        self._set_current(index_name, version)
+        print(f"Activated index version, index_name: {self._resolve_name(index_name)}, version: {version}")
+        return version
+
+    def rollback(self, index_name: Optional[str]=None) -> str:
+        """
+        Serve the version saved before the current one.
+
+        Args:
+            index_name: Index name, defaults to settings.vectorstore_index_name
+
+        Returns:
+            Version id now current
+
+        Raises:
+            ValueError: If there is no older version to roll back to
+        """
+        current = self.current_version(index_name)
+        older = [version for version in self.list_versions(index_name) if current is None or version < current]
+        if not older:
+            raise ValueError(f"No previous index version, current: {current}")
+        return self.activate_version(older[-1], index_name)
+
+    def load_vectorstore(
+        self,
+        embeddings: Embeddings,
+        writable: bool=False,
+        index_name: Optional[str]=None
+    ) -> Optional[FAISS]:
         """
         Load FAISS vectorstore from disk.
+        Read-only vectorstores keep chunk texts on disk and read only the hits of each
+        search, so load time does not grow with the corpus text; with
+        settings.vectorstore_mmap the FAISS index is memory-mapped too and shared by
+        every worker process. Writable vectorstores are fully loaded in memory so
+        ingestion can add and delete chunks.
 
         Args:
             embeddings: Embeddings model to use
+            writable: Load an in-memory copy that can be updated
+            index_name: Index to load, defaults to settings.vectorstore_index_name
 
         Returns:
             FAISS vectorstore or None if not found
         """
-        try:
-            full_path = self.store_path / self.index_name
+        return self._load_vectorstore_at(self._current_path(index_name), embeddings, writable)
 
+    def _load_vectorstore_at(self, full_path: Path, embeddings: Embeddings, writable: bool=False) -> Optional[FAISS]:
+        """Load the vectorstore saved in an index or version directory, see load_vectorstore()."""
+        try:
             if not full_path.exists():
                 print(f"Vectorstore not found, path: {str(full_path)}")
                 return None
 
-            vectorstore = FAISS.load_local(
-                str(full_path),
-                embeddings,
-                allow_dangerous_deserialization=True
+            if not chunk_store_exists(full_path):
+                if (full_path / LEGACY_DOCSTORE_FILE_NAME).exists():
+                    print(f"Vectorstore saved with a pickled docstore is no longer loaded, "
+                          f"re-ingest the knowledge base, path: {str(full_path)}")
+                else:
+                    print(f"Vectorstore not found, path: {str(full_path)}")
+                return None
+
+            index_config = self._read_index_config(full_path)
+            mmap = settings.vectorstore_mmap and not writable
+            index = read_index(full_path / INDEX_FILE_NAME, index_config, mmap=mmap)
+            chunk_store = ChunkStore(full_path)
+
+            if writable:
+                docstore = InMemoryDocstore({document.id: document for document in chunk_store})
+                index_to_docstore_id = dict(chunk_store.position_ids())
+            else:
+                docstore = chunk_store
+                index_to_docstore_id = chunk_store.position_ids()
+
+            vectorstore = FAISS(
+                embedding_function=embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id
             )
-            print(f"Loaded vectorstore, path: {str(full_path)}")
+            print(f"Loaded vectorstore, path: {str(full_path)}, chunks: {len(chunk_store)}, "
+                  f"writable: {writable}, mmap: {mmap}")
             return vectorstore
 
         except Exception as e:
             print(f"Failed to load vectorstore, error: {str(e)}")
             return None
 
-    def exists(self) -> bool:
+    def save_manifest(self, manifest: IngestManifest, index_name: Optional[str]=None) -> None:
+        """
+        Save ingestion manifest into the current version of the index.
+
+        Args:
+            manifest: Manifest describing the saved index
+            index_name: Index the manifest belongs to, defaults to settings.vectorstore_index_name
+        """
+        manifest_path = self._current_path(index_name) / MANIFEST_FILE_NAME
+        write_json(manifest_path, manifest.model_dump())
+
+    def load_manifest(self, index_name: Optional[str]=None) -> Optional[IngestManifest]:
+        """
+        Load the ingestion manifest of the current version of the index.
+
+        Args:
+            index_name: Index the manifest belongs to, defaults to settings.vectorstore_index_name
+
+        Returns:
+            IngestManifest or None if missing or unreadable
+        """
+        manifest_path = self._current_path(index_name) / MANIFEST_FILE_NAME
+        if not manifest_path.exists():
+            return None
+
+        data = safe_read_json(manifest_path, default=None)
+        if data is None:
+            return None
+
+        try:
+            return IngestManifest(**data)
+        except Exception as e:
+            print(f"Invalid ingestion manifest, path: {str(manifest_path)}, error: {str(e)}")
+            return None
+
+    def save_index_config(self, index_config: IndexConfig, index_name: Optional[str]=None) -> None:
+        """
+        Save the FAISS index type and parameters into the current version of the index.
+
+        Args:
+            index_config: Config the saved index was built with
+            index_name: Index the config belongs to, defaults to settings.vectorstore_index_name
+        """
+        config_path = self._current_path(index_name) / INDEX_CONFIG_FILE_NAME
+        write_json(config_path, index_config.model_dump())
+
+    def load_index_config(self, index_name: Optional[str]=None) -> Optional[IndexConfig]:
+        """
+        Load the FAISS index type and parameters of the current version of the index.
+
+        Args:
+            index_name: Index the config belongs to, defaults to settings.vectorstore_index_name
+
+        Returns:
+            IndexConfig or None if missing or unreadable (indexes saved before it existed are flat)
+        """
+        return self._read_index_config(self._current_path(index_name))
+
+    @staticmethod
+    def _read_index_config(directory: Path) -> Optional[IndexConfig]:
+        """Read the index config saved in an index or version directory."""
+        config_path = directory / INDEX_CONFIG_FILE_NAME
+        if not config_path.exists():
+            return None
+
+        data = safe_read_json(config_path, default=None)
+        if data is None:
+            return None
+
+        try:
+            return IndexConfig(**data)
+        except Exception as e:
+            print(f"Invalid index config, path: {str(config_path)}, error: {str(e)}")
+            return None
+
+    def load_lexical_index(self, index_name: Optional[str]=None) -> Optional[LexicalIndex]:
+        """
+        Load the BM25 index of the current version of the index.
+
+        Args:
+            index_name: Index the BM25 index belongs to, defaults to settings.vectorstore_index_name
+
+        Returns:
+            LexicalIndex or None if missing or unreadable
+        """
+        return self._read_lexical_index(self._current_path(index_name))
+
+    @staticmethod
+    def _read_lexical_index(full_path: Path) -> Optional[LexicalIndex]:
+        """Read the BM25 index saved in an index or version directory."""
+        if not lexical_index_exists(full_path):
+            return None
+
+        try:
+            return LexicalIndex(full_path)
+        except Exception as e:
+            print(f"Failed to load lexical index, error: {str(e)}")
+            return None
+
+    def get_search_indexes(self, index_name: Optional[str]=None) -> Tuple[Optional[FAISS], Optional[LexicalIndex]]:
+        """
+        Get a resident vectorstore and its lexical index, loading them from disk only
+        when they are not in the LRU or another process saved a new version since.
+        Both always come from the same ingestion.
+
+        Args:
+            index_name: Index to search, defaults to settings.vectorstore_index_name
+
+        Returns:
+            Tuple of (vectorstore, lexical_index); vectorstore is None if the index has not been ingested yet
+        """
+        name = self._resolve_name(index_name)
+        pointer = self._pointer_state(name)
+
+        with self._lock:
+            resident = self._resident.get(name)
+            if resident is not None and resident.pointer == pointer:
+                self._resident.move_to_end(name)
+                return resident.vectorstore, resident.lexical_index
+
+        # One load per index at a time; other indexes keep serving meanwhile
+        with self._load_locks[hash(name) % LOAD_LOCK_STRIPES]:
+            with self._lock:
+                resident = self._resident.get(name)
+                if resident is not None and resident.pointer == pointer:
+                    return resident.vectorstore, resident.lexical_index
+
+            if self._embeddings is None:
+                self._embeddings = get_embeddings()
+
+            # Read the pointer once, so the vectorstore and lexical index come from the same version
+            full_path = self._current_path(name)
+            loaded = self._load_vectorstore_at(full_path, self._embeddings)
+            if loaded is None:
+                return None, None
+
+            if resident is not None:
+                print(f"Index version changed, reloading, index_name: {name}, version: {self.current_version(name)}")
+            lexical_index = self._read_lexical_index(full_path)
+            self._make_resident(name, loaded, lexical_index, full_path, pointer)
+            return loaded, lexical_index
+
+    def get_vectorstore(self, index_name: Optional[str]=None) -> Optional[FAISS]:
+        """
+        Get a resident vectorstore, loading it from disk only when it is not in the LRU.
+
+        Args:
+            index_name: Index to search, defaults to settings.vectorstore_index_name
+
+        Returns:
+            FAISS vectorstore or None if the index has not been ingested yet
+        """
+        return self.get_search_indexes(index_name)[0]
+
+    def _make_resident(
+        self,
+        name: str,
+        vectorstore: FAISS,
+        lexical_index: Optional[LexicalIndex],
+        full_path: Path,
+        pointer: PointerState
+    ) -> int:
+        """
+        Put an index at the head of the LRU, evicting the least recently used ones
+        beyond the count and memory limits. The new index itself is never evicted.
+
+        Returns:
+            New generation number of the index
+        """
+        nbytes = index_nbytes(full_path)
+        version = full_path.name if full_path.parent.name == VERSIONS_DIR_NAME else None
+        with self._lock:
+            self._generation += 1
+            generation = self._generations.get(name, 0) + 1
+            self._generations[name] = generation
+            self._resident[name] = ResidentIndex(vectorstore, lexical_index, nbytes, generation, version, pointer)
+            self._resident.move_to_end(name)
+
+            while len(self._resident) > 1 and (
+                len(self._resident) > self.max_loaded
+                or (self.max_loaded_bytes and self.loaded_bytes > self.max_loaded_bytes)
+            ):
+                evicted, _ = self._resident.popitem(last=False)
+                print(f"Evicted resident index, index_name: {evicted}")
+
+            print(f"Index resident, index_name: {name}, version: {version}, generation: {generation}, "
+                  f"loaded: {len(self._resident)}, loaded_mb: {round(self.loaded_bytes / 1024 / 1024, 1)}")
+            return generation
+
+    def swap_vectorstore(self, vectorstore: FAISS, index_name: Optional[str]=None) -> int:
+        """
+        Atomically replace a resident vectorstore with a fully built one.
+        Its lexical index is read from disk, so the vectorstore must have been saved first.
+        Readers holding the previous instance keep using it until they finish.
+
+        Args:
+            vectorstore: Complete FAISS vectorstore to serve from now on
+            index_name: Index being replaced, defaults to settings.vectorstore_index_name
+
+        Returns:
+            New generation number of the index
+        """
+        name = self._resolve_name(index_name)
+        pointer = self._pointer_state(name)
+        full_path = self._current_path(name)
+        return self._make_resident(name, vectorstore, self._read_lexical_index(full_path), full_path, pointer)
+
+    def release_vectorstore(self, index_name: Optional[str]=None) -> None:
+        """
+        Drop resident indexes so the next query reloads them from disk.
+
+        Args:
+            index_name: Index to drop, all of them if None
+        """
+        with self._lock:
+            if index_name is None:
+                self._resident.clear()
+            else:
+                self._resident.pop(self._resolve_name(index_name), None)
+
+    def served_version(self, index_name: Optional[str]=None) -> Optional[str]:
+        """
+        Get the version of an index this process serves: the resident one, or the
+        current one on disk when it is not resident. Unlike generation_of, it does
+        not change when an index is evicted and reloaded unchanged.
+
+        Args:
+            index_name: Index name, defaults to settings.vectorstore_index_name
+
+        Returns:
+            Version id, None for indexes never saved or saved before versioning
+        """
+        name = self._resolve_name(index_name)
+        with self._lock:
+            resident = self._resident.get(name)
+        if resident is not None:
+            return resident.version
+        return self.current_version(name)
+
+    @property
+    def generation(self) -> int:
+        """Number of times any index has been (re)loaded or swapped."""
+        return self._generation
+
+    def generation_of(self, index_name: Optional[str]=None) -> int:
+        """
+        Get the number of times an index has been (re)loaded or swapped in this process.
+        A reload can bring in an ingestion made by another process, so cached results
+        tied to an older generation are stale.
+
+        Args:
+            index_name: Index name, defaults to settings.vectorstore_index_name
+
+        Returns:
+            Generation of the index, 0 if never loaded
+        """
+        return self._generations.get(self._resolve_name(index_name), 0)
+
+    @property
+    def loaded_bytes(self) -> int:
+        """Bytes of the index files of every resident index."""
+        return sum(resident.nbytes for resident in self._resident.values())
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Get the resident indexes and their memory accounting.
+
+        Returns:
+            Dictionary with the loaded indexes (most recently used last) and the limits
+        """
+        with self._lock:
+            loaded: List[Dict[str, object]] = [
+                {
+                    "index_name": name,
+                    "version": resident.version,
+                    "bytes": resident.nbytes,
+                    "generation": resident.generation
+                }
+                for name, resident in self._resident.items()
+            ]
+        return {
+            "loaded": loaded,
+            "loaded_bytes": sum(entry["bytes"] for entry in loaded),
+            "max_loaded": self.max_loaded,
+            "max_loaded_bytes": self.max_loaded_bytes
+        }
+
+    def exists(self, index_name: Optional[str]=None) -> bool:
         """
         Check if vectorstore exists on disk.
 
+        Args:
+            index_name: Index name, defaults to settings.vectorstore_index_name
+
         Returns:
             True if vectorstore exists
         """
-        full_path = self.store_path / self.index_name
+        full_path = self._index_path(index_name)
         return full_path.exists()
 
 
+def index_nbytes(directory: Path) -> int:
+    """
+    Get the size of an index's files, the memory it can take once loaded.
+    Nested indexes ("kb" and "kb/es") and other versions are counted separately.
+
+    Args:
+        directory: Index or version directory
+
+    Returns:
+        Total bytes of the files directly inside `directory`
+    """
+    try:
+        return sum(path.stat().st_size for path in directory.iterdir() if path.is_file())
+    except OSError:
+        return 0
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush a directory's entries to disk, so files created or renamed in it survive a crash."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_tree(directory: Path) -> None:
+    """Flush every file of a freshly written version directory, then the directory itself."""
+    for path in directory.rglob("*"):
+        if path.is_file():
+            with open(path, "rb") as f:
+                os.fsync(f.fileno())
+    _fsync_directory(directory)
+    _fsync_directory(directory.parent)
+
+
 # Global vector store manager
 _store_manager: Optional[VectorStoreManager] = None
 
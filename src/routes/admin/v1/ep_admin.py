@@ -1,12 +1,21 @@
 """
 Admin endpoints for ingestion, stats, and management.
 """
+import asyncio
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Header, status
 
-from rag.ingest import ingest_knowledge_base
+from services.ingest_jobs import IngestJobRunningError, get_ingest_job_manager
+from rag.query_cache import get_query_embedding_cache
+from rag.answer_cache import get_answer_cache
+from rag.store import get_vector_store_manager
+from llm.embedding_cache import get_embedding_cache_stats
 from services.storage import get_storage_service
 from beans.api.admin.ingest_response_dto import IngestResponse
 from beans.api.admin.ingest_request_dto import IngestRequest
+from beans.api.admin.index_rollback_request_dto import IndexRollbackRequest
+from beans.api.admin.index_versions_response_dto import IndexVersionsResponse
+from beans.schemas.ingest.ingest_job_dto import IngestJob
 from routes.admin.utils import admin_utils
 
 endpoint_type = 'api/v1/admin'
@@ -22,35 +31,72 @@ router = APIRouter(
 @router.post("/ingest",
              summary="",
              description="",
+             status_code=status.HTTP_202_ACCEPTED,
              response_model_exclude_none=True)
 async def trigger_ingest(
     request: IngestRequest,
     x_api_key: str=Header(None)
 ) -> IngestResponse:
     """
-    Trigger knowledge base ingestion.
+    Start knowledge base ingestion in the background.
+    Poll GET /ingest/{job_id} for progress; the current index keeps serving until the new one is swapped in.
 
     Requires admin API key in X-API-Key header.
     """
     admin_utils.verify_admin_key(x_api_key)
 
     try:
-        print(f"Admin triggered ingestion, kb_path: {request.kb_path}")
-        ingest_knowledge_base(request.kb_path)
+        print(f"Admin triggered ingestion, kb_path: {request.kb_path}, index_name: {request.index_name}")
+        job = get_ingest_job_manager().submit(
+            request.kb_path,
+            full_rebuild=request.full_rebuild,
+            index_name=request.index_name
+        )
 
         return IngestResponse(
-            status="success",
-            message="Knowledge base ingested successfully"
+            status="accepted",
+            message="Ingestion started",
+            job_id=job.job_id
         )
 
+    except IngestJobRunningError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ingestion already running, job_id: {e.job_id}"
+        )
     except Exception as e:
-        print(f"Ingestion failed, error: {str(e)}")
+        print(f"Failed to start ingestion, error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ingestion failed: {str(e)}"
         )
 
 
+@router.get("/ingest/{job_id}",
+            summary="",
+            description="",
+            response_model_exclude_none=True)
+async def get_ingest_job(
+    job_id: str,
+    x_api_key: str=Header(None)
+) -> IngestJob:
+    """
+    Report the stage, progress, throughput and ETA of an ingestion job.
+
+    Requires admin API key.
+    """
+    admin_utils.verify_admin_key(x_api_key)
+
+    job = get_ingest_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingestion job not found"
+        )
+
+    return job
+
+
 @router.get("/session/{session_id}",
             summary="",
              description="",
@@ -76,3 +122,95 @@ async def get_session(
         )
 
     return session
+
+
+@router.get("/cache/stats",
+            summary="",
+            description="",
+            response_model_exclude_none=True)
+async def get_cache_stats(x_api_key: str=Header(None)):
+    """
+    Report hit/miss counters of the embedding and answer caches, and the indexes loaded in this worker.
+
+    Requires admin API key.
+    """
+    admin_utils.verify_admin_key(x_api_key)
+
+    return {
+        "query_embedding_cache": get_query_embedding_cache().stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "answer_cache": get_answer_cache().stats(),
+        "loaded_indexes": get_vector_store_manager().stats()
+    }
+
+
+def _index_versions(index_name: Optional[str]) -> IndexVersionsResponse:
+    store_manager = get_vector_store_manager()
+    return IndexVersionsResponse(
+        index_name=index_name or store_manager.index_name,
+        current=store_manager.current_version(index_name),
+        versions=store_manager.list_versions(index_name)
+    )
+
+
+@router.get("/index/versions",
+            summary="",
+            description="",
+            response_model_exclude_none=True)
+async def get_index_versions(
+    index_name: Optional[str]=None,
+    x_api_key: str=Header(None)
+) -> IndexVersionsResponse:
+    """
+    List the saved versions of an index and the one being served.
+
+    Requires admin API key.
+    """
+    admin_utils.verify_admin_key(x_api_key)
+
+    try:
+        return _index_versions(index_name)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/index/rollback",
+             summary="",
+             description="",
+             response_model_exclude_none=True)
+async def rollback_index_version(
+    request: IndexRollbackRequest,
+    x_api_key: str=Header(None)
+) -> IndexVersionsResponse:
+    """
+    Serve the previous version of an index, or the given one. Every worker swaps to it on its next query.
+    Rejected with 409 while an ingestion is running.
+
+    Requires admin API key.
+    """
+    admin_utils.verify_admin_key(x_api_key)
+
+    try:
+        print(f"Admin triggered index rollback, index_name: {request.index_name}, version: {request.version}")
+        await asyncio.to_thread(get_ingest_job_manager().rollback, request.index_name, request.version)
+        return _index_versions(request.index_name)
+
+    except IngestJobRunningError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ingestion already running, job_id: {e.job_id}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        print(f"Failed to roll back index, error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Rollback failed: {str(e)}"
+        )
@@ -1,10 +1,12 @@
 """
 Chat endpoints.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 
 from __init__ import __pgg_version__
+from services.warmup import get_warmup_service
 from beans.schemas.status.health_response_dto import HealthResponse
+from beans.schemas.status.warmup_status_dto import WarmupStatus
 
 endpoint_type = 'api/health'
 route_prefix = f"/{endpoint_type}"
@@ -21,5 +23,20 @@ router = APIRouter(
              description="",
              response_model_exclude_none=True)
 async def health_check() -> HealthResponse:
-    """Health check endpoint."""
-    return HealthResponse(status="ok", version=__pgg_version__)
+    """Health check endpoint (liveness): ok as soon as the worker answers, warm or not."""
+    return HealthResponse(status="ok", version=__pgg_version__, ready=get_warmup_service().ready)
+
+
+@router.get("/ready",
+            summary="",
+            description="",
+            response_model_exclude_none=True)
+async def readiness_check(response: Response) -> WarmupStatus:
+    """
+    Readiness check: 503 until the worker's warm-up completes, then "ready" with the seconds of each stage.
+    Point the load balancer here so no request reaches a cold worker.
+    """
+    warmup_state = get_warmup_service().state
+    if warmup_state.status != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return warmup_state
@@ -1,11 +1,14 @@
 """
 FastAPI application server.
 """
+import asyncio
 from __init__ import __pgg_version__
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
+from rag.retriever import shutdown_search_executor
+from services.warmup import get_warmup_service
 from routes.chat.v1 import ep_chat
 from routes.admin.v1 import ep_admin
 from routes.health import ep_health
@@ -61,10 +64,18 @@ def create_app() -> FastAPI:
         except ValueError as e:
             print(f"API key validation failed , extra: error : {str(e)}")
 
+        # Warm up in the background: the worker answers health checks meanwhile and
+        # GET /api/health/ready reports ready once models, indexes and prompts are loaded
+        app.state.warmup_task = asyncio.create_task(get_warmup_service().run())
+
     # Shutdown event
     @app.on_event("shutdown")
     async def shutdown_event():
         print("Shutting down PGG AI server")
+        warmup_task = getattr(app.state, "warmup_task", None)
+        if warmup_task is not None and not warmup_task.done():
+            warmup_task.cancel()
+        shutdown_search_executor()
 
     return app
 
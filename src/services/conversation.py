@@ -5,15 +5,21 @@ Main conversation orchestration service.
 from core.i18n import get_language_data
 from core.sentiment import analyze_sentiment
 from llm.memory import get_memory_manager
-from llm.chains import get_chain_manager
-from rag.retriever import query_knowledge_base
+from llm.chains import RESPONSE_FALLBACK, get_chain_manager
+from rag.retriever import aembed_user_question, aretrieve_context
+from rag.answer_cache import get_answer_cache
 from services.extraction import get_extraction_service
 from services.summarization import get_summarization_service
 from services.storage import get_storage_service
 from beans.schemas.conversations.chat_request_dto import ChatRequest
 from beans.schemas.conversations.chat_response_dto import ChatResponse
 from beans.schemas.extraction.extracted_data_dto import ExtractedData
+from beans.schemas.extraction.extraction_result_dto import ExtractionResult
+from beans.schemas.rag.rag_context_dto import RagContext
 from services import stt_tts
+from utils.timing import SpanRecorder
+from typing import List, Optional, Tuple
+import asyncio
 import base64
 import datetime
 
@@ -28,6 +34,7 @@ class ConversationService:
         self.extraction_service = get_extraction_service()
         self.summarization_service = get_summarization_service()
         self.storage_service = get_storage_service()
+        self.answer_cache = get_answer_cache()
 
         # Session-level extracted data cache
         self._session_data = {}
@@ -35,6 +42,11 @@ class ConversationService:
     async def process_message(self, request: ChatRequest) -> ChatResponse:
         """
         Process user message and generate response.
+        The turn runs as a small dependency graph: language detection, the question
+        embedding and LLM extraction start together; once the language is known, the
+        RAG lookup and sentiment analysis run while extraction finishes, and the reply
+        waits for both. Persistence overlaps
+        text-to-speech. The span of each stage and the critical path are logged.
 
         Args:
             request: Chat request with session_id and message
@@ -43,46 +55,261 @@ class ConversationService:
             ChatResponse with reply and extracted data
         """
         session_id = request.session_id
+        trace = SpanRecorder()
+        tasks: List[asyncio.Task] = []
 
         print(f"Processing message, message_len: {len(request.message)}")
 
-        # Detect language
-        # old version
-        # language = get_language(request.message, request.language)
-        language_data = await get_language_data(request.message)
+        try:
+            # Get or create memory
+            _ = self.memory_manager.get_memory(session_id)
+            turn_number = self.memory_manager.get_session_count(session_id) + 1
+
+            # Get conversation history
+            history_text = self.memory_manager.get_conversation_text(session_id)
+            current_data = self._session_data.get(session_id, ExtractedData())
+
+            # Detect language
+            # old version
+            # language = get_language(request.message, request.language)
+            language_task = asyncio.create_task(self._detect_language(request.message, trace))
+            # The question embedding only needs the message: retrieval and the answer cache reuse it
+            embedding_task = asyncio.create_task(self._embed_question(request, trace))
+            # Extraction only needs the message and the history, so it overlaps language detection
+            extraction_task = asyncio.create_task(self._extract(request.message, history_text, current_data, trace))
+            tasks += [language_task, embedding_task, extraction_task]
+
+            language_data = await language_task
+            language = language_data['idioma_detectado']
+
+            # Search the knowledge base in the detected language while extraction finishes
+            retrieval_task = asyncio.create_task(self._retrieve(request, language, embedding_task, trace))
+            tasks.append(retrieval_task)
+
+            # Analyze sentiment
+            with trace.span("sentiment"):
+                sentiment, polarity = analyze_sentiment(language_data['texto_traducido'])
+
+            extraction_result = await extraction_task
+
+            # Update cached data
+            self._session_data[session_id] = extraction_result.extracted
+
+            # FAQ-style repeats are answered from the semantic answer cache, shared by every
+            # session, so only turns with no history and nothing extracted use it;
+            # frustrated users always get a freshly generated reply
+            question_embedding = await embedding_task
+            cacheable = (
+                question_embedding is not None
+                and sentiment != "negative"
+                and self._is_session_agnostic(history_text, extraction_result.extracted)
+            )
+            reply = None
+            rag_tokens = 0
+            if cacheable:
+                try:
+                    reply = self.answer_cache.lookup(
+                        question_embedding, language, extraction_result.missing_fields, request.index_name
+                    )
+                except Exception as e:
+                    print(f"Answer cache lookup failed, error: {str(e)}")
+
+            if reply is not None:
+                retrieval_task.cancel()
+                print(f"Answered from answer cache, language: {language}")
+            else:
+                kb_context = await retrieval_task
+                with trace.span("reply"):
+                    reply, rag_tokens = await self._generate_reply(
+                        message=request.message,
+                        history_text=history_text,
+                        language=language,
+                        sentiment=sentiment,
+                        missing_fields=extraction_result.missing_fields,
+                        kb_context=kb_context
+                    )
+                if cacheable and reply != RESPONSE_FALLBACK:
+                    self.answer_cache.store(
+                        question_embedding, language, extraction_result.missing_fields, reply, request.index_name
+                    )
+
+            # Update memory
+            self.memory_manager.add_message(session_id, request.message, reply)
+
+            # Check if we should generate summary
+            summary = None
+            summary_ready = extraction_result.is_complete
+
+            if summary_ready:
+                full_conversation = self.memory_manager.get_conversation_text(session_id)
+                with trace.span("summary"):
+                    summary = await self.summarization_service.agenerate_summary(
+                        conversation_text=full_conversation,
+                        extracted_data=extraction_result.extracted,
+                        language=language
+                    )
+
+            # si el usuario nos ha pedido tambien respueta en sonido, la generamos mientras se guarda el turno
+            audio_task = None
+            if request.audio_response:
+                audio_task = asyncio.create_task(self._text_to_speech(reply, language, trace))
+                tasks.append(audio_task)
+                # Let the task hand the synthesis to its thread before storage blocks the loop
+                await asyncio.sleep(0)
+
+            with trace.span("persistence"):
+                if summary_ready:
+                    # Finalize storage
+                    self.storage_service.finalize_session(
+                        session_id=session_id,
+                        final_extracted=extraction_result.extracted,
+                        summary=summary
+                    )
+
+                # Store turn
+                self.storage_service.add_turn(
+                    session_id=session_id,
+                    turn_number=turn_number,
+                    user_message=request.message,
+                    assistant_reply=reply,
+                    language=language,
+                    sentiment=sentiment,
+                    sentiment_polarity_value=polarity,
+                    extracted_delta=extraction_result.extracted,
+                    rag_context_tokens=rag_tokens
+                )
+
+            audio_base64 = await audio_task if audio_task is not None else None
+
+        finally:
+            # A failed or cancelled turn leaves no stage running in the background
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        # Build response
+        response = ChatResponse(
+            reply=reply,
+            sound_file_base64=audio_base64,
+            language=language,
+            sentiment=sentiment,
+            extracted=extraction_result.extracted,
+            missing_fields=extraction_result.missing_fields,
+            summary_ready=summary_ready,
+            summary=summary,
+            session_id=session_id,
+            turn_number=turn_number
+        )
+
+        print(f"Generated response, turn: {turn_number}, is_complete: {summary_ready}")
+        print(f"Turn stages, {trace.describe()}")
 
-        # Analyze sentiment
-        sentiment, polarity = analyze_sentiment(language_data['texto_traducido'])
+        return response
 
-        # Get or create memory
-        _ = self.memory_manager.get_memory(session_id)
-        turn_number = self.memory_manager.get_session_count(session_id) + 1
+    @staticmethod
+    def _is_session_agnostic(history_text: str, extracted: ExtractedData) -> bool:
+        """
+        Check whether a reply can be shared across sessions: its prompt holds no
+        conversation history and no extracted values of this session.
 
-        # Get conversation history
-        history_text = self.memory_manager.get_conversation_text(session_id)
+        Args:
+            history_text: Conversation history
+            extracted: Data extracted so far
 
-        # Extract structured information
-        current_data = self._session_data.get(session_id, ExtractedData())
-        extraction_result = self.extraction_service.extract_from_message(
-            message=request.message,
-            history=history_text,
-            language=language_data['idioma_detectado'],
-            current_data=current_data
-        )
+        Returns:
+            True if the turn may use the answer cache
+        """
+        return not history_text.strip() and not extracted.model_dump(exclude_none=True)
+
+    @staticmethod
+    async def _detect_language(message: str, trace: SpanRecorder) -> dict:
+        """Detect the language of the message and translate it for sentiment analysis."""
+        with trace.span("language"):
+            return await get_language_data(message)
+
+    @staticmethod
+    async def _embed_question(request: ChatRequest, trace: SpanRecorder) -> Optional[list[float]]:
+        """Embed the question with the index's model, None if there is no index or it fails."""
+        with trace.span("embed_question"):
+            try:
+                return await aembed_user_question(request.message, request.index_name)
+            except Exception as e:
+                print(f"Question embedding failed, error: {str(e)}")
+                return None
+
+    async def _extract(
+        self,
+        message: str,
+        history_text: str,
+        current_data: ExtractedData,
+        trace: SpanRecorder
+    ) -> ExtractionResult:
+        """Extract structured information with the LLM; the extraction prompt does not depend on the language."""
+        with trace.span("extraction"):
+            return await self.extraction_service.aextract_from_message(
+                message=message,
+                history=history_text,
+                current_data=current_data
+            )
 
-        # Update cached data
-        self._session_data[session_id] = extraction_result.extracted
+    @staticmethod
+    async def _retrieve(
+        request: ChatRequest,
+        language: str,
+        embedding_task: asyncio.Task,
+        trace: SpanRecorder
+    ) -> Optional[RagContext]:
+        """Search the knowledge base once the question is embedded, so retrieval hits the query cache."""
+        await embedding_task
+        with trace.span("retrieval"):
+            try:
+                # TODO: Esta posicion puede ser la optima para RAG
+                return await aretrieve_context(request.message, index_name=request.index_name, language=language)
+            except Exception as e:
+                print(f"RAG query failed, error: {str(e)}")
+                return None
+
+    @staticmethod
+    async def _text_to_speech(reply: str, language: str, trace: SpanRecorder) -> str:
+        """Synthesize the reply off the event loop, base64 encoded for the JSON response."""
+        with trace.span("tts"):
+            audio_work_service = stt_tts.get_stt_tts_service()
+            # generamos el binario del audio
+            audio_data = await asyncio.to_thread(audio_work_service.text_to_speech, reply, language=language)
+            # codificamos el audio a base64 para enviarlo en el json
+            return base64.b64encode(audio_data).decode("utf-8")
+
+    async def _generate_reply(
+        self,
+        message: str,
+        history_text: str,
+        language: str,
+        sentiment: str,
+        missing_fields: List[str],
+        kb_context: Optional[RagContext]=None
+    ) -> Tuple[str, int]:
+        """
+        Generate a reply with knowledge base context.
 
-        # Check if RAG can help
+        Args:
+            message: User message
+            history_text: Conversation history
+            language: Detected language
+            sentiment: Detected sentiment
+            missing_fields: Required fields still to collect
+            kb_context: Relevant chunks within the token budget, None if retrieval failed
+
+        Returns:
+            Tuple of (reply, RAG context tokens injected into the prompt)
+        """
+        # Check if RAG can help: only relevant chunks, within the token budget
         rag_context = ""
-        try:
-            # TODO: Esta posicion puede ser la optima para RAG
-            kb_docs = query_knowledge_base(request.message, k=3)
-            if kb_docs:
-                rag_context = "\n\n".join(kb_docs)
-                print(f"Retrieved RAG context, docs: {len(kb_docs)}")
-        except Exception as e:
-            print(f"RAG query failed, error: {str(e)}")
+        rag_tokens = 0
+        if kb_context is not None and kb_context.chunks:
+            rag_context = kb_context.text
+            rag_tokens = kb_context.tokens
+            print(f"Retrieved RAG context, docs: {len(kb_context.chunks)}, tokens: {rag_tokens}, "
+                  f"language_partition: {kb_context.language}")
 
         # Generate response
         context = history_text
@@ -90,79 +317,19 @@ class ConversationService:
             context += f"\n\nRelevant information from knowledge base:\n{rag_context}"
 
         # Add guidance based on missing fields
-        if extraction_result.missing_fields:
-            missing_str = ", ".join(extraction_result.missing_fields)
+        if missing_fields:
+            missing_str = ", ".join(missing_fields)
             context += f"\n\nMissing required fields: {missing_str}"
 
         # Adjust tone for negative sentiment
-        reply = self.chain_manager.generate_response(
-            message=request.message,
+        reply = await self.chain_manager.agenerate_response(
+            message=message,
             context=context,
-            language=language_data['idioma_detectado'],
+            language=language,
             sentiment=sentiment
         )
 
-        # Update memory
-        self.memory_manager.add_message(session_id, request.message, reply)
-
-        # Check if we should generate summary
-        summary = None
-        summary_ready = extraction_result.is_complete
-
-        if summary_ready:
-            full_conversation = self.memory_manager.get_conversation_text(session_id)
-            summary = self.summarization_service.generate_summary(
-                conversation_text=full_conversation,
-                extracted_data=extraction_result.extracted,
-                language=language_data['idioma_detectado']
-            )
-
-            # Finalize storage
-            self.storage_service.finalize_session(
-                session_id=session_id,
-                final_extracted=extraction_result.extracted,
-                summary=summary
-            )
-
-        # Store turn
-        self.storage_service.add_turn(
-            session_id=session_id,
-            turn_number=turn_number,
-            user_message=request.message,
-            assistant_reply=reply,
-            language=language_data['idioma_detectado'],
-            sentiment=sentiment,
-            sentiment_polarity_value=polarity,
-            extracted_delta=extraction_result.extracted
-        )
-
-        # si el usuario nos ha pedido tambien respueta en sonido, la generamos
-        audio_base64 = None
-        if request.audio_response:
-            # Generar respuesta de audio
-            audio_work_service = stt_tts.get_stt_tts_service()
-            # generamos el binario del audio
-            audio_data = audio_work_service.text_to_speech(reply, language=language_data['idioma_detectado'])
-            # codificamos el audio a base64 para enviarlo en el json
-            audio_base64 = base64.b64encode(audio_data).decode("utf-8")
-
-        # Build response
-        response = ChatResponse(
-            reply=reply,
-            sound_file_base64=audio_base64,
-            language=language_data['idioma_detectado'],
-            sentiment=sentiment,
-            extracted=extraction_result.extracted,
-            missing_fields=extraction_result.missing_fields,
-            summary_ready=summary_ready,
-            summary=summary,
-            session_id=session_id,
-            turn_number=turn_number
-        )
-
-        print(f"Generated response, turn: {turn_number}, is_complete: {summary_ready}")
-
-        return response
+        return reply, rag_tokens
 
     def reset_session(self, session_id: str) -> None:
         """
@@ -39,39 +39,78 @@ class ExtractionService:
                 message=message,
                 history=history
             )
+            return self._build_result(extracted_dict, current_data)
 
-            # Parse into ExtractedData
-            try:
-                new_data = ExtractedData(**extracted_dict)
-            except Exception as e:
-                print(f"Failed to parse extracted data, error: {str(e)}")
-                new_data = ExtractedData()
-
-            # Merge with current data
-            if current_data:
-                merged_data = current_data.merge(new_data)
-            else:
-                merged_data = new_data
-
-            # Build result
-            result = ExtractionResult(
-                extracted=merged_data,
-                missing_fields=merged_data.get_missing_fields(),
-                is_complete=merged_data.is_complete()
-            )
+        except Exception as e:
+            print(f"Extraction failed, error: {str(e)}")
+            return self._fallback_result(current_data)
+
+    async def aextract_from_message(
+        self,
+        message: str,
+        history: str,
+        language: str="es",
+        current_data: ExtractedData | None=None
+    ) -> ExtractionResult:
+        """
+        Extract structured information from message without blocking the event loop.
 
-            print(f"Extraction completed, is_complete: {result.is_complete}, missing: {len(result.missing_fields)}")
+        Args:
+            message: User message
+            history: Conversation history
+            language: Language code
+            current_data: Previously extracted data
 
-            return result
+        Returns:
+            ExtractionResult with extracted and validation info
+        """
+        try:
+            # Extract using LLM
+            extracted_dict = await self.chain_manager.aextract_structured_info(
+                message=message,
+                history=history
+            )
+            return self._build_result(extracted_dict, current_data)
 
         except Exception as e:
             print(f"Extraction failed, error: {str(e)}")
-            # Return current data or empty
-            return ExtractionResult(
-                extracted=current_data or ExtractedData(),
-                missing_fields=(current_data or ExtractedData()).get_missing_fields(),
-                is_complete=False
-            )
+            return self._fallback_result(current_data)
+
+    @staticmethod
+    def _build_result(extracted_dict: dict, current_data: ExtractedData | None) -> ExtractionResult:
+        """Parse the extracted fields and merge them with the previously extracted data."""
+        # Parse into ExtractedData
+        try:
+            new_data = ExtractedData(**extracted_dict)
+        except Exception as e:
+            print(f"Failed to parse extracted data, error: {str(e)}")
+            new_data = ExtractedData()
+
+        # Merge with current data
+        if current_data:
+            merged_data = current_data.merge(new_data)
+        else:
+            merged_data = new_data
+
+        # Build result
+        result = ExtractionResult(
+            extracted=merged_data,
+            missing_fields=merged_data.get_missing_fields(),
+            is_complete=merged_data.is_complete()
+        )
+
+        print(f"Extraction completed, is_complete: {result.is_complete}, missing: {len(result.missing_fields)}")
+
+        return result
+
+    @staticmethod
+    def _fallback_result(current_data: ExtractedData | None) -> ExtractionResult:
+        """Return current data or empty."""
+        return ExtractionResult(
+            extracted=current_data or ExtractedData(),
+            missing_fields=(current_data or ExtractedData()).get_missing_fields(),
+            is_complete=False
+        )
 
 
 # Global service
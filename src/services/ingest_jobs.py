@@ -0,0 +1,308 @@
+"""
+Background knowledge base ingestion jobs.
+
+Ingestion runs in a thread of the worker that accepted it, so the event loop keeps
+serving and the old index is served until the new one is swapped in. Job status is
+persisted as JSON so any worker can report it, and a file lock allows a single
+ingestion at a time across all workers. Index rollbacks take the same lock, so
+they never interleave with an ingestion saving or pruning versions.
+"""
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Optional
+from config.settings import settings
+from rag.ingest import ingest_knowledge_base, rollback_index
+from utils.jsonio import write_json_atomic, safe_read_json
+from beans.schemas.ingest.ingest_job_dto import IngestJob
+from beans.schemas.ingest.ingest_progress_dto import IngestProgress
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Lock file held by the worker running an ingestion, containing the job id
+LOCK_FILE_NAME = "ingest.lock"
+
+# Lock file content while an index rollback holds the lock
+ROLLBACK_LOCK_OWNER = "rollback"
+
+# Minimum seconds between progress writes of a running job
+PROGRESS_WRITE_INTERVAL = 1.0
+
+# Job ids are uuid4 hex strings; anything else never names a job file
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class IngestJobRunningError(RuntimeError):
+    """Raised when an ingestion is submitted while another one is running."""
+
+    def __init__(self, job_id: Optional[str]):
+        super().__init__(f"Ingestion already running, job_id: {job_id}")
+        self.job_id = job_id
+
+
+class IngestJobManager:
+    """Runs one ingestion at a time in the background and tracks its progress."""
+
+    def __init__(self):
+        """Initialize job manager."""
+        self.jobs_path = Path(settings.ingest_jobs_path)
+        self.jobs_path.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.jobs_path / LOCK_FILE_NAME
+        # Guards this process; the file lock guards the other workers
+        self._lock = threading.Lock()
+
+    def _get_job_file(self, job_id: str) -> Path:
+        """
+        Get file path for job.
+
+        Raises:
+            ValueError: If the job id is not a generated one, e.g. a path
+        """
+        if not JOB_ID_PATTERN.match(job_id):
+            raise ValueError(f"Invalid ingestion job id: {job_id!r}")
+        return self.jobs_path / f"{job_id}.json"
+
+    def _save(self, job: IngestJob) -> None:
+        write_json_atomic(self._get_job_file(job.job_id), job.model_dump())
+
+    def _acquire_file_lock(self) -> Optional[IO]:
+        """Take the cross-worker ingestion lock, None if another worker holds it."""
+        lock_file = open(self._lock_path, "a+", encoding="utf-8")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return None
+        return lock_file
+
+    def _take_lock(self, owner: str) -> IO:
+        """
+        Take the ingestion lock in this process and across workers, recording its owner.
+
+        Args:
+            owner: Job id, or ROLLBACK_LOCK_OWNER
+
+        Returns:
+            Open lock file, to close (with self._lock released) when done
+
+        Raises:
+            IngestJobRunningError: If an ingestion or a rollback is running in any worker
+        """
+        if not self._lock.acquire(blocking=False):
+            raise IngestJobRunningError(self._running_job_id())
+
+        lock_file = self._acquire_file_lock()
+        if lock_file is None:
+            self._lock.release()
+            raise IngestJobRunningError(self._running_job_id())
+
+        try:
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(owner)
+            lock_file.flush()
+        except Exception:
+            self._release_lock(lock_file)
+            raise
+        return lock_file
+
+    def _release_lock(self, lock_file: IO) -> None:
+        lock_file.close()
+        self._lock.release()
+
+    def _running_job_id(self) -> Optional[str]:
+        try:
+            return self._lock_path.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+
+    def _is_locked(self) -> bool:
+        """Check whether some worker is running an ingestion."""
+        if self._lock.locked():
+            return True
+
+        lock_file = self._acquire_file_lock()
+        if lock_file is None:
+            return True
+        lock_file.close()
+        return False
+
+    def submit(self, kb_path: Optional[str]=None, full_rebuild: bool=False, index_name: Optional[str]=None) -> IngestJob:
+        """
+        Start an ingestion in a background thread.
+
+        Args:
+            kb_path: Knowledge base directory, defaults to settings.kb_path
+            full_rebuild: Ignore the saved manifest and re-embed everything
+            index_name: Index to build or update, defaults to settings.vectorstore_index_name
+
+        Returns:
+            IngestJob as queued
+
+        Raises:
+            IngestJobRunningError: If an ingestion is already running in any worker
+        """
+        job = IngestJob(
+            job_id=uuid.uuid4().hex,
+            kb_path=kb_path,
+            index_name=index_name,
+            full_rebuild=full_rebuild,
+            created_at=datetime.now(timezone.utc).isoformat()
+        )
+        lock_file = self._take_lock(job.job_id)
+
+        try:
+            self._save(job)
+
+            threading.Thread(
+                target=self._run,
+                args=(job, lock_file),
+                name=f"ingest-{job.job_id}",
+                daemon=True
+            ).start()
+        except Exception:
+            self._release_lock(lock_file)
+            raise
+
+        print(f"Submitted ingestion job, job_id: {job.job_id}, kb_path: {kb_path}, index_name: {index_name}, "
+              f"full_rebuild: {full_rebuild}")
+        return job
+
+    def _run(self, job: IngestJob, lock_file: IO) -> None:
+        """Run the ingestion of a job and release the lock when it ends."""
+        started = time.monotonic()
+        last_write = 0.0
+
+        def on_progress(progress: IngestProgress) -> None:
+            nonlocal last_write
+            self._apply_progress(job, progress, time.monotonic() - started)
+            # Stage changes are always written, batch updates at most once per interval
+            if progress.stage != "embedding" or time.monotonic() - last_write >= PROGRESS_WRITE_INTERVAL:
+                self._save(job)
+                last_write = time.monotonic()
+
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc).isoformat()
+        self._save(job)
+
+        try:
+            kwargs = {"kb_path": job.kb_path} if job.kb_path else {}
+            job.stats = ingest_knowledge_base(
+                full_rebuild=job.full_rebuild,
+                on_progress=on_progress,
+                index_name=job.index_name,
+                **kwargs
+            )
+            job.status = "succeeded"
+            job.progress.stage = "done"
+            job.eta_seconds = 0.0
+        except Exception as e:
+            print(f"Ingestion job failed, job_id: {job.job_id}, error: {str(e)}")
+            job.status = "failed"
+            job.error = str(e)
+            job.eta_seconds = None
+        finally:
+            job.finished_at = datetime.now(timezone.utc).isoformat()
+            self._save(job)
+            self._release_lock(lock_file)
+
+        print(f"Ingestion job finished, job_id: {job.job_id}, status: {job.status}, "
+              f"seconds: {round(time.monotonic() - started, 2)}")
+
+    def rollback(self, index_name: Optional[str]=None, version: Optional[str]=None) -> str:
+        """
+        Roll an index back under the ingestion lock. Blocking: loads the index and
+        rebuilds its language partitions, so async callers run it in a thread.
+
+        Args:
+            index_name: Index to roll back, defaults to settings.vectorstore_index_name
+            version: Version to serve, defaults to the one before the current one
+
+        Returns:
+            Version now served
+
+        Raises:
+            IngestJobRunningError: If an ingestion or another rollback is running in any worker
+            ValueError: If there is no such version to roll back to
+        """
+        lock_file = self._take_lock(ROLLBACK_LOCK_OWNER)
+        try:
+            return rollback_index(index_name, version)
+        finally:
+            self._release_lock(lock_file)
+
+    @staticmethod
+    def _apply_progress(job: IngestJob, progress: IngestProgress, elapsed: float) -> None:
+        """
+        Copy live progress into a job and estimate throughput and time left.
+        While files are still being split, the chunks still to come are extrapolated
+        from the chunks found per file so far.
+        """
+        job.progress = progress.model_copy()
+        if progress.stage != "embedding" or elapsed <= 0 or not progress.chunks_embedded:
+            job.eta_seconds = None if progress.stage in ("listing", "embedding") else 0.0
+            return
+
+        job.chunks_per_second = round(progress.chunks_embedded / elapsed, 2)
+
+        expected = progress.chunks_queued
+        if 0 < progress.files_done < progress.files_total:
+            expected = progress.chunks_queued * progress.files_total / progress.files_done
+        job.eta_seconds = round(max(expected - progress.chunks_embedded, 0) / job.chunks_per_second, 1)
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """
+        Load a job's status.
+        A job left queued or running by a worker that died is reported as failed.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            IngestJob or None if not found, or the id is not a valid job id
+        """
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+
+        data = safe_read_json(self._get_job_file(job_id), default=None)
+        if data is None:
+            return None
+
+        try:
+            job = IngestJob(**data)
+        except Exception as e:
+            print(f"Invalid ingestion job, job_id: {job_id}, error: {str(e)}")
+            return None
+
+        if job.status in ("queued", "running") and not self._is_locked():
+            # The final status is written before the lock is released
+            data = safe_read_json(self._get_job_file(job_id), default=None)
+            job = IngestJob(**data) if data is not None else job
+            if job.status not in ("queued", "running"):
+                return job
+
+            job.status = "failed"
+            job.error = "Ingestion interrupted before finishing"
+            job.eta_seconds = None
+            self._save(job)
+
+        return job
+
+
+# Global ingest job manager
+_ingest_job_manager: Optional[IngestJobManager] = None
+
+
+def get_ingest_job_manager() -> IngestJobManager:
+    """Get global ingest job manager instance."""
+    global _ingest_job_manager
+    if _ingest_job_manager is None:
+        _ingest_job_manager = IngestJobManager()
+    return _ingest_job_manager
@@ -70,7 +70,8 @@ class StorageService:
         language: str,
         sentiment: str,
         sentiment_polarity_value:float,
-        extracted_delta: ExtractedData
+        extracted_delta: ExtractedData,
+        rag_context_tokens: int=0
     ) -> None:
         """
         Add a conversation turn to session.
@@ -83,6 +84,7 @@ class StorageService:
             language: Language used
             sentiment: Detected sentiment
             extracted_delta: New extracted data
+            rag_context_tokens: Knowledge base tokens injected into the prompt
         """
         session = self.load_session(session_id)
 
@@ -105,7 +107,8 @@ class StorageService:
             language=language,
             sentiment=sentiment,
             sentiment_polarity_value=sentiment_polarity_value,
-            extracted_delta=extracted_delta
+            extracted_delta=extracted_delta,
+            rag_context_tokens=rag_context_tokens
         )
 
         session.turns.append(turn)
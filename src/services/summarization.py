@@ -43,6 +43,37 @@ class SummarizationService:
             print(f"Summarization failed, error: {str(e)}")
             return "Error generating summary"
 
+    async def agenerate_summary(
+        self,
+        conversation_text: str,
+        extracted_data: ExtractedData,
+        language: str="es"
+    ) -> str:
+        """
+        Generate summary of conversation without blocking the event loop.
+
+        Args:
+            conversation_text: Full conversation as text
+            extracted_data: Extracted structured data
+            language: Language code
+
+        Returns:
+            Summary text
+        """
+        try:
+            summary = await self.chain_manager.agenerate_summary(
+                conversation=conversation_text,
+                extracted_data=extracted_data.model_dump(),
+                language=language
+            )
+
+            print(f"Generated summary, length: {len(summary)}")
+            return summary
+
+        except Exception as e:
+            print(f"Summarization failed, error: {str(e)}")
+            return "Error generating summary"
+
 
 # Global service
 _summarization_service = None
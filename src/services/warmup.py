@@ -0,0 +1,146 @@
+"""
+Worker warm-up before accepting traffic.
+
+Without it the first chat request of each uvicorn worker pays for building the
+LLM clients and services, loading the FAISS index, the tiktoken encoding and
+TextBlob's lexicon. The warm-up does all of it at startup, stage by stage, and can
+run a synthetic turn through every stage of the chat pipeline.
+"""
+import asyncio
+import time
+from typing import Callable, Optional
+from config.settings import settings
+from core.i18n import get_language_data
+from core.sentiment import analyze_sentiment
+from llm.chains import get_chain_manager
+from llm.models import get_embeddings
+from llm.prompts import get_extraction_prompt_template, get_summary_prompt, get_system_prompt
+from rag.retriever import aretrieve_context
+from rag.store import get_vector_store_manager
+from services.conversation import get_conversation_service
+from utils.tokens import count_tokens
+from beans.schemas.extraction.extracted_data_dto import ExtractedData
+from beans.schemas.status.warmup_status_dto import WarmupStatus
+
+
+class WarmupService:
+    """Runs the warm-up stages once per process and reports their progress."""
+
+    def __init__(self):
+        """Initialize warm-up service."""
+        self.state = WarmupStatus()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the warm-up finished (or is disabled)."""
+        return self.state.status == "ready"
+
+    async def _run_stage(self, stage: str, func: Callable[[], object]) -> None:
+        """
+        Run a warm-up stage; blocking ones run in a thread, so health checks are answered meanwhile.
+        A failing stage is logged and skipped: the worker still serves, paying for it on first use.
+
+        Args:
+            stage: Stage name
+            func: Stage body, a function or a coroutine function
+        """
+        self.state.stage = stage
+        start = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(func):
+                await func()
+            else:
+                await asyncio.to_thread(func)
+        except Exception as e:
+            self.state.failed_stages.append(stage)
+            print(f"Warm-up stage failed, stage: {stage}, error: {str(e)}")
+        finally:
+            elapsed = time.perf_counter() - start
+            self.state.stage_seconds[stage] = round(elapsed, 4)
+            print(f"Warm-up stage completed, stage: {stage}, seconds: {elapsed:.3f}")
+
+    @staticmethod
+    def _load_prompts() -> None:
+        """Build every prompt for every supported language, and the tiktoken encoding used to budget them."""
+        for language in settings.supported_languages_list:
+            count_tokens(get_system_prompt(language))
+            get_summary_prompt(language)
+        get_extraction_prompt_template()
+
+    @staticmethod
+    def _load_indexes() -> None:
+        """Make the default index and the configured named indexes resident."""
+        store_manager = get_vector_store_manager()
+        for index_name in [None] + settings.warmup_index_names_list:
+            vectorstore, _ = store_manager.get_search_indexes(index_name)
+            if vectorstore is None:
+                print(f"Warm-up index not ingested yet, index_name: {index_name or store_manager.index_name}")
+
+    async def _dry_request(self) -> None:
+        """Run a synthetic turn through every stage of the chat pipeline, without storing anything."""
+        message = settings.warmup_message
+        service = get_conversation_service()
+
+        language_data = await get_language_data(message)
+        language = language_data['idioma_detectado']
+        sentiment, _ = await asyncio.to_thread(analyze_sentiment, language_data['texto_traducido'])
+
+        await service.extraction_service.aextract_from_message(
+            message=message,
+            history="",
+            language=language,
+            current_data=ExtractedData()
+        )
+
+        kb_context = await aretrieve_context(message, language=language)
+        await service.chain_manager.agenerate_response(
+            message=message,
+            context=kb_context.text,
+            language=language,
+            sentiment=sentiment
+        )
+
+    async def run(self) -> WarmupStatus:
+        """
+        Run the warm-up: models, services, prompts, indexes, sentiment lexicon and
+        the optional dry request, logging the seconds of each stage.
+
+        Returns:
+            Final warm-up status
+        """
+        if self.state.status != "pending":
+            return self.state
+
+        if not settings.warmup_enabled:
+            self.state.status = "ready"
+            return self.state
+
+        self.state.status = "warming"
+        start = time.perf_counter()
+
+        await self._run_stage("models", lambda: (get_chain_manager(), get_embeddings()))
+        await self._run_stage("services", get_conversation_service)
+        await self._run_stage("prompts", self._load_prompts)
+        await self._run_stage("indexes", self._load_indexes)
+        await self._run_stage("sentiment", lambda: analyze_sentiment("Warm-up, all good"))
+        if settings.warmup_dry_request:
+            await self._run_stage("dry_request", self._dry_request)
+
+        self.state.stage = None
+        self.state.total_seconds = round(time.perf_counter() - start, 4)
+        self.state.status = "ready"
+        print(f"Warm-up completed, seconds: {self.state.total_seconds}, "
+              f"stage_seconds: {self.state.stage_seconds}, failed_stages: {self.state.failed_stages}")
+        return self.state
+
+
+# Global warm-up service
+_warmup_service: Optional[WarmupService] = None
+
+
+def get_warmup_service() -> WarmupService:
+    """Get global warm-up service instance."""
+    global _warmup_service
+    if _warmup_service is None:
+        _warmup_service = WarmupService()
+    return _warmup_service
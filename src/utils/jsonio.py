@@ -2,6 +2,8 @@
 JSON file I/O utilities.
 """
 import json
+import os
+import threading
 from pathlib import Path
 from typing import Any, Dict
 
@@ -52,6 +54,25 @@ def write_json(file_path: str | Path, data: Dict[str, Any], indent: int=2) -> No
     print(f"Wrote JSON file, path: {str(file_path)}")
 
 
+def write_json_atomic(file_path: str | Path, data: Dict[str, Any], indent: int=2) -> None:
+    """
+    Write JSON to file through a temporary file and rename, so readers in other
+    processes never see a partially written file.
+
+    Args:
+        file_path: Path to JSON file
+        data: Data to write
+        indent: JSON indentation level
+    """
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
 def append_to_json_array(file_path: str | Path, item: Dict[str, Any]) -> None:
     """
     Append item to JSON array file.
@@ -0,0 +1,112 @@
+"""
+Stage timing utilities.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@contextmanager
+def stage_timer(stage: str, timings: Optional[Dict[str, float]]=None) -> Iterator[None]:
+    """
+    Time a pipeline stage and log its duration.
+
+    Args:
+        stage: Stage name
+        timings: Optional dictionary where the elapsed seconds are accumulated
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings[stage] = round(timings.get(stage, 0.0) + elapsed, 4)
+        print(f"Stage completed, stage: {stage}, seconds: {elapsed:.3f}")
+
+
+def timed_iter(iterable: Iterable[T], stage: str, timings: Dict[str, float]) -> Iterator[T]:
+    """
+    Wrap an iterator, accumulating the time spent producing each item.
+    Used for streaming stages that interleave, where a single block cannot be timed.
+
+    Args:
+        iterable: Iterable to consume lazily
+        stage: Stage name
+        timings: Dictionary where the elapsed seconds are accumulated
+
+    Yields:
+        Items of `iterable`
+    """
+    iterator = iter(iterable)
+    timings.setdefault(stage, 0.0)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timings[stage] += time.perf_counter() - start
+        yield item
+
+
+class SpanRecorder:
+    """
+    Start and end offsets of the stages of one request. Unlike stage_timer, spans
+    keep when each stage ran, so concurrent stages show as overlapping and the
+    chain of stages that set the total latency (the critical path) can be found.
+    """
+
+    def __init__(self):
+        """Initialize recorder, offsets count from now."""
+        self.start = time.perf_counter()
+        self.spans: Dict[str, Tuple[float, float]] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """
+        Record a stage; the block may await, other stages keep running meanwhile.
+
+        Args:
+            stage: Stage name
+        """
+        start = time.perf_counter() - self.start
+        try:
+            yield
+        finally:
+            self.spans[stage] = (start, time.perf_counter() - self.start)
+
+    def critical_path(self) -> List[str]:
+        """
+        Get the stages on the critical path: from the stage that ended last, walk back
+        to the stage that ended last before it started, and so on. Stages that
+        started after the current one are not its predecessors, however short.
+
+        Returns:
+            Stage names in execution order
+        """
+        path: List[str] = []
+        remaining = dict(self.spans)
+        horizon = float("inf")
+        while True:
+            candidates = [
+                (end, stage) for stage, (start, end) in remaining.items() if start < horizon and end <= horizon + 1e-4
+            ]
+            if not candidates:
+                return path[::-1]
+            _, stage = max(candidates)
+            path.append(stage)
+            horizon = remaining.pop(stage)[0]
+
+    def describe(self) -> str:
+        """Format the spans, by start offset, and the critical path for logging."""
+        spans = ", ".join(
+            f"{stage}: {start:.3f}-{end:.3f}"
+            for stage, (start, end) in sorted(self.spans.items(), key=lambda item: item[1])
+        )
+        total = time.perf_counter() - self.start
+        return f"total: {total:.3f}, spans: {{{spans}}}, critical_path: {' > '.join(self.critical_path())}"
+
@@ -0,0 +1,65 @@
+"""
+Token counting utilities.
+"""
+from functools import lru_cache
+from typing import Optional
+from config.settings import settings
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken ships with langchain-openai
+    tiktoken = None
+
+# Encoding used when the configured model is unknown to tiktoken
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    """
+    Get the tiktoken encoding for a model.
+
+    Args:
+        model: LLM model name
+
+    Returns:
+        Encoding, or None if tiktoken or its encoding files are not available
+    """
+    if tiktoken is None:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        print(f"Failed to load tokenizer, model: {model}, error: {str(e)}")
+        return None
+
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        print(f"Failed to load tokenizer, encoding: {DEFAULT_ENCODING}, error: {str(e)}")
+        return None
+
+
+def count_tokens(text: str, model: Optional[str]=None) -> int:
+    """
+    Count the tokens of a text for the configured LLM.
+    Falls back to an estimate of about 4 characters per token without a tokenizer.
+
+    Args:
+        text: Text to count
+        model: LLM model name, defaults to settings.llm_model
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding(model or settings.llm_model)
+    if encoding is None:
+        return len(text) // 4 + 1
+
+    return len(encoding.encode(text, disallowed_special=()))
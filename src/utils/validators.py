@@ -10,6 +10,10 @@ Urgency = Literal["low", "medium", "high"]
 
 # Validation patterns
 ORDER_ID_PATTERN = re.compile(r'^[A-Z0-9]{6,12}$', re.IGNORECASE)
+# Relative paths under the vector store, e.g. "faiss_index", "kb/es" or "tenants/acme"
+INDEX_NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*(/[A-Za-z0-9][A-Za-z0-9_.-]*)*$')
+# Path segment holding an index's language partitions ("kb/lang/es"), not usable in index names
+PARTITIONS_SEGMENT = "lang"
 
 # Valid enum values
 VALID_CATEGORIES = {"shipping", "billing", "technical", "other"}
@@ -180,3 +184,27 @@ def validate_description(description: str, min_length: int=10) -> tuple[bool, Op
         return False, f"Description must be at least {min_length} characters"
 
     return True, None
+
+
+def validate_index_name(index_name: str, allow_partitions: bool=False) -> tuple[bool, Optional[str]]:
+    """
+    Validate a vector index name: a relative path that cannot escape the vector store
+    nor reach into another index's language partitions.
+
+    Args:
+        index_name: Index name to validate
+        allow_partitions: Accept partition names ("kb/lang/es"), only built internally
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    if not index_name:
+        return False, "Index name cannot be empty"
+
+    if len(index_name) > 128 or not INDEX_NAME_PATTERN.match(index_name):
+        return False, "Index name must be letters, digits, '_', '-' or '.' segments separated by '/'"
+
+    if not allow_partitions and PARTITIONS_SEGMENT in index_name.split("/"):
+        return False, f"Index name cannot contain a '{PARTITIONS_SEGMENT}' segment"
+
+    return True, None
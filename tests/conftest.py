@@ -152,6 +152,7 @@ def reset_global_services():
         'services.summarization',
         'llm.memory',
         'llm.chains',
+        'rag.query_cache',
     ]
     
     # Reset global variables in each module
@@ -161,7 +162,8 @@ def reset_global_services():
                 module = sys.modules[module_name]
                 # Reset common global variable names
                 for var in ['_conversation_service', '_extraction_service', '_storage_service',
-                           '_summarization_service', '_memory_manager', '_chain_manager']:
+                           '_summarization_service', '_memory_manager', '_chain_manager',
+                           '_query_embedding_cache']:
                     if hasattr(module, var):
                         setattr(module, var, None)
         except Exception:
@@ -175,7 +177,8 @@ def reset_global_services():
             if module_name in sys.modules:
                 module = sys.modules[module_name]
                 for var in ['_conversation_service', '_extraction_service', '_storage_service',
-                           '_summarization_service', '_memory_manager', '_chain_manager']:
+                           '_summarization_service', '_memory_manager', '_chain_manager',
+                           '_query_embedding_cache']:
                     if hasattr(module, var):
                         setattr(module, var, None)
         except Exception:
@@ -0,0 +1,100 @@
+"""
+Tests for the semantic answer cache.
+"""
+from unittest.mock import patch
+import pytest
+from src.rag.answer_cache import AnswerCache
+
+
+@pytest.fixture(autouse=True)
+def store_version():
+    """Pin the served vectorstore version the cache checks against."""
+    with patch('src.rag.answer_cache.get_vector_store_manager') as mock_get_manager:
+        mock_get_manager.return_value.index_name = "faiss_index"
+        mock_get_manager.return_value.served_version.return_value = "v1"
+        yield mock_get_manager.return_value
+
+
+class TestAnswerCache:
+    """Tests for AnswerCache."""
+
+    def test_similar_question_hits(self):
+        """Test that a question above the similarity threshold reuses the reply."""
+        cache = AnswerCache(threshold=0.95, max_size=10, ttl_seconds=0)
+        cache.store([1.0, 0.0], "es", [], "Enviamos en 24 horas")
+
+        assert cache.lookup([0.99, 0.05], "es", []) == "Enviamos en 24 horas"
+        assert cache.lookup([0.6, 0.8], "es", []) is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["hit_ratio"] == 0.5
+
+    def test_scoped_by_language_and_missing_fields(self):
+        """Test that replies are only reused within the same scope."""
+        cache = AnswerCache(threshold=0.95, max_size=10, ttl_seconds=0)
+        cache.store([1.0, 0.0], "es", ["order_id"], "¿Cuál es tu número de pedido?")
+
+        assert cache.lookup([1.0, 0.0], "en", ["order_id"]) is None
+        assert cache.lookup([1.0, 0.0], "es", []) is None
+        assert cache.lookup([1.0, 0.0], "es", ["order_id"]) == "¿Cuál es tu número de pedido?"
+
+    def test_scoped_by_exact_missing_fields(self):
+        """Test that a reply asking for some fields is not reused when others are missing."""
+        cache = AnswerCache(threshold=0.95, max_size=10, ttl_seconds=0)
+        cache.store([1.0, 0.0], "es", ["order_id", "email"], "¿Me das tu pedido y tu email?")
+
+        assert cache.lookup([1.0, 0.0], "es", ["email"]) is None
+        assert cache.lookup([1.0, 0.0], "es", ["order_id"]) is None
+        assert cache.lookup([1.0, 0.0], "es", ["email", "order_id"]) == "¿Me das tu pedido y tu email?"
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = AnswerCache(threshold=0.95, max_size=2, ttl_seconds=0)
+        cache.store([1.0, 0.0, 0.0], "es", [], "a")
+        cache.store([0.0, 1.0, 0.0], "es", [], "b")
+        cache.lookup([1.0, 0.0, 0.0], "es", [])
+        cache.store([0.0, 0.0, 1.0], "es", [], "c")
+
+        assert cache.lookup([0.0, 1.0, 0.0], "es", []) is None
+        assert cache.lookup([1.0, 0.0, 0.0], "es", []) == "a"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size"] == 2
+
+    def test_ttl_expiry(self):
+        """Test that expired replies are not served."""
+        cache = AnswerCache(threshold=0.95, max_size=10, ttl_seconds=60)
+        cache.store([1.0, 0.0], "es", [], "a")
+
+        with patch('src.rag.answer_cache.time.monotonic', return_value=10**9):
+            assert cache.lookup([1.0, 0.0], "es", []) is None
+
+        assert cache.stats()["size"] == 0
+
+    def test_invalidated_on_reingest(self, store_version):
+        """Test that a new served version of a KB index drops only that index's replies."""
+        cache = AnswerCache(threshold=0.95, max_size=10, ttl_seconds=0)
+        cache.store([1.0, 0.0], "es", [], "a")
+
+        cache.store([1.0, 0.0], "es", [], "b", index_name="kb/en")
+
+        store_version.served_version.side_effect = lambda name: "v2" if name == "faiss_index" else "v1"
+
+        assert cache.lookup([1.0, 0.0], "es", []) is None
+        assert cache.lookup([1.0, 0.0], "es", [], index_name="kb/en") == "b"
+        assert cache.stats()["invalidations"] == 1
+
+    def test_kept_on_reload(self, store_version):
+        """Test that reloading the same version of a KB index keeps its replies."""
+        cache = AnswerCache(threshold=0.95, max_size=10, ttl_seconds=0)
+        cache.store([1.0, 0.0], "es", [], "a")
+
+        store_version.generation_of.return_value = 2
+
+        assert cache.lookup([1.0, 0.0], "es", []) == "a"
+        assert cache.stats()["invalidations"] == 0
+
+    def test_disabled(self):
+        """Test that size 0 disables the cache."""
+        cache = AnswerCache(threshold=0.95, max_size=0, ttl_seconds=0)
+        cache.store([1.0, 0.0], "es", [], "a")
+
+        assert cache.lookup([1.0, 0.0], "es", []) is None
@@ -187,12 +187,11 @@ class TestAdminEndpoints:
         return {"X-API-Key": "test-admin-key"}
     
     @patch('routes.admin.utils.admin_utils.settings')
-    @patch('routes.admin.v1.ep_admin.ingest_knowledge_base')
-    def test_ingest_success(self, mock_ingest, mock_settings, client, admin_headers):
-        """Test successful knowledge base ingestion."""
+    @patch('routes.admin.v1.ep_admin.get_ingest_job_manager')
+    def test_ingest_success(self, mock_get_manager, mock_settings, client, admin_headers):
+        """Test that ingestion is started in the background."""
         mock_settings.api_key_admin = "test-admin-key"
-        # Mock ingest to do nothing (it returns None in real code)
-        mock_ingest.return_value = None
+        mock_get_manager.return_value.submit.return_value = Mock(job_id="job-1")
         
         response = client.post(
             "/api/v1/admin/ingest",
@@ -200,10 +199,91 @@ class TestAdminEndpoints:
             headers=admin_headers
         )
         
-        assert response.status_code == 200
+        assert response.status_code == 202
         data = response.json()
-        assert data["status"] == "success"
+        assert data["status"] == "accepted"
+        assert data["job_id"] == "job-1"
         assert "message" in data
+
+    @patch('routes.admin.utils.admin_utils.settings')
+    @patch('routes.admin.v1.ep_admin.get_ingest_job_manager')
+    def test_ingest_already_running(self, mock_get_manager, mock_settings, client, admin_headers):
+        """Test that a second ingestion is rejected while one is running."""
+        from services.ingest_jobs import IngestJobRunningError
+        mock_settings.api_key_admin = "test-admin-key"
+        mock_get_manager.return_value.submit.side_effect = IngestJobRunningError("job-1")
+
+        response = client.post(
+            "/api/v1/admin/ingest",
+            json={"kb_path": "../kb"},
+            headers=admin_headers
+        )
+
+        assert response.status_code == 409
+        assert "job-1" in response.json()["detail"]
+
+    @patch('routes.admin.utils.admin_utils.settings')
+    @patch('routes.admin.v1.ep_admin.get_ingest_job_manager')
+    def test_get_ingest_job(self, mock_get_manager, mock_settings, client, admin_headers):
+        """Test polling an ingestion job."""
+        from beans.schemas.ingest.ingest_job_dto import IngestJob
+        mock_settings.api_key_admin = "test-admin-key"
+        mock_get_manager.return_value.get.return_value = IngestJob(
+            job_id="job-1", status="running", created_at="2025-11-06T00:00:00", eta_seconds=12.5
+        )
+
+        response = client.get("/api/v1/admin/ingest/job-1", headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "running"
+        assert data["progress"]["stage"] == "listing"
+        assert data["eta_seconds"] == 12.5
+
+    @patch('routes.admin.utils.admin_utils.settings')
+    @patch('routes.admin.v1.ep_admin.get_vector_store_manager')
+    @patch('routes.admin.v1.ep_admin.get_ingest_job_manager')
+    def test_rollback_index(self, mock_get_job_manager, mock_get_manager, mock_settings, client, admin_headers):
+        """Test rolling an index back to its previous version."""
+        mock_settings.api_key_admin = "test-admin-key"
+        mock_rollback = mock_get_job_manager.return_value.rollback
+        mock_get_manager.return_value.index_name = "faiss_index"
+        mock_get_manager.return_value.current_version.return_value = "v1"
+        mock_get_manager.return_value.list_versions.return_value = ["v1", "v2"]
+
+        response = client.post("/api/v1/admin/index/rollback", json={}, headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"index_name": "faiss_index", "current": "v1", "versions": ["v1", "v2"]}
+        mock_rollback.assert_called_once_with(None, None)
+
+        mock_rollback.side_effect = ValueError("No previous index version")
+        response = client.post("/api/v1/admin/index/rollback", json={}, headers=admin_headers)
+        assert response.status_code == 404
+
+    @patch('routes.admin.utils.admin_utils.settings')
+    @patch('routes.admin.v1.ep_admin.get_ingest_job_manager')
+    def test_rollback_conflicts_with_ingest(self, mock_get_job_manager, mock_settings, client, admin_headers):
+        """Test that a rollback is rejected while an ingestion is running."""
+        from services.ingest_jobs import IngestJobRunningError
+        mock_settings.api_key_admin = "test-admin-key"
+        mock_get_job_manager.return_value.rollback.side_effect = IngestJobRunningError("job-1")
+
+        response = client.post("/api/v1/admin/index/rollback", json={}, headers=admin_headers)
+
+        assert response.status_code == 409
+        assert "job-1" in response.json()["detail"]
+
+    @patch('routes.admin.utils.admin_utils.settings')
+    @patch('routes.admin.v1.ep_admin.get_ingest_job_manager')
+    def test_get_ingest_job_not_found(self, mock_get_manager, mock_settings, client, admin_headers):
+        """Test polling an unknown ingestion job."""
+        mock_settings.api_key_admin = "test-admin-key"
+        mock_get_manager.return_value.get.return_value = None
+
+        response = client.get("/api/v1/admin/ingest/missing", headers=admin_headers)
+
+        assert response.status_code == 404
     
     @patch('routes.admin.utils.admin_utils.settings')
     def test_ingest_unauthorized(self, mock_settings, client):
@@ -267,6 +347,19 @@ class TestAdminEndpoints:
         
         assert response.status_code == 404
 
+    @patch('routes.admin.utils.admin_utils.settings')
+    def test_cache_stats(self, mock_settings, client, admin_headers):
+        """Test cache statistics endpoint."""
+        mock_settings.api_key_admin = "test-admin-key"
+
+        response = client.get("/api/v1/admin/cache/stats", headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "hit_ratio" in data["query_embedding_cache"]
+        assert "embedding_cache" in data
+        assert "hit_ratio" in data["answer_cache"]
+
 
 class TestCORSMiddleware:
     """Tests for CORS middleware."""
@@ -0,0 +1,104 @@
+"""
+Tests for batched, concurrent embedding during ingestion.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from langchain_core.embeddings import Embeddings
+from src.rag.batch_embed import embed_texts_batched, TokenBudget
+
+
+class FlakyEmbeddings(Embeddings):
+    """Offline embeddings injecting latency and transient errors."""
+
+    def __init__(self, latency: float=0.0, failures: dict | None=None):
+        self.latency = latency
+        self.failures = dict(failures or {})  # first text of batch -> failures left
+        self.calls = 0
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.calls += 1
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+        try:
+            time.sleep(self.latency)
+            with self._lock:
+                if self.failures.get(texts[0], 0) > 0:
+                    self.failures[texts[0]] -= 1
+                    raise ConnectionError("injected failure")
+            return [[float(text.split("-")[1])] for text in texts]
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def texts():
+    """Numbered texts whose vector encodes their position."""
+    return [f"chunk-{i}" for i in range(50)]
+
+
+class TestEmbedTextsBatched:
+    """Tests for embed_texts_batched."""
+
+    def test_preserves_order_with_concurrency(self, texts):
+        """Test that vectors come back in input order while batches run concurrently."""
+        embeddings = FlakyEmbeddings(latency=0.05)
+
+        vectors = embed_texts_batched(texts, embeddings, batch_size=5, max_workers=5, tokens_per_minute=0)
+
+        assert vectors == [[float(i)] for i in range(50)]
+        assert embeddings.calls == 10
+        assert embeddings.max_concurrent > 1
+
+    def test_retries_failed_batch_only(self, texts):
+        """Test that a failing batch is retried on its own."""
+        embeddings = FlakyEmbeddings(failures={"chunk-10": 2})
+
+        vectors = embed_texts_batched(texts, embeddings, batch_size=10, max_workers=2,
+                                      tokens_per_minute=0, max_retries=3, retry_backoff_seconds=0)
+
+        assert vectors == [[float(i)] for i in range(50)]
+        assert embeddings.calls == 5 + 2
+
+    def test_raises_after_max_retries(self, texts):
+        """Test that a permanently failing batch aborts the embedding."""
+        embeddings = FlakyEmbeddings(failures={"chunk-0": 10})
+
+        with pytest.raises(RuntimeError):
+            embed_texts_batched(texts, embeddings, batch_size=10, max_workers=2,
+                                tokens_per_minute=0, max_retries=1, retry_backoff_seconds=0)
+
+
+class TestTokenBudget:
+    """Tests for the tokens-per-minute budget."""
+
+    def test_waits_when_budget_exhausted(self):
+        """Test that acquiring beyond the budget sleeps for the refill time."""
+        budget = TokenBudget(tokens_per_minute=600)
+
+        with patch('src.rag.batch_embed.time.sleep') as mock_sleep:
+            budget.acquire(600)
+            mock_sleep.assert_not_called()
+
+            mock_sleep.side_effect = lambda seconds: setattr(budget, "_available", 600.0)
+            budget.acquire(60)
+
+            waited = mock_sleep.call_args.args[0]
+            assert 5.0 <= waited <= 6.1
+
+    def test_unlimited_budget(self):
+        """Test that a zero budget never blocks."""
+        budget = TokenBudget(tokens_per_minute=0)
+
+        with patch('src.rag.batch_embed.time.sleep') as mock_sleep:
+            budget.acquire(10**9)
+            mock_sleep.assert_not_called()
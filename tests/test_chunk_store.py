@@ -0,0 +1,66 @@
+"""
+Tests for the memory-mappable chunk store.
+"""
+from unittest.mock import Mock, patch
+from langchain_core.documents.base import Document
+from src.rag.chunk_store import ChunkStore, write_chunk_store, chunk_store_exists
+from src.rag.index_factory import create_empty_vectorstore
+from src.rag.store import VectorStoreManager
+
+
+class TestChunkStore:
+    """Tests for write_chunk_store and ChunkStore."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that chunks are read back by position and by id."""
+        documents = [
+            Document(page_content="Envío en 24 horas", metadata={"source": "envios.md"}),
+            Document(page_content="Devoluciones en 30 días", metadata={"source": "devoluciones.md"})
+        ]
+        write_chunk_store(tmp_path, ["b-id", "a-id"], documents)
+
+        store = ChunkStore(tmp_path)
+
+        assert chunk_store_exists(tmp_path)
+        assert len(store) == 2
+        assert store.get(1).page_content == "Devoluciones en 30 días"
+        assert store.search("b-id").metadata == {"source": "envios.md"}
+        assert store.search("b-id").id == "b-id"
+        assert store.position_ids()[1] == "a-id"
+        assert store.search("missing") == "ID missing not found."
+
+    def test_empty_store(self, tmp_path):
+        """Test that an empty store can be opened."""
+        write_chunk_store(tmp_path, [], [])
+
+        store = ChunkStore(tmp_path)
+
+        assert len(store) == 0
+        assert list(store) == []
+
+
+class TestMemoryMappedLoad:
+    """Tests for loading a vectorstore memory-mapped."""
+
+    def test_mmap_matches_eager_load(self, tmp_path):
+        """Test that a memory-mapped vectorstore returns the same hits as an eager one."""
+        vectors = [[float(i), float(i % 3), 1.0, 0.5] for i in range(20)]
+        vectorstore, _ = create_empty_vectorstore(Mock(), vectors)
+        vectorstore.add_embeddings([(f"chunk {i}", v) for i, v in enumerate(vectors)],
+                                   metadatas=[{"n": i} for i in range(20)],
+                                   ids=[f"id{i}" for i in range(20)])
+
+        with patch('src.rag.store.settings') as mock_settings:
+            mock_settings.vectorstore_path = str(tmp_path)
+            mock_settings.vectorstore_index_name = "test_index"
+            manager = VectorStoreManager()
+            manager.save_vectorstore(vectorstore)
+
+            mapped = manager.load_vectorstore(Mock())
+            eager = manager.load_vectorstore(Mock(), writable=True)
+
+        assert type(mapped.docstore).__name__ == "ChunkStore"
+        hits = mapped.similarity_search_by_vector(vectors[7], k=3)
+        assert [doc.page_content for doc in hits] == \
+            [doc.page_content for doc in eager.similarity_search_by_vector(vectors[7], k=3)]
+        assert hits[0].metadata == {"n": 7}
@@ -0,0 +1,66 @@
+"""
+Tests for extractive context compression.
+"""
+from unittest.mock import Mock
+from langchain_core.documents.base import Document
+from src.llm.hashing_embeddings import HashingEmbeddings
+from src.rag.compression import ExtractiveCompressor, split_sentences
+
+
+def test_split_sentences():
+    """Test that sentence ends and line breaks split, and blanks are dropped."""
+    text = "Shipping takes 5-7 days. Express is faster!\n\n- Track it online\nWhy? Because."
+    assert split_sentences(text) == [
+        "Shipping takes 5-7 days.", "Express is faster!", "- Track it online", "Why?", "Because."
+    ]
+
+
+class TestExtractiveCompressor:
+    """Tests for ExtractiveCompressor."""
+
+    DOCUMENTS = [
+        Document(id="returns", page_content="Returns are accepted within 30 days. Refunds take a week.",
+                 metadata={"source": "returns.md"}),
+        Document(id="shipping", page_content="Our office is in Madrid. Standard shipping takes 5-7 business days.",
+                 metadata={"source": "shipping.md"})
+    ]
+
+    def test_keeps_most_similar_sentences(self):
+        """Test that only the sentences closest to the query survive, in retrieval order."""
+        compressor = ExtractiveCompressor(embeddings=HashingEmbeddings(dim=512), max_tokens=12, min_similarity=0.1)
+
+        compressed = compressor.compress_documents(self.DOCUMENTS, "how many days does shipping take")
+
+        assert [document.id for document in compressed] == ["shipping"]
+        assert compressed[0].page_content == "Standard shipping takes 5-7 business days."
+        assert compressed[0].metadata["source"] == "shipping.md"
+        assert compressed[0].metadata["compression_score"] > 0.1
+
+    def test_token_budget(self):
+        """Test that the kept sentences fit the budget, and the best one is kept even if it does not."""
+        embeddings = HashingEmbeddings(dim=512)
+
+        generous = ExtractiveCompressor(embeddings=embeddings, max_tokens=1000).compress_documents(
+            self.DOCUMENTS, "shipping days"
+        )
+        tight = ExtractiveCompressor(embeddings=embeddings, max_tokens=1).compress_documents(
+            self.DOCUMENTS, "shipping days"
+        )
+
+        assert sum(len(split_sentences(document.page_content)) for document in generous) == 4
+        assert [document.page_content for document in tight] == ["Standard shipping takes 5-7 business days."]
+
+    def test_uses_given_query_embedding(self):
+        """Test that a cached query embedding function replaces embeddings.embed_query."""
+        embeddings = HashingEmbeddings(dim=64)
+        embed_query = Mock(side_effect=embeddings.embed_query)
+        compressor = ExtractiveCompressor(embeddings=embeddings, embed_query=embed_query)
+
+        compressor.compress_documents(self.DOCUMENTS, "refunds")
+
+        embed_query.assert_called_once_with("refunds")
+
+    def test_no_sentences(self):
+        """Test that empty documents compress to nothing."""
+        compressor = ExtractiveCompressor(embeddings=HashingEmbeddings(dim=8))
+        assert compressor.compress_documents([Document(page_content="  ")], "query") == []
@@ -0,0 +1,155 @@
+"""
+Tests for the concurrent per-turn stages of ConversationService.
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from src.services.conversation import ConversationService
+from src.rag.answer_cache import AnswerCache
+from src.beans.schemas.conversations.chat_request_dto import ChatRequest
+from beans.schemas.extraction.extracted_data_dto import ExtractedData
+from beans.schemas.extraction.extraction_result_dto import ExtractionResult
+from beans.schemas.rag.rag_context_dto import RagContext
+from src.utils.timing import SpanRecorder
+
+DELAY = 0.2
+
+
+@pytest.fixture
+def service():
+    """Conversation service whose slow stages each take DELAY seconds, extraction twice as long."""
+    calls = []
+
+    async def detect(text):
+        await asyncio.sleep(DELAY)
+        return {"idioma_detectado": "es", "texto_traducido": text}
+
+    async def embed(question, index_name=None):
+        return [1.0, 0.0]
+
+    async def extract(**kwargs):
+        await asyncio.sleep(DELAY * 2)
+        return ExtractionResult(extracted=ExtractedData(), missing_fields=["order_id"])
+
+    async def retrieve(question, index_name=None, language=None):
+        calls.append(("retrieve", language))
+        await asyncio.sleep(DELAY)
+        return RagContext(chunks=["Shipping takes 5-7 days"], tokens=6)
+
+    async def reply(**kwargs):
+        calls.append(("reply", kwargs["context"]))
+        await asyncio.sleep(DELAY)
+        return "Tu pedido llega en 5-7 días"
+
+    with patch('src.services.conversation.get_memory_manager'), \
+            patch('src.services.conversation.get_chain_manager') as mock_chain_manager, \
+            patch('src.services.conversation.get_extraction_service') as mock_extraction, \
+            patch('src.services.conversation.get_summarization_service'), \
+            patch('src.services.conversation.get_storage_service'), \
+            patch('src.services.conversation.get_answer_cache') as mock_answer_cache, \
+            patch('src.services.conversation.get_language_data', detect), \
+            patch('src.services.conversation.aembed_user_question', embed), \
+            patch('src.services.conversation.aretrieve_context', retrieve), \
+            patch('src.services.conversation.analyze_sentiment', return_value=("neutral", 0.0)):
+        mock_chain_manager.return_value.agenerate_response = reply
+        mock_extraction.return_value.aextract_from_message = extract
+        mock_answer_cache.return_value.lookup.return_value = None
+        conversation = ConversationService()
+        conversation.memory_manager.get_session_count.return_value = 0
+        conversation.memory_manager.get_conversation_text.return_value = ""
+        conversation.calls = calls
+        yield conversation
+
+
+class TestConcurrentTurn:
+    """Tests for the dependency graph of a turn."""
+
+    @pytest.mark.asyncio
+    async def test_retrieval_overlaps_extraction(self, service, capsys):
+        """Test that extraction and retrieval run together and the reply gets the retrieved context."""
+        start = time.perf_counter()
+        response = await service.process_message(ChatRequest(session_id="session-1", message="¿Dónde está mi pedido?"))
+        elapsed = time.perf_counter() - start
+
+        # max(language + retrieval, extraction) + reply = 3 * DELAY; 4 * DELAY if extraction waited for the language
+        assert elapsed < DELAY * 3.6
+        assert response.reply == "Tu pedido llega en 5-7 días"
+        assert ("retrieve", "es") in service.calls
+        assert "Shipping takes 5-7 days" in dict(service.calls)["reply"]
+        service.storage_service.add_turn.assert_called_once()
+        assert service.storage_service.add_turn.call_args.kwargs["rag_context_tokens"] == 6
+        critical_path = capsys.readouterr().out.split("critical_path: ")[-1].split()
+        assert critical_path[0] == "language"
+        assert "reply" in critical_path
+
+    @pytest.mark.asyncio
+    async def test_answer_cache_hit_skips_reply(self, service):
+        """Test that a cached answer cancels retrieval and makes no LLM reply."""
+        service.answer_cache.lookup.return_value = "Respuesta en caché"
+
+        response = await service.process_message(ChatRequest(session_id="session-2", message="¿Dónde está mi pedido?"))
+
+        assert response.reply == "Respuesta en caché"
+        assert "reply" not in dict(service.calls)
+        assert service.storage_service.add_turn.call_args.kwargs["rag_context_tokens"] == 0
+
+    @pytest.mark.asyncio
+    async def test_answer_cache_not_shared_across_sessions(self, service):
+        """Test that replies built from a session's extracted data are not served to other sessions."""
+        order_ids = {"session-a": "ABC123", "session-b": "XYZ789"}
+
+        async def extract(**kwargs):
+            return ExtractionResult(extracted=ExtractedData(order_id=order_ids[current]), missing_fields=["category"])
+
+        async def reply(**kwargs):
+            return f"Revisando el pedido {order_ids[current]}"
+
+        service.extraction_service.aextract_from_message = extract
+        service.chain_manager.agenerate_response = reply
+        with patch('src.rag.answer_cache.get_vector_store_manager') as mock_get_manager:
+            mock_get_manager.return_value.served_version.return_value = "v1"
+            service.answer_cache = AnswerCache(threshold=0.95, max_size=10, ttl_seconds=0)
+
+            replies = {}
+            for current in order_ids:
+                response = await service.process_message(ChatRequest(session_id=current, message="¿Dónde está mi pedido?"))
+                replies[current] = response.reply
+
+        assert replies == {"session-a": "Revisando el pedido ABC123", "session-b": "Revisando el pedido XYZ789"}
+        assert service.answer_cache.stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_tts_overlaps_persistence(self, service):
+        """Test that the audio reply is synthesized off the event loop while the turn is stored."""
+        tts = MagicMock()
+        tts.text_to_speech.side_effect = lambda text, language: (time.sleep(DELAY), b"audio")[1]
+        service.storage_service.add_turn.side_effect = lambda **kwargs: time.sleep(DELAY)
+
+        with patch('src.services.conversation.stt_tts.get_stt_tts_service', return_value=tts):
+            start = time.perf_counter()
+            response = await service.process_message(
+                ChatRequest(session_id="session-3", message="Hola", audio_response=True)
+            )
+            elapsed = time.perf_counter() - start
+
+        assert response.sound_file_base64 == "YXVkaW8="
+        # 3 * DELAY to the reply, then max(tts, persistence)
+        assert elapsed < DELAY * 4.6
+
+
+def test_span_recorder_critical_path():
+    """Test that the critical path follows the stages that set the total latency."""
+    trace = SpanRecorder()
+    trace.spans = {
+        "language": (0.0, 0.1),
+        "embed_question": (0.0, 0.05),
+        "extraction": (0.1, 1.0),
+        "retrieval": (0.1, 0.3),
+        "reply": (1.0, 2.0),
+        "persistence": (2.0, 2.1),
+        "tts": (2.0, 2.5)
+    }
+
+    assert trace.critical_path() == ["language", "extraction", "reply", "tts"]
+    assert "retrieval: 0.100-0.300" in trace.describe()
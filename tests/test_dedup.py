@@ -0,0 +1,51 @@
+"""
+Tests for MinHash/LSH near-duplicate detection.
+"""
+from src.rag.dedup import NearDuplicateIndex, _lsh_bands
+
+ANSWER = (
+    "Los pedidos se envían en 24-48 horas laborables. Si tu pedido no ha llegado, "
+    "revisa el número de seguimiento en tu cuenta o contacta con soporte."
+)
+
+
+class TestNearDuplicateIndex:
+    """Tests for NearDuplicateIndex."""
+
+    def test_detects_near_duplicates(self):
+        """Test that a lightly edited copy is reported as a duplicate of the original."""
+        index = NearDuplicateIndex(threshold=0.8)
+
+        assert index.check_and_add("original", ANSWER) is None
+        assert index.check_and_add("copy", ANSWER.replace("contacta con soporte", "contacta con el soporte")) == "original"
+        assert len(index) == 1
+
+    def test_keeps_different_chunks(self):
+        """Test that unrelated chunks are all indexed."""
+        index = NearDuplicateIndex(threshold=0.8)
+
+        assert index.check_and_add("shipping", ANSWER) is None
+        assert index.check_and_add("returns", "Las devoluciones se aceptan durante 30 días desde la entrega.") is None
+        assert len(index) == 2
+
+    def test_ignores_case_and_accents(self):
+        """Test that case and accents do not hide a duplicate."""
+        index = NearDuplicateIndex(threshold=0.9)
+        index.add_text("original", ANSWER)
+
+        assert index.check_and_add("upper", ANSWER.upper()) == "original"
+
+    def test_texts_without_words(self):
+        """Test that chunks without words are never reported as duplicates."""
+        index = NearDuplicateIndex(threshold=0.9)
+
+        assert index.check_and_add("a", "---") is None
+        assert index.check_and_add("b", "---") is None
+
+
+def test_lsh_bands_favor_recall():
+    """Test that bands are chosen so pairs at the threshold are almost always compared."""
+    bands, rows = _lsh_bands(64, 0.9)
+
+    assert bands * rows == 64
+    assert 1.0 - (1.0 - 0.9 ** rows) ** bands >= 0.98
@@ -0,0 +1,124 @@
+"""
+Tests for the persistent embedding cache.
+"""
+import threading
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.llm.embedding_cache import EmbeddingCacheStore, CachedEmbeddings
+
+
+@pytest.fixture
+def base_embeddings():
+    """Embeddings mock returning a vector derived from the text length."""
+    mock = Mock()
+    mock.embed_documents.side_effect = lambda texts: [[float(len(t)), 1.0, 2.0] for t in texts]
+    mock.embed_query.side_effect = lambda text: [float(len(text)), 1.0, 2.0]
+    mock.aembed_documents = AsyncMock(side_effect=lambda texts: [[float(len(t)), 1.0, 2.0] for t in texts])
+    mock.aembed_query = AsyncMock(side_effect=lambda text: [float(len(text)), 1.0, 2.0])
+    return mock
+
+
+class TestEmbeddingCacheStore:
+    """Tests for EmbeddingCacheStore."""
+
+    def test_put_and_get(self, tmp_path):
+        """Test storing and reading vectors."""
+        store = EmbeddingCacheStore(tmp_path / "cache", max_entries=10)
+        store.put_many({"a" * 64: [1.0, 2.0], "b" * 64: [3.0, 4.0]})
+
+        found = store.get_many(["a" * 64, "b" * 64, "c" * 64])
+
+        assert found == {"a" * 64: [1.0, 2.0], "b" * 64: [3.0, 4.0]}
+        assert len(store) == 2
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that cached vectors survive reopening the store."""
+        EmbeddingCacheStore(tmp_path / "cache", max_entries=10).put_many({"a" * 64: [0.5, 0.25]})
+
+        reopened = EmbeddingCacheStore(tmp_path / "cache", max_entries=10)
+
+        assert reopened.get_many(["a" * 64]) == {"a" * 64: [0.5, 0.25]}
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entry is evicted when full."""
+        store = EmbeddingCacheStore(tmp_path / "cache", max_entries=2)
+        store.put_many({"a" * 64: [1.0]})
+        store.put_many({"b" * 64: [2.0]})
+        store.get_many(["a" * 64])  # "b" becomes least recently used
+
+        store.put_many({"c" * 64: [3.0]})
+
+        assert len(store) == 2
+        assert store.get_many(["a" * 64, "b" * 64, "c" * 64]) == {"a" * 64: [1.0], "c" * 64: [3.0]}
+
+    def test_hits_do_not_commit(self, tmp_path):
+        """Test that the last use of hit keys is buffered instead of committed on every lookup."""
+        store = EmbeddingCacheStore(tmp_path / "cache", max_entries=10)
+        store.put_many({"a" * 64: [1.0]})
+        changes = store._conn.total_changes
+
+        for _ in range(10):
+            store.get_many(["a" * 64])
+
+        assert store._conn.total_changes == changes
+        assert "a" * 64 in store._usage
+
+
+class TestCachedEmbeddings:
+    """Tests for CachedEmbeddings."""
+
+    def test_embed_documents_only_misses(self, tmp_path, base_embeddings):
+        """Test that only uncached texts reach the wrapped model."""
+        cached = CachedEmbeddings(base_embeddings, EmbeddingCacheStore(tmp_path / "cache", max_entries=10))
+
+        first = cached.embed_documents(["hola", "adios"])
+        second = cached.embed_documents(["hola", "nuevo texto", "hola"])
+
+        assert first == [[4.0, 1.0, 2.0], [5.0, 1.0, 2.0]]
+        assert second == [[4.0, 1.0, 2.0], [11.0, 1.0, 2.0], [4.0, 1.0, 2.0]]
+        assert base_embeddings.embed_documents.call_args_list[-1].args[0] == ["nuevo texto"]
+        assert cached.stats()["hits"] == 2
+        assert cached.stats()["misses"] == 3
+
+    def test_embed_query_shares_cache(self, tmp_path, base_embeddings):
+        """Test that queries hit vectors cached during ingestion."""
+        cached = CachedEmbeddings(base_embeddings, EmbeddingCacheStore(tmp_path / "cache", max_entries=10))
+        cached.embed_documents(["mi pedido no ha llegado"])
+
+        vector = cached.embed_query("mi pedido no ha llegado")
+
+        assert vector == [23.0, 1.0, 2.0]
+        base_embeddings.embed_query.assert_not_called()
+        assert cached.stats()["hit_ratio"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_async_uses_native_async_client(self, tmp_path, base_embeddings):
+        """Test that async embedding awaits the wrapped model's async methods and shares the cache."""
+        cached = CachedEmbeddings(base_embeddings, EmbeddingCacheStore(tmp_path / "cache", max_entries=10))
+
+        documents = await cached.aembed_documents(["hola", "adios", "hola"])
+        query = await cached.aembed_query("hola")
+        fresh = await cached.aembed_query("otra pregunta")
+
+        assert documents == [[4.0, 1.0, 2.0], [5.0, 1.0, 2.0], [4.0, 1.0, 2.0]]
+        assert query == [4.0, 1.0, 2.0]
+        assert fresh == [13.0, 1.0, 2.0]
+        base_embeddings.aembed_documents.assert_awaited_once_with(["hola", "adios"])
+        base_embeddings.aembed_query.assert_awaited_once_with("otra pregunta")
+        base_embeddings.embed_documents.assert_not_called()
+        base_embeddings.embed_query.assert_not_called()
+        assert cached.embed_query("otra pregunta") == [13.0, 1.0, 2.0]
+
+    def test_counters_thread_safe(self, tmp_path, base_embeddings):
+        """Test that hits and misses counted from many threads add up."""
+        cached = CachedEmbeddings(base_embeddings, EmbeddingCacheStore(tmp_path / "cache", max_entries=10))
+        cached.embed_documents(["hola"])
+
+        threads = [threading.Thread(target=lambda: [cached.embed_query("hola") for _ in range(50)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cached.stats()["hits"] == 400
+        assert cached.stats()["misses"] == 1
@@ -4,7 +4,7 @@ Unit tests for extraction.py service.
 import pytest
 import sys
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 
 # Add src to path
 src_path = Path(__file__).parent.parent / "src"
@@ -250,6 +250,34 @@ class TestExtractionService:
         assert isinstance(result, ExtractionResult)
 
 
+    @pytest.mark.asyncio
+    async def test_aextract_from_message(self, extraction_service, mock_chain_manager):
+        """Test that async extraction awaits the chain manager and merges like the sync one."""
+        mock_chain_manager.aextract_structured_info = AsyncMock(return_value={"urgency": "high"})
+
+        result = await extraction_service.aextract_from_message(
+            message="Es urgente",
+            history="",
+            current_data=ExtractedData(order_id="ABC123456")
+        )
+
+        mock_chain_manager.aextract_structured_info.assert_awaited_once_with(message="Es urgente", history="")
+        mock_chain_manager.extract_structured_info.assert_not_called()
+        assert result.extracted.order_id == "ABC123456"
+        assert result.extracted.urgency == "high"
+
+    @pytest.mark.asyncio
+    async def test_aextract_handles_llm_exception(self, extraction_service, mock_chain_manager):
+        """Test that async extraction keeps the current data on failure."""
+        mock_chain_manager.aextract_structured_info = AsyncMock(side_effect=Exception("API Error"))
+        current = ExtractedData(order_id="ABC123456")
+
+        result = await extraction_service.aextract_from_message(message="Hola", history="", current_data=current)
+
+        assert result.extracted == current
+        assert result.is_complete is False
+
+
 class TestExtractionServiceSingleton:
     """Tests for extraction service singleton pattern."""
     
@@ -0,0 +1,66 @@
+"""
+Tests for the offline hashing embeddings provider.
+"""
+import numpy as np
+import pytest
+from unittest.mock import patch
+from src.llm.hashing_embeddings import HashingEmbeddings
+from src.llm import models
+from src.llm.models import get_embeddings, get_embeddings_model_name
+
+
+class TestHashingEmbeddings:
+    """Tests for HashingEmbeddings."""
+
+    def test_deterministic_unit_vectors(self):
+        """Test that vectors are reproducible, sized and L2-normalized."""
+        embeddings = HashingEmbeddings(dim=64)
+
+        first = embeddings.embed_documents(["¿Dónde está mi pedido?", "Política de devoluciones"])
+        second = HashingEmbeddings(dim=64).embed_documents(["¿Dónde está mi pedido?", "Política de devoluciones"])
+
+        assert first == second
+        assert all(len(vector) == 64 for vector in first)
+        assert np.linalg.norm(first, axis=1) == pytest.approx([1.0, 1.0], abs=1e-5)
+        assert embeddings.embed_query("¿Dónde está mi pedido?") == first[0]
+
+    def test_similar_texts_score_higher(self):
+        """Test that texts sharing words are closer than unrelated ones."""
+        embeddings = HashingEmbeddings(dim=512)
+        query = np.array(embeddings.embed_query("how long does shipping take"))
+        related, unrelated = np.array(embeddings.embed_documents([
+            "Standard shipping takes 5-7 business days.",
+            "You can return items within 30 days."
+        ]))
+
+        assert query @ related > query @ unrelated
+
+    def test_accents_and_case_ignored(self):
+        """Test that accents and case do not change the vector."""
+        embeddings = HashingEmbeddings(dim=128)
+        assert embeddings.embed_query("ENVÍO rápido") == embeddings.embed_query("envio rapido")
+
+    def test_text_without_words(self):
+        """Test that texts without words embed as a zero vector."""
+        assert HashingEmbeddings(dim=8).embed_query("¿?") == [0.0] * 8
+
+    def test_invalid_dimension(self):
+        """Test that a non-positive dimension is rejected."""
+        with pytest.raises(ValueError):
+            HashingEmbeddings(dim=0)
+
+
+def test_selected_by_provider():
+    """Test that embeddings_provider=hashing needs no API key and skips the embedding cache."""
+    with patch('src.llm.models.settings') as mock_settings:
+        mock_settings.embeddings_provider = "hashing"
+        mock_settings.embedding_cache_enabled = True
+        mock_settings.hashing_embeddings_dim = 32
+        mock_settings.hashing_embeddings_word_ngrams = 1
+        mock_settings.hashing_embeddings_char_ngrams = 0
+
+        embeddings = get_embeddings()
+
+        assert isinstance(embeddings, models.HashingEmbeddings)
+        assert len(embeddings.embed_query("pedido")) == 32
+        assert get_embeddings_model_name() == "hashing-d32-w1-c0"
@@ -0,0 +1,104 @@
+"""
+Tests for FAISS index construction.
+"""
+import numpy as np
+import pytest
+import faiss
+from unittest.mock import Mock, patch
+from src.rag.index_factory import resolve_index_config, create_empty_vectorstore, remove_vectors
+
+
+def random_vectors(count: int, dim: int=16, seed: int=0) -> np.ndarray:
+    """Reproducible float32 vectors."""
+    return np.random.default_rng(seed).random((count, dim), dtype=np.float32)
+
+
+@pytest.fixture
+def index_settings():
+    """Patch index settings with small values."""
+    with patch('src.rag.index_factory.settings') as mock_settings:
+        mock_settings.vectorstore_index_type = "flat"
+        mock_settings.vectorstore_ivf_nlist = 8
+        mock_settings.vectorstore_ivf_nprobe = 4
+        mock_settings.vectorstore_pq_m = 6
+        mock_settings.vectorstore_pq_nbits = 4
+        mock_settings.vectorstore_hnsw_m = 8
+        mock_settings.vectorstore_hnsw_ef_construction = 40
+        mock_settings.vectorstore_hnsw_ef_search = 32
+        mock_settings.vectorstore_train_sample_size = 1000
+        yield mock_settings
+
+
+class TestResolveIndexConfig:
+    """Tests for resolve_index_config."""
+
+    def test_ivf_falls_back_to_flat_with_few_vectors(self, index_settings):
+        """Test that IVF is not trained on too few vectors."""
+        index_settings.vectorstore_index_type = "ivf_flat"
+
+        config = resolve_index_config(dim=16, n_train=20)
+
+        assert config.requested_type == "ivf_flat"
+        assert config.index_type == "flat"
+
+    def test_ivf_shrinks_nlist(self, index_settings):
+        """Test that nlist is reduced to what the sample can train."""
+        index_settings.vectorstore_index_type = "ivf_flat"
+
+        config = resolve_index_config(dim=16, n_train=200)
+
+        assert config.index_type == "ivf_flat"
+        assert config.nlist == 200 // 39
+        assert config.nprobe == 4
+
+    def test_pq_uses_divisor_of_dim(self, index_settings):
+        """Test that the PQ sub-quantizer count divides the dimension."""
+        index_settings.vectorstore_index_type = "ivf_pq"
+
+        config = resolve_index_config(dim=16, n_train=1000)
+
+        assert config.index_type == "ivf_pq"
+        assert config.pq_m == 4
+        assert config.factory_string() == "IVF8,PQ4x4"
+
+
+class TestCreateEmptyVectorstore:
+    """Tests for create_empty_vectorstore and remove_vectors."""
+
+    @pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "ivf_pq", "hnsw"])
+    def test_search_finds_exact_match(self, index_settings, index_type):
+        """Test that every index type returns a stored vector as its own nearest neighbour."""
+        index_settings.vectorstore_index_type = index_type
+        vectors = random_vectors(1000)
+
+        vectorstore, config = create_empty_vectorstore(Mock(), vectors)
+        vectorstore.add_embeddings([(f"text {i}", v.tolist()) for i, v in enumerate(vectors)],
+                                   ids=[f"id{i}" for i in range(len(vectors))])
+
+        assert config.index_type == index_type
+        assert vectorstore.index.ntotal == 1000
+        docs = vectorstore.similarity_search_by_vector(vectors[42].tolist(), k=1)
+        assert docs[0].page_content == "text 42"
+
+    def test_ivf_applies_nprobe(self, index_settings):
+        """Test that nprobe from settings is set on the trained index."""
+        index_settings.vectorstore_index_type = "ivf_flat"
+
+        vectorstore, _ = create_empty_vectorstore(Mock(), random_vectors(1000))
+
+        assert faiss.extract_index_ivf(vectorstore.index).nprobe == 4
+
+    def test_hnsw_remove_rebuilds(self, index_settings):
+        """Test that removing from HNSW keeps the remaining chunks searchable."""
+        index_settings.vectorstore_index_type = "hnsw"
+        vectors = random_vectors(50)
+        vectorstore, config = create_empty_vectorstore(Mock(), vectors)
+        vectorstore.add_embeddings([(f"text {i}", v.tolist()) for i, v in enumerate(vectors)],
+                                   ids=[f"id{i}" for i in range(len(vectors))])
+
+        remove_vectors(vectorstore, ["id0", "id1", "id2"], config)
+
+        assert vectorstore.index.ntotal == 47
+        assert "id0" not in vectorstore.index_to_docstore_id.values()
+        docs = vectorstore.similarity_search_by_vector(vectors[10].tolist(), k=1)
+        assert docs[0].page_content == "text 10"
@@ -0,0 +1,154 @@
+"""
+Tests for background ingestion jobs.
+"""
+import threading
+from unittest.mock import patch
+import pytest
+from src.services.ingest_jobs import IngestJobManager, IngestJobRunningError
+from src.beans.schemas.ingest.ingest_job_dto import IngestJob
+from src.beans.schemas.ingest.ingest_progress_dto import IngestProgress
+from src.beans.schemas.ingest.ingest_stats_dto import IngestStats
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Job manager writing job files to a temporary directory."""
+    with patch('src.services.ingest_jobs.settings') as mock_settings:
+        mock_settings.ingest_jobs_path = str(tmp_path)
+        yield IngestJobManager()
+
+
+def _wait_for_thread(job_id: str) -> None:
+    for thread in threading.enumerate():
+        if thread.name == f"ingest-{job_id}":
+            thread.join(timeout=5)
+
+
+class TestIngestJobManager:
+    """Tests for IngestJobManager."""
+
+    def test_job_reports_progress_and_stats(self, manager):
+        """Test that a job runs in the background and records progress and outcome."""
+        release = threading.Event()
+        embedding = threading.Event()
+
+        def fake_ingest(full_rebuild, on_progress, kb_path=None, index_name=None):
+            on_progress(IngestProgress(stage="embedding", files_total=4, files_done=2,
+                                       chunks_queued=10, chunks_embedded=5))
+            embedding.set()
+            release.wait(timeout=5)
+            return IngestStats(chunks_added=20)
+
+        with patch('src.services.ingest_jobs.ingest_knowledge_base', side_effect=fake_ingest):
+            job = manager.submit("../kb")
+            assert embedding.wait(timeout=5)
+
+            running = manager.get(job.job_id)
+            assert running.status == "running"
+            assert running.progress.chunks_embedded == 5
+            assert running.chunks_per_second > 0
+            assert running.eta_seconds is not None
+
+            release.set()
+            _wait_for_thread(job.job_id)
+
+        finished = manager.get(job.job_id)
+        assert finished.status == "succeeded"
+        assert finished.stats.chunks_added == 20
+        assert finished.progress.stage == "done"
+        assert finished.finished_at is not None
+
+    def test_single_concurrent_ingest(self, manager):
+        """Test that a second ingestion is rejected while one is running."""
+        release = threading.Event()
+
+        with patch('src.services.ingest_jobs.ingest_knowledge_base',
+                   side_effect=lambda **kwargs: release.wait(timeout=5) and IngestStats()):
+            job = manager.submit()
+            with pytest.raises(IngestJobRunningError) as error:
+                manager.submit()
+            assert error.value.job_id == job.job_id
+
+            release.set()
+            _wait_for_thread(job.job_id)
+
+            # Lock released once the job ends
+            second = manager.submit()
+            _wait_for_thread(second.job_id)
+
+    def test_rollback_conflicts_with_ingest(self, manager):
+        """Test that a rollback and an ingestion never run at the same time."""
+        release = threading.Event()
+        rolling_back = threading.Event()
+
+        with patch('src.services.ingest_jobs.ingest_knowledge_base',
+                   side_effect=lambda **kwargs: release.wait(timeout=5) and IngestStats()), \
+                patch('src.services.ingest_jobs.rollback_index') as mock_rollback:
+            job = manager.submit()
+            with pytest.raises(IngestJobRunningError) as error:
+                manager.rollback()
+            assert error.value.job_id == job.job_id
+            mock_rollback.assert_not_called()
+
+            release.set()
+            _wait_for_thread(job.job_id)
+
+            def fake_rollback(index_name, version):
+                rolling_back.set()
+                with pytest.raises(IngestJobRunningError):
+                    manager.submit()
+                return "v1"
+
+            mock_rollback.side_effect = fake_rollback
+            assert manager.rollback("kb", "v1") == "v1"
+            assert rolling_back.is_set()
+            mock_rollback.assert_called_once_with("kb", "v1")
+
+            # Lock released once the rollback ends
+            _wait_for_thread(manager.submit().job_id)
+
+    def test_failed_job(self, manager):
+        """Test that an ingestion error is recorded on the job."""
+        with patch('src.services.ingest_jobs.ingest_knowledge_base',
+                   side_effect=FileNotFoundError("KB directory not found: missing")):
+            job = manager.submit("missing")
+            _wait_for_thread(job.job_id)
+
+        failed = manager.get(job.job_id)
+        assert failed.status == "failed"
+        assert "KB directory not found" in failed.error
+
+    def test_interrupted_job_reported_failed(self, manager):
+        """Test that a job left running by a dead worker is reported as failed."""
+        manager._save(IngestJob(job_id="a" * 32, status="running", created_at="2025-11-06T00:00:00"))
+
+        job = manager.get("a" * 32)
+
+        assert job.status == "failed"
+        assert "interrupted" in job.error
+
+    def test_unknown_job(self, manager):
+        """Test that unknown job ids return None."""
+        assert manager.get("missing") is None
+        assert manager.get("0" * 32) is None
+
+    def test_invalid_job_id(self, manager, tmp_path):
+        """Test that ids other than generated ones never reach the filesystem."""
+        (tmp_path / "secret.json").write_text('{"job_id": "x", "status": "running", "created_at": "2025"}')
+
+        for job_id in ["../secret", "..%2Fsecret", "secret", "A" * 32]:
+            assert manager.get(job_id) is None
+        with pytest.raises(ValueError):
+            manager._get_job_file("../secret")
+
+    def test_eta_extrapolates_unsplit_files(self):
+        """Test that the ETA accounts for chunks of files not split yet."""
+        job = IngestJob(job_id="eta", created_at="2025-11-06T00:00:00")
+        progress = IngestProgress(stage="embedding", files_total=4, files_done=2,
+                                  chunks_queued=100, chunks_embedded=50)
+
+        IngestJobManager._apply_progress(job, progress, elapsed=10.0)
+
+        assert job.chunks_per_second == 5.0
+        # 100 chunks from 2 of 4 files -> ~200 expected, 150 left at 5/s
+        assert job.eta_seconds == 30.0
@@ -0,0 +1,52 @@
+"""
+Tests for per-language tagging of knowledge base files.
+"""
+from langchain_core.documents.base import Document
+from src.rag.languages import detect_language, document_language, language_from_path, language_index_name
+
+
+class TestLanguageFromPath:
+    """Tests for language_from_path."""
+
+    def test_file_name_suffix(self):
+        """Test that a language code suffix on the file name is used."""
+        assert language_from_path("faqs_es.md") == "es"
+        assert language_from_path("shipping/faqs-en.md") == "en"
+        assert language_from_path("faqs.EN.md") == "en"
+
+    def test_language_directory(self):
+        """Test that a directory named after a language is used."""
+        assert language_from_path("es/shipping/faqs.md") == "es"
+
+    def test_unsupported_or_missing_code(self):
+        """Test that files without a supported code are not tagged."""
+        assert language_from_path("faqs.md") is None
+        assert language_from_path("faqs_zz.md") is None
+        assert language_from_path("faqs_de.md") is None
+
+
+class TestDetectLanguage:
+    """Tests for detect_language."""
+
+    def test_detects_supported_languages(self):
+        """Test that Spanish and English texts are told apart."""
+        assert detect_language("El envío de los pedidos tarda 24-48 horas y se puede seguir en la web.") == "es"
+        assert detect_language("You can return the items within 30 days and the refund is sent by email.") == "en"
+
+    def test_too_short_or_ambiguous(self):
+        """Test that texts with too few function words are left untagged."""
+        assert detect_language("ABC-123456") is None
+        assert detect_language("") is None
+
+    def test_document_language_prefers_metadata(self):
+        """Test that the tag set at ingestion wins over detection."""
+        document = Document(page_content="The order is on the way to you.", metadata={"language": "es"})
+        assert document_language(document) == "es"
+
+        untagged = Document(page_content="Texto corto", metadata={"source": "/kb/en/faqs_en.md"})
+        assert document_language(untagged) == "en"
+
+
+def test_language_index_name():
+    """Test that partitions are nested under their index."""
+    assert language_index_name("kb/acme", "es") == "kb/acme/lang/es"
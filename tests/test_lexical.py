@@ -0,0 +1,72 @@
+"""
+Tests for the BM25 lexical index.
+"""
+import pytest
+from src.rag.lexical import LexicalIndex, tokenize, write_lexical_index, lexical_index_exists
+
+
+class TestTokenize:
+    """Tests for tokenize."""
+
+    def test_folds_case_and_accents(self):
+        """Test that terms are case-folded and accents removed."""
+        assert tokenize("Envío RÁPIDO") == ["envio", "rapido"]
+
+    def test_drops_stopwords(self):
+        """Test that Spanish and English stopwords are dropped."""
+        assert tokenize("¿Dónde está el pedido?") == ["pedido"]
+        assert tokenize("where is the order") == ["order"]
+
+    def test_keeps_identifiers_whole(self):
+        """Test that order ids are kept as a single term."""
+        assert tokenize("Pedido ABC-123456 enviado") == ["pedido", "abc-123456", "enviado"]
+
+
+class TestLexicalIndex:
+    """Tests for write_lexical_index and LexicalIndex."""
+
+    TEXTS = [
+        "Los envíos nacionales tardan 24-48 horas.",
+        "Las devoluciones se aceptan durante 30 días.",
+        "El pedido ABC-123456 está en reparto.",
+        "Los envíos internacionales tardan hasta 7 días."
+    ]
+
+    def test_exact_identifier_match(self, tmp_path):
+        """Test that an order id finds its chunk with full coverage."""
+        write_lexical_index(tmp_path, self.TEXTS)
+        index = LexicalIndex(tmp_path)
+
+        hits = index.search("estado del pedido ABC-123456", k=3)
+
+        assert lexical_index_exists(tmp_path)
+        assert len(index) == 4
+        assert hits[0].position == 2
+        assert hits[0].coverage < 0.99
+        assert index.search("ABC-123456", k=3)[0].coverage == pytest.approx(1.0)
+
+    def test_ranks_by_bm25(self, tmp_path):
+        """Test that chunks matching more query terms rank first."""
+        write_lexical_index(tmp_path, self.TEXTS)
+        index = LexicalIndex(tmp_path)
+
+        hits = index.search("envíos internacionales", k=3)
+
+        assert [hit.position for hit in hits] == [3, 0]
+        assert hits[0].score > hits[1].score
+        assert hits[0].coverage == pytest.approx(1.0)
+        assert 0.0 < hits[1].coverage < 1.0
+
+    def test_no_match(self, tmp_path):
+        """Test that queries without known terms return no hits."""
+        write_lexical_index(tmp_path, self.TEXTS)
+        index = LexicalIndex(tmp_path)
+
+        assert index.search("garantía", k=3) == []
+        assert index.search("el de la", k=3) == []
+
+    def test_empty_index(self, tmp_path):
+        """Test that an empty index can be opened and searched."""
+        write_lexical_index(tmp_path, [])
+
+        assert LexicalIndex(tmp_path).search("pedido", k=3) == []
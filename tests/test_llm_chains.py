@@ -163,3 +163,41 @@ class TestChainErrorHandling:
         
         assert "trouble" in response or "apologize" in response
 
+
+
+class TestAsyncChains:
+    """Tests for the ainvoke-based chain methods."""
+
+    @pytest.fixture
+    def fake_chain_manager(self):
+        """Create chain manager with a fake LLM answering in order."""
+        from langchain_core.language_models.fake import FakeListLLM
+
+        def make(responses):
+            with patch('llm.models.get_llm', return_value=FakeListLLM(responses=responses)):
+                return ChainManager()
+        return make
+
+    @pytest.mark.asyncio
+    async def test_async_methods(self, fake_chain_manager):
+        """Test that the async methods parse and clean the LLM output like the sync ones."""
+        manager = fake_chain_manager([
+            '```json\n{"order_id": "ABC123"}\n```',
+            "  Summary: order late  ",
+            " I can help you with that "
+        ])
+
+        assert await manager.aextract_structured_info(message="Order ABC123", history="") == {"order_id": "ABC123"}
+        assert await manager.agenerate_summary("Conversation", {"order_id": "ABC123"}, "en") == "Summary: order late"
+        assert await manager.agenerate_response(message="Help", context="", language="en") == "I can help you with that"
+
+    @pytest.mark.asyncio
+    async def test_async_errors(self, fake_chain_manager):
+        """Test that async failures fall back like the sync ones."""
+        from src.llm.chains import RESPONSE_FALLBACK
+        manager = fake_chain_manager(["Not valid JSON"])
+
+        assert await manager.aextract_structured_info(message="Test", history="") == {}
+
+        manager.llm = Mock(side_effect=Exception("API Error"))
+        assert await manager.agenerate_response(message="Test", context="") == RESPONSE_FALLBACK
@@ -0,0 +1,103 @@
+"""
+Tests for the structure-aware markdown splitter.
+"""
+from unittest.mock import patch
+from langchain_core.documents.base import Document
+from src.rag.markdown_splitter import MarkdownSectionSplitter, split_markdown_sections
+
+FAQ = """# FAQ
+
+## Shipping
+
+### How long does shipping take?
+Standard shipping takes 5-7 business days.
+
+### Can I track my order?
+Yes, you will receive a tracking number via email.
+
+## Returns
+
+### What is the return policy?
+You can return items within 30 days.
+
+```bash
+# not a header
+```
+"""
+
+
+def word_count(text: str) -> int:
+    return len(text.split())
+
+
+class TestSplitMarkdownSections:
+    """Tests for split_markdown_sections."""
+
+    def test_sections_and_header_paths(self):
+        """Test that each header starts a section with the path of its parent headers."""
+        paths = [path for path, _ in split_markdown_sections(FAQ)]
+
+        assert paths == [
+            ["FAQ"],
+            ["FAQ", "Shipping"],
+            ["FAQ", "Shipping", "How long does shipping take?"],
+            ["FAQ", "Shipping", "Can I track my order?"],
+            ["FAQ", "Returns"],
+            ["FAQ", "Returns", "What is the return policy?"]
+        ]
+
+    def test_headers_in_code_blocks_ignored(self):
+        """Test that '#' lines inside fenced code stay in their section."""
+        _, last = split_markdown_sections(FAQ)[-1]
+        assert "# not a header" in last
+
+
+class TestMarkdownSectionSplitter:
+    """Tests for MarkdownSectionSplitter."""
+
+    def _split(self, text: str, max_tokens: int):
+        with patch('src.rag.markdown_splitter.count_tokens', side_effect=word_count):
+            return MarkdownSectionSplitter(max_tokens=max_tokens).split_text(text)
+
+    def test_one_section_per_chunk(self):
+        """Test that questions are never cut and header-only sections join the next one."""
+        chunks = self._split(FAQ, max_tokens=24)
+
+        assert [path for path, _ in chunks] == [
+            "FAQ > Shipping > How long does shipping take?",
+            "FAQ > Shipping > Can I track my order?",
+            "FAQ > Returns > What is the return policy?"
+        ]
+        assert chunks[0][1].startswith("# FAQ\n\n## Shipping\n\n### How long does shipping take?")
+        assert chunks[1][1].endswith("tracking number via email.")
+
+    def test_packs_sibling_sections(self):
+        """Test that small sections of the same parent share a chunk, but not across parents."""
+        chunks = self._split(FAQ, max_tokens=100)
+
+        assert [path for path, _ in chunks] == ["FAQ > Shipping", "FAQ > Returns > What is the return policy?"]
+        assert "Can I track my order?" in chunks[0][1]
+
+    def test_trailing_headers_dropped(self):
+        """Test that headers with no body at the end do not join the previous section."""
+        chunks = self._split("# Envios\n\n## Plazo\n\nTres dias laborables.\n\n## Devoluciones\n", max_tokens=100)
+
+        assert chunks == [("Envios > Plazo", "# Envios\n\n## Plazo\n\nTres dias laborables.")]
+
+    def test_splits_long_sections(self):
+        """Test that a section over the limit is split into pieces within the limit."""
+        text = "## Long\n\n" + "\n\n".join(f"Paragraph {i} " + "word " * 8 for i in range(6))
+
+        chunks = self._split(text, max_tokens=20)
+
+        assert len(chunks) > 1
+        assert all(path == "Long" and word_count(chunk) <= 20 for path, chunk in chunks)
+
+    def test_split_documents_keeps_metadata(self):
+        """Test that chunks keep the document metadata and add the header path."""
+        with patch('src.rag.markdown_splitter.count_tokens', side_effect=word_count):
+            chunks = MarkdownSectionSplitter(max_tokens=24).split_documents(
+                [Document(page_content=FAQ, metadata={"source": "faqs.md"})]
+            )
+
+        assert chunks[1].metadata == {"source": "faqs.md", "header_path": "FAQ > Shipping > Can I track my order?"}
@@ -1,14 +1,25 @@
 """
 Tests for RAG components (ingest, store, retriever).
 """
+import asyncio
 import pytest
 import tempfile
+import time
+import threading
 import os
+import hashlib
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
-from src.rag.ingest import ingest_knowledge_base, load_documents, split_documents, create_vectorstore
-from src.rag.store import VectorStoreManager, get_vector_store_manager
-from src.rag.retriever import get_retriever, query_knowledge_base
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+from langchain_core.embeddings import Embeddings
+from src.rag.ingest import ingest_knowledge_base, load_documents, split_documents, create_vectorstore, load_and_split_files
+from src.rag.store import LOAD_LOCK_STRIPES, VectorStoreManager, get_vector_store_manager
+from src.rag.retriever import (
+    get_retriever, query_knowledge_base, retrieve_context, aquery_knowledge_base, aretrieve_context
+)
+from src.rag.query_cache import QueryEmbeddingCache, normalize_query
+from src.rag.index_factory import create_empty_vectorstore
+from src.rag.lexical import LexicalIndex, write_lexical_index
+from src.llm.hashing_embeddings import HashingEmbeddings
 
 
 @pytest.fixture
@@ -47,6 +58,34 @@ def temp_vectorstore_dir():
         yield tmpdir
 
 
+class FakeEmbeddings(Embeddings):
+    """Deterministic offline embeddings that count embedded texts."""
+
+    def __init__(self, dim: int=16):
+        self.dim = dim
+        self.embedded_texts = []
+
+    def _vector(self, text: str) -> list[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [digest[i % len(digest)] / 255.0 for i in range(self.dim)]
+
+    def embed_documents(self, texts):
+        self.embedded_texts.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+@pytest.fixture
+def real_store_manager(temp_vectorstore_dir):
+    """Real vector store manager writing into a temporary directory."""
+    with patch('src.rag.store.settings') as mock_settings:
+        mock_settings.vectorstore_path = temp_vectorstore_dir
+        mock_settings.vectorstore_index_name = "test_index"
+        yield VectorStoreManager()
+
+
 class TestIngest:
     """Tests for knowledge base ingestion."""
     
@@ -57,15 +96,18 @@ class TestIngest:
         """Test successful knowledge base ingestion."""
         # Mock embeddings - debe devolver arrays reales
         mock_emb = Mock()
-        mock_emb.embed_documents.return_value = [[0.1] * 1536]  # Simula embeddings reales
+        mock_emb.embed_documents.side_effect = lambda texts: [[0.1] * 1536 for _ in texts]  # Simula embeddings reales
         mock_embeddings.return_value = mock_emb
         
         # Mock FAISS
         mock_vectorstore = Mock()
-        mock_faiss.from_documents.return_value = mock_vectorstore
+        mock_faiss.from_embeddings.return_value = mock_vectorstore
         
         # Mock vector store manager
         mock_manager = Mock()
+        mock_manager.load_manifest.return_value = None
+        mock_manager.store_path = Path(temp_vectorstore_dir)
+        mock_manager.index_name = "test_index"
         mock_get_manager.return_value = mock_manager
         
         with patch('src.config.settings.settings') as mock_settings:
@@ -96,6 +138,21 @@ class TestIngest:
                     # Acceptable to raise error for empty directory
                     assert "not found" in str(e).lower() or "no documents" in str(e).lower()
     
+    def test_create_vectorstore(self):
+        """Test building a vectorstore from chunks, with their ids and metadata."""
+        from langchain_core.documents.base import Document
+        chunks = [
+            Document(page_content="Orders ship in 24 hours.", metadata={"source": "faqs.md"}),
+            Document(page_content="Refunds take 3-5 days.", metadata={"source": "returns.md"})
+        ]
+
+        with patch('src.rag.ingest.get_embeddings', return_value=FakeEmbeddings()):
+            vectorstore = create_vectorstore(chunks, ids=["a", "b"])
+
+        assert vectorstore.index.ntotal == 2
+        assert vectorstore.docstore.search("b").page_content == "Refunds take 3-5 days."
+        assert vectorstore.docstore.search("a").metadata == {"source": "faqs.md"}
+
     @patch('src.rag.ingest.get_embeddings')
     @patch('src.rag.ingest.get_vector_store_manager')
     def test_load_documents(self, mock_get_manager, mock_embeddings, temp_kb_dir):
@@ -106,6 +163,231 @@ class TestIngest:
         assert len(documents) >= 1
         assert hasattr(documents[0], 'page_content')
     
+    def test_incremental_ingest(self, real_store_manager, temp_kb_dir):
+        """Test that re-ingestion only embeds new or changed chunks."""
+        fake_embeddings = FakeEmbeddings()
+
+        with patch('src.rag.ingest.get_embeddings', return_value=fake_embeddings), \
+                patch('src.rag.ingest.get_vector_store_manager', return_value=real_store_manager):
+            first = ingest_knowledge_base(temp_kb_dir)
+            assert first.full_rebuild is True
+            assert first.chunks_added > 0
+            assert set(first.stage_seconds) == {"load_split", "embed_index", "save", "language_partitions"}
+            assert real_store_manager.load_manifest() is not None
+
+            # Nothing changed: nothing embedded again
+            fake_embeddings.embedded_texts.clear()
+            second = ingest_knowledge_base(temp_kb_dir)
+            assert second.full_rebuild is False
+            assert second.chunks_added == 0
+            assert second.chunks_unchanged == first.chunks_added
+            assert fake_embeddings.embedded_texts == []
+
+            # New file added, original file removed
+            (Path(temp_kb_dir) / "returns.md").write_text("# Returns\n\nRefunds take 3-5 days.")
+            (Path(temp_kb_dir) / "faqs.md").unlink()
+            third = ingest_knowledge_base(temp_kb_dir)
+            assert third.chunks_added == 1
+            assert third.chunks_removed == first.chunks_added
+            assert fake_embeddings.embedded_texts == ["# Returns\n\nRefunds take 3-5 days."]
+
+            vectorstore = real_store_manager.get_vectorstore()
+            assert vectorstore.index.ntotal == 1
+
+    def test_all_files_removed(self, real_store_manager, temp_kb_dir):
+        """Test that removing every KB file saves an empty version instead of serving the old chunks."""
+        (Path(temp_kb_dir) / "envios_es.md").write_text("# Envíos\n\nLos pedidos llegan en 24-48 horas.")
+
+        with patch('src.rag.ingest.get_embeddings', return_value=FakeEmbeddings()), \
+                patch('src.rag.store.get_embeddings', return_value=FakeEmbeddings()), \
+                patch('src.rag.ingest.get_vector_store_manager', return_value=real_store_manager), \
+                patch('rag.retriever.get_vector_store_manager', return_value=real_store_manager), \
+                patch('rag.store.get_embeddings', return_value=FakeEmbeddings()):
+            first = ingest_knowledge_base(temp_kb_dir)
+            assert real_store_manager.exists("test_index/lang/es")
+
+            for path in Path(temp_kb_dir).iterdir():
+                path.unlink()
+            stats = ingest_knowledge_base(temp_kb_dir)
+
+            assert stats.chunks_removed == first.chunks_added
+            assert stats.version is not None and stats.version != first.version
+            assert real_store_manager.current_version() == stats.version
+            assert real_store_manager.get_vectorstore().index.ntotal == 0
+            assert not real_store_manager.exists("test_index/lang/es")
+            assert retrieve_context("¿Cuánto tardan los envíos?", score_threshold=0.0).chunks == []
+
+    def test_streaming_ingest_with_small_batches(self, real_store_manager, temp_kb_dir):
+        """Test that ingesting through many small in-flight batches indexes every chunk once."""
+        for i in range(5):
+            (Path(temp_kb_dir) / f"topic_{i}.md").write_text(f"# Topic {i}\n\n" + "Answer text. " * 150)
+        fake_embeddings = FakeEmbeddings()
+
+        with patch('src.rag.ingest.get_embeddings', return_value=fake_embeddings), \
+                patch('src.rag.ingest.get_vector_store_manager', return_value=real_store_manager), \
+                patch('src.rag.ingest.settings.ingest_embed_batch_size', 2), \
+                patch('src.rag.batch_embed.settings.ingest_inflight_batches', 1):
+            stats = ingest_knowledge_base(temp_kb_dir)
+
+        vectorstore = real_store_manager.get_vectorstore()
+        assert stats.chunks_added == len(fake_embeddings.embedded_texts)
+        assert vectorstore.index.ntotal == stats.chunks_added
+        assert set(vectorstore.index_to_docstore_id.values()) == real_store_manager.load_manifest().chunk_ids()
+
+    def test_index_type_change_rebuilds(self, real_store_manager, temp_kb_dir):
+        """Test that switching the index type rebuilds and persists the new type."""
+        fake_embeddings = FakeEmbeddings()
+
+        with patch('src.rag.ingest.get_embeddings', return_value=fake_embeddings), \
+                patch('src.rag.ingest.get_vector_store_manager', return_value=real_store_manager):
+            ingest_knowledge_base(temp_kb_dir)
+            assert real_store_manager.load_index_config().index_type == "flat"
+
+            with patch('src.rag.ingest.settings.vectorstore_index_type', "hnsw"):
+                stats = ingest_knowledge_base(temp_kb_dir)
+                assert stats.full_rebuild is True
+                assert real_store_manager.load_index_config().index_type == "hnsw"
+
+                # Removing a file from an HNSW index rebuilds the graph without its chunks
+                (Path(temp_kb_dir) / "returns.md").write_text("# Returns\n\nRefunds take 3-5 days.")
+                (Path(temp_kb_dir) / "faqs.md").unlink()
+                stats = ingest_knowledge_base(temp_kb_dir)
+                assert stats.full_rebuild is False
+                assert real_store_manager.get_vectorstore().index.ntotal == 1
+
+    def test_named_index_ingest(self, real_store_manager, temp_kb_dir):
+        """Test that ingesting into a named index leaves the default index untouched."""
+        with patch('src.rag.ingest.get_embeddings', return_value=FakeEmbeddings()), \
+                patch('src.rag.ingest.get_vector_store_manager', return_value=real_store_manager):
+            stats = ingest_knowledge_base(temp_kb_dir, index_name="kb/es")
+
+        assert stats.chunks_added > 0
+        assert real_store_manager.load_manifest("kb/es") is not None
+        assert real_store_manager.load_manifest() is None
+        assert not real_store_manager.exists()
+        assert real_store_manager.get_vectorstore("kb/es").index.ntotal == stats.chunks_added
+
+    def test_language_partitions(self, real_store_manager, temp_kb_dir):
+        """Test that each language gets a partition index, kept in sync with the KB."""
+        (Path(temp_kb_dir) / "envios_es.md").write_text("# Envíos\n\nLos pedidos llegan en 24-48 horas.")
+
+        with patch('src.rag.ingest.get_embeddings', return_value=FakeEmbeddings()), \
+                patch('src.rag.store.get_embeddings', return_value=FakeEmbeddings()), \
+                patch('src.rag.ingest.get_vector_store_manager', return_value=real_store_manager):
+            stats = ingest_knowledge_base(temp_kb_dir)
+            assert stats.language_partitions == ["en", "es"]
+
+            spanish = real_store_manager.get_vectorstore("test_index/lang/es")
+            english = real_store_manager.get_vectorstore("test_index/lang/en")
+            assert spanish.index.ntotal + english.index.ntotal == stats.chunks_added
+            assert all(document.metadata["language"] == "es" for document in spanish.docstore)
+
+            # Only the partition of the changed language is rebuilt; the other one is
+            # marked as matching the new global version
+            (Path(temp_kb_dir) / "envios_es.md").write_text("# Envíos\n\nLos pedidos llegan en 72 horas.")
+            assert ingest_knowledge_base(temp_kb_dir).language_partitions == ["es"]
+            current = real_store_manager.current_version()
+            assert real_store_manager.source_version("test_index/lang/es") == current
+            assert real_store_manager.source_version("test_index/lang/en") == current
+
+            # Languages no longer in the KB lose their partition
+            (Path(temp_kb_dir) / "envios_es.md").unlink()
+            assert ingest_knowledge_base(temp_kb_dir).language_partitions == []
+            assert not real_store_manager.exists("test_index/lang/es")
+            assert real_store_manager.exists("test_index/lang/en")
+
+    def test_failed_partition_update_not_served(self, real_store_manager, temp_kb_dir):
+        """Test that partitions left behind by a failed update are ignored until rebuilt."""
+        from rag import languages
+        from rag.retriever import _language_partition
+        (Path(temp_kb_dir) / "envios_es.md").write_text("# Envíos\n\nLos pedidos llegan en 24-48 horas.")
+        build_partition = languages._build_partition
+        built = []
+
+        def fail_after_first(vectorstore, positions, index_config):
+            built.append(positions)
+            if len(built) > 1:
+                raise RuntimeError("disk full")
+            return build_partition(vectorstore, positions, index_config)
+
+        with patch('src.rag.ingest.get_embeddings', return_value=FakeEmbeddings()), \
+                patch('src.rag.store.get_embeddings', return_value=FakeEmbeddings()), \
+                patch('src.rag.ingest.get_vector_store_manager', return_value=real_store_manager), \
+                patch('rag.retriever.get_vector_store_manager', return_value=real_store_manager):
+            ingest_knowledge_base(temp_kb_dir)
+            assert _language_partition(None, "en") == "test_index/lang/en"
+
+            # The global index is saved, then the update fails after the "en" partition
+            (Path(temp_kb_dir) / "faqs.md").write_text("# FAQ\n\nOrders ship in 3 days and you can track them in your account.")
+            (Path(temp_kb_dir) / "envios_es.md").write_text("# Envíos\n\nLos pedidos llegan en 72 horas.")
+            with patch('rag.languages._build_partition', side_effect=fail_after_first):
+                with pytest.raises(RuntimeError):
+                    ingest_knowledge_base(temp_kb_dir)
+
+            assert _language_partition(None, "en") == "test_index/lang/en"
+            assert _language_partition(None, "es") is None
+
+            # The next ingestion rebuilds the partition out of date
+            assert ingest_knowledge_base(temp_kb_dir).language_partitions == ["es"]
+            assert _language_partition(None, "es") == "test_index/lang/es"
+
+    def test_near_duplicates_not_embedded(self, real_store_manager, temp_kb_dir):
+        """Test that near-duplicate chunks are dropped before embedding and restored if their original goes."""
+        original = (Path(temp_kb_dir) / "faqs.md").read_text()
+        (Path(temp_kb_dir) / "faqs_copy.md").write_text(original.replace("30 days", "30 days."))
+        fake_embeddings = FakeEmbeddings()
+
+        with patch('src.rag.ingest.get_embeddings', return_value=fake_embeddings), \
+                patch('src.rag.ingest.get_vector_store_manager', return_value=real_store_manager):
+            first = ingest_knowledge_base(temp_kb_dir)
+            assert first.chunks_duplicate == first.chunks_added
+            assert real_store_manager.load_manifest().files["faqs_copy.md"].chunk_ids == []
+
+            # The copy's file is unchanged but its original is gone: it is split again and indexed
+            (Path(temp_kb_dir) / "faqs.md").unlink()
+            fake_embeddings.embedded_texts.clear()
+            second = ingest_knowledge_base(temp_kb_dir)
+            assert second.chunks_added == first.chunks_added
+            assert second.chunks_removed == first.chunks_added
+            assert real_store_manager.load_manifest().files["faqs_copy.md"].duplicate_of == {}
+
+    def test_parallel_load_and_split_matches_serial(self, temp_kb_dir):
+        """Test that the process pool yields the same chunks in the same order."""
+        for i in range(6):
+            (Path(temp_kb_dir) / f"topic_{i}.md").write_text(f"# Topic {i}\n\n" + "Answer text. " * 150)
+
+        serial = load_and_split_files(temp_kb_dir, workers=0)
+        parallel = load_and_split_files(temp_kb_dir, workers=3)
+
+        assert [r.source for r in parallel] == sorted(r.source for r in serial)
+        assert [[c.page_content for c in r.chunks] for r in parallel] == \
+            [[c.page_content for c in r.chunks] for r in serial]
+
+    def test_markdown_chunking_mode(self, temp_kb_dir):
+        """Test that markdown mode keeps each FAQ section whole and records its header path."""
+        from src.rag import ingest
+
+        with patch.object(ingest.settings, 'chunking_mode', 'markdown'), \
+                patch.object(ingest.settings, 'chunk_max_tokens', 60):
+            chunks = load_and_split_files(temp_kb_dir, workers=0)[0].chunks
+
+        assert [chunk.metadata["header_path"] for chunk in chunks] == [
+            "Frequently Asked Questions > Shipping",
+            "Frequently Asked Questions > Returns > What is the return policy?"
+        ]
+        assert "Can I track my order?" in chunks[0].page_content
+
+    def test_load_and_split_isolates_file_errors(self, temp_kb_dir):
+        """Test that an unreadable file does not stop the others."""
+        (Path(temp_kb_dir) / "broken.md").write_bytes(b"\xff\xfe\xfa invalid utf-8")
+
+        results = {r.source: r for r in load_and_split_files(temp_kb_dir, workers=2)}
+
+        assert results["broken.md"].error is not None
+        assert results["broken.md"].chunks is None
+        assert results["faqs.md"].error is None
+        assert len(results["faqs.md"].chunks) >= 1
+
     def test_ingest_nonexistent_directory(self):
         """Test ingestion with non-existent directory."""
         with pytest.raises(FileNotFoundError):
@@ -126,43 +408,94 @@ class TestVectorStore:
         # Verificar que el path existe después de la inicialización
         assert manager.store_path.exists()
     
-    @patch('src.rag.store.FAISS')
-    def test_save_vectorstore(self, mock_faiss, temp_vectorstore_dir):
-        """Test saving vector store to disk."""
-        mock_store = Mock()
-        mock_store.save_local = Mock()
-        
+    def test_save_vectorstore(self, temp_vectorstore_dir):
+        """Test saving vector store to disk without a pickled docstore."""
+        vectorstore, _ = create_empty_vectorstore(Mock(), [[0.1, 0.2, 0.3]])
+        vectorstore.add_embeddings([("Shipping takes 5-7 days", [0.1, 0.2, 0.3])], ids=["chunk-1"])
+
         with patch('src.rag.store.settings') as mock_settings:
             mock_settings.vectorstore_path = temp_vectorstore_dir
             mock_settings.vectorstore_index_name = "test_index"
             
             from src.rag.store import VectorStoreManager
             manager = VectorStoreManager()
-            manager.save_vectorstore(mock_store)
+            version = manager.save_vectorstore(vectorstore)
             
-            mock_store.save_local.assert_called_once()
+            index_path = Path(temp_vectorstore_dir) / "test_index"
+            version_path = index_path / ".versions" / version
+            assert (index_path / "CURRENT").read_text() == version
+            assert (version_path / "index.faiss").exists()
+            assert (version_path / "chunks.bin").exists()
+            assert not (version_path / "index.pkl").exists()
+
+    @patch('src.rag.store.get_embeddings')
+    def test_versions_and_rollback(self, mock_get_embeddings, temp_vectorstore_dir):
+        """Test that each save is a new version other processes pick up, and that it can be rolled back."""
+        with patch('src.rag.store.settings') as mock_settings:
+            mock_settings.vectorstore_path = temp_vectorstore_dir
+            mock_settings.vectorstore_index_name = "test_index"
+            mock_settings.vectorstore_keep_versions = 2
+            mock_settings.vectorstore_mmap = False
+
+            writer, reader = VectorStoreManager(), VectorStoreManager()
+            versions = []
+            for text in ["first", "second", "third"]:
+                vectorstore, _ = create_empty_vectorstore(Mock(), [[0.1, 0.2]])
+                vectorstore.add_embeddings([(text, [0.1, 0.2])], ids=["chunk-1"])
+                versions.append(writer.save_vectorstore(vectorstore))
+                # The other process sees the new version on its next query
+                assert reader.get_vectorstore().docstore.search("chunk-1").page_content == text
+
+            assert writer.list_versions() == versions[1:]
+            assert writer.current_version() == versions[2]
+            assert reader.stats()["loaded"][0]["version"] == versions[2]
+
+            # Unchanged pointer: served from memory
+            assert reader.get_vectorstore() is reader.get_vectorstore()
+
+            assert writer.rollback() == versions[1]
+            assert reader.get_vectorstore().docstore.search("chunk-1").page_content == "second"
+            with pytest.raises(ValueError):
+                writer.rollback()
+            with pytest.raises(ValueError):
+                writer.activate_version(versions[0])
     
-    @patch('src.rag.store.FAISS')
-    def test_load_vectorstore(self, mock_faiss, temp_vectorstore_dir):
+    def test_load_vectorstore(self, temp_vectorstore_dir):
         """Test loading vector store from disk."""
         mock_embeddings = Mock()
-        mock_faiss.load_local.return_value = Mock()
+        vectorstore, _ = create_empty_vectorstore(mock_embeddings, [[0.1, 0.2, 0.3]])
+        vectorstore.add_embeddings([("Shipping takes 5-7 days", [0.1, 0.2, 0.3])],
+                                   metadatas=[{"source": "faqs.md"}], ids=["chunk-1"])
         
         with patch('src.rag.store.settings') as mock_settings:
             mock_settings.vectorstore_path = temp_vectorstore_dir
             mock_settings.vectorstore_index_name = "test_index"
             
-            # Create dummy index file
-            index_path = Path(temp_vectorstore_dir) / "test_index"
-            index_path.mkdir(parents=True, exist_ok=True)
-            (index_path / "index.faiss").touch()
-            
             from src.rag.store import VectorStoreManager
             manager = VectorStoreManager()
+            manager.save_vectorstore(vectorstore)
             store = manager.load_vectorstore(mock_embeddings)
+            writable = manager.load_vectorstore(mock_embeddings, writable=True)
             
             assert store is not None
-            mock_faiss.load_local.assert_called_once()
+            assert store.docstore.search("chunk-1").metadata == {"source": "faqs.md"}
+            assert writable.docstore.search("chunk-1").page_content == "Shipping takes 5-7 days"
+            writable.delete(["chunk-1"])
+            assert writable.index.ntotal == 0
+
+    def test_load_legacy_pickled_vectorstore(self, temp_vectorstore_dir):
+        """Test that an index saved with a pickled docstore is not unpickled."""
+        with patch('src.rag.store.settings') as mock_settings:
+            mock_settings.vectorstore_path = temp_vectorstore_dir
+            mock_settings.vectorstore_index_name = "test_index"
+            index_path = Path(temp_vectorstore_dir) / "test_index"
+            index_path.mkdir(parents=True, exist_ok=True)
+            (index_path / "index.faiss").touch()
+            (index_path / "index.pkl").touch()
+
+            manager = VectorStoreManager()
+
+            assert manager.load_vectorstore(Mock()) is None
     
     def test_load_vectorstore_not_found(self, temp_vectorstore_dir):
         """Test loading non-existent vector store."""
@@ -210,6 +543,98 @@ class TestVectorStore:
         # Restore
         manager.store_path = original_path
     
+    @patch('src.rag.store.get_embeddings')
+    @patch('src.rag.store.chunk_store_exists', return_value=True)
+    @patch('src.rag.store.ChunkStore')
+    @patch('src.rag.store.read_index')
+    def test_get_vectorstore_loads_once(self, mock_read_index, mock_chunk_store, mock_exists,
+                                        mock_get_embeddings, temp_vectorstore_dir):
+        """Test that the resident vectorstore is loaded from disk only once."""
+        with patch('src.rag.store.settings') as mock_settings:
+            mock_settings.vectorstore_path = temp_vectorstore_dir
+            mock_settings.vectorstore_index_name = "test_index"
+            (Path(temp_vectorstore_dir) / "test_index").mkdir()
+
+            manager = VectorStoreManager()
+            first = manager.get_vectorstore()
+            second = manager.get_vectorstore()
+
+            assert first is second
+            assert manager.generation == 1
+            mock_read_index.assert_called_once()
+            mock_get_embeddings.assert_called_once()
+
+    def test_swap_vectorstore(self, temp_vectorstore_dir):
+        """Test hot-swapping the resident vectorstore."""
+        with patch('src.rag.store.settings') as mock_settings:
+            mock_settings.vectorstore_path = temp_vectorstore_dir
+            mock_settings.vectorstore_index_name = "test_index"
+
+            manager = VectorStoreManager()
+            old_store, new_store = Mock(), Mock()
+
+            manager.swap_vectorstore(old_store)
+            generation = manager.swap_vectorstore(new_store)
+
+            assert generation == 2
+            assert manager.get_vectorstore() is new_store
+
+    @patch('src.rag.store.get_embeddings')
+    def test_named_indexes_lru(self, mock_get_embeddings, temp_vectorstore_dir):
+        """Test that only the most recently used named indexes stay loaded."""
+        with patch('src.rag.store.settings') as mock_settings:
+            mock_settings.vectorstore_path = temp_vectorstore_dir
+            mock_settings.vectorstore_index_name = "test_index"
+            mock_settings.vectorstore_max_loaded_indexes = 2
+            mock_settings.vectorstore_max_loaded_mb = 0
+            mock_settings.vectorstore_mmap = False
+
+            manager = VectorStoreManager()
+            for number, name in enumerate(["kb/es", "kb/en", "tenants/acme"]):
+                vectorstore, _ = create_empty_vectorstore(Mock(), [[1.0, float(number)]])
+                vectorstore.add_embeddings([(f"{name} chunk", [1.0, float(number)])], ids=[name])
+                manager.save_vectorstore(vectorstore, name)
+
+            manager.get_vectorstore("kb/es")
+            manager.get_vectorstore("kb/en")
+            manager.get_vectorstore("kb/es")
+            acme = manager.get_vectorstore("tenants/acme")
+
+            stats = manager.stats()
+            assert [entry["index_name"] for entry in stats["loaded"]] == ["kb/es", "tenants/acme"]
+            assert stats["loaded_bytes"] > 0
+            assert acme.docstore.search("tenants/acme").page_content == "tenants/acme chunk"
+
+            # Reloading an evicted index starts a new generation but serves the same version
+            served = manager.served_version("kb/en")
+            assert served == manager.current_version("kb/en")
+            assert manager.generation_of("kb/en") == 1
+            manager.get_vectorstore("kb/en")
+            assert manager.generation_of("kb/en") == 2
+            assert manager.served_version("kb/en") == served
+
+            # Memory budget: room for a single index
+            manager.max_loaded_bytes = stats["loaded"][0]["bytes"] + 1
+            manager.get_vectorstore("kb/es")
+            assert [entry["index_name"] for entry in manager.stats()["loaded"]] == ["kb/es"]
+
+            # Names of indexes that do not exist leave nothing behind
+            for number in range(200):
+                assert manager.get_vectorstore(f"unknown/{number}") is None
+            assert len(manager._load_locks) == LOAD_LOCK_STRIPES
+            assert "unknown/0" not in manager._resident
+
+    def test_invalid_index_name(self, temp_vectorstore_dir):
+        """Test that index names cannot escape the store directory."""
+        with patch('src.rag.store.settings') as mock_settings:
+            mock_settings.vectorstore_path = temp_vectorstore_dir
+            mock_settings.vectorstore_index_name = "test_index"
+            manager = VectorStoreManager()
+
+            for name in ["../outside", "/etc", "kb/../../x", ""]:
+                with pytest.raises(ValueError):
+                    manager.get_vectorstore(name)
+
     def test_get_vector_store_manager_singleton(self):
         """Test singleton pattern of get_vector_store_manager."""
         with patch('src.config.settings.settings'):
@@ -223,16 +648,13 @@ class TestRetriever:
     """Tests for retriever operations."""
     
     @patch('src.rag.retriever.get_vector_store_manager')
-    @patch('src.rag.retriever.get_embeddings')
-    def test_get_retriever(self, mock_embeddings, mock_get_manager):
+    def test_get_retriever(self, mock_get_manager):
         """Test getting retriever instance."""
-        mock_embeddings.return_value = Mock()
-        
         mock_store = Mock()
         mock_store.as_retriever.return_value = Mock()
         
         mock_manager = Mock()
-        mock_manager.load_vectorstore.return_value = mock_store
+        mock_manager.get_vectorstore.return_value = mock_store
         mock_get_manager.return_value = mock_manager
         
         with patch('src.config.settings.settings') as mock_settings:
@@ -242,13 +664,27 @@ class TestRetriever:
             
             assert retriever is not None
             mock_store.as_retriever.assert_called_once()
+
+    @patch('src.rag.retriever.get_llm')
+    @patch('src.rag.retriever.get_vector_store_manager')
+    def test_get_retriever_extractive_compression(self, mock_get_manager, mock_get_llm):
+        """Test that extractive compression is the default and needs no LLM."""
+        from src.rag import retriever as retriever_module
+        vectorstore, _ = create_empty_vectorstore(HashingEmbeddings(dim=64), [[0.0] * 64])
+        mock_get_manager.return_value.get_vectorstore.return_value = vectorstore
+
+        with patch.object(retriever_module.settings, "rag_compression_mode", "extractive"):
+            retriever = get_retriever(use_compression=True)
+
+        assert isinstance(retriever.base_compressor, retriever_module.ExtractiveCompressor)
+        mock_get_llm.assert_not_called()
+
+        with pytest.raises(ValueError):
+            get_retriever(use_compression=True, compression_mode="abstractive")
     
     @patch('src.rag.retriever.get_vector_store_manager')
-    @patch('src.rag.retriever.get_embeddings')
-    def test_query_knowledge_base(self, mock_embeddings, mock_get_manager):
+    def test_query_knowledge_base(self, mock_get_manager):
         """Test querying knowledge base."""
-        mock_embeddings.return_value = Mock()
-        
         # Mock vectorstore with relevant documents
         mock_doc1 = Mock()
         mock_doc1.page_content = "Shipping takes 5-7 days"
@@ -256,10 +692,10 @@ class TestRetriever:
         mock_doc2.page_content = "You can track your order"
         
         mock_vectorstore = Mock()
-        mock_vectorstore.similarity_search.return_value = [mock_doc1, mock_doc2]
+        mock_vectorstore.similarity_search_by_vector.return_value = [mock_doc1, mock_doc2]
         
         mock_manager = Mock()
-        mock_manager.load_vectorstore.return_value = mock_vectorstore
+        mock_manager.get_vectorstore.return_value = mock_vectorstore
         mock_get_manager.return_value = mock_manager
         
         results = query_knowledge_base("How long is shipping?", k=2)
@@ -269,16 +705,13 @@ class TestRetriever:
         assert "You can track your order" in results
     
     @patch('src.rag.retriever.get_vector_store_manager')
-    @patch('src.rag.retriever.get_embeddings')
-    def test_query_no_results(self, mock_embeddings, mock_get_manager):
+    def test_query_no_results(self, mock_get_manager):
         """Test query with no relevant results."""
-        mock_embeddings.return_value = Mock()
-        
         mock_vectorstore = Mock()
-        mock_vectorstore.similarity_search.return_value = []
+        mock_vectorstore.similarity_search_by_vector.return_value = []
         
         mock_manager = Mock()
-        mock_manager.load_vectorstore.return_value = mock_vectorstore
+        mock_manager.get_vectorstore.return_value = mock_vectorstore
         mock_get_manager.return_value = mock_manager
         
         results = query_knowledge_base("Irrelevant query", k=5)
@@ -286,18 +719,15 @@ class TestRetriever:
         assert results == []
     
     @patch('src.rag.retriever.get_vector_store_manager')
-    @patch('src.rag.retriever.get_embeddings')
-    def test_query_with_limit(self, mock_embeddings, mock_get_manager):
+    def test_query_with_limit(self, mock_get_manager):
         """Test query with result limit."""
-        mock_embeddings.return_value = Mock()
-        
         docs = [Mock(page_content=f"Doc {i}") for i in range(10)]
         
         mock_vectorstore = Mock()
-        mock_vectorstore.similarity_search.return_value = docs[:3]  # Return only 3
+        mock_vectorstore.similarity_search_by_vector.return_value = docs[:3]  # Return only 3
         
         mock_manager = Mock()
-        mock_manager.load_vectorstore.return_value = mock_vectorstore
+        mock_manager.get_vectorstore.return_value = mock_vectorstore
         mock_get_manager.return_value = mock_manager
         
         results = query_knowledge_base("Test query", k=3)
@@ -306,13 +736,10 @@ class TestRetriever:
         assert len(results) <= 3
     
     @patch('src.rag.retriever.get_vector_store_manager')
-    @patch('src.rag.retriever.get_embeddings')
-    def test_query_no_vectorstore(self, mock_embeddings, mock_get_manager):
+    def test_query_no_vectorstore(self, mock_get_manager):
         """Test query when vectorstore doesn't exist."""
-        mock_embeddings.return_value = Mock()
-        
         mock_manager = Mock()
-        mock_manager.load_vectorstore.return_value = None  # No vectorstore
+        mock_manager.get_vectorstore.return_value = None  # No vectorstore
         mock_get_manager.return_value = mock_manager
         
         # Should return empty list
@@ -320,6 +747,298 @@ class TestRetriever:
         assert results == []
 
 
+class TestRetrieveContext:
+    """Tests for relevance-gated, token-budgeted context selection."""
+
+    @pytest.fixture
+    def unit_vectorstore(self):
+        """Vectorstore with unit-length vectors at known angles from the query [1, 0]."""
+        vectors = {
+            "exact match": [1.0, 0.0],
+            "close match": [0.8, 0.6],
+            "unrelated": [0.0, 1.0]
+        }
+        vectorstore, _ = create_empty_vectorstore(Mock(), list(vectors.values()))
+        vectorstore.add_embeddings(list(vectors.items()), ids=list(vectors))
+        vectorstore.embedding_function = Mock()
+        vectorstore.embedding_function.embed_query.return_value = [1.0, 0.0]
+        return vectorstore
+
+    def _retrieve(self, vectorstore, lexical_index=None, question="where is my order", **kwargs):
+        with patch('src.rag.retriever.get_vector_store_manager') as mock_get_manager, \
+                patch('src.rag.retriever.count_tokens', side_effect=lambda text: len(text.split())):
+            mock_get_manager.return_value.get_search_indexes.return_value = (vectorstore, lexical_index)
+            return retrieve_context(question, k=3, **kwargs)
+
+    def _lexical_index(self, vectorstore, directory):
+        texts = [vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content
+                 for i in range(vectorstore.index.ntotal)]
+        write_lexical_index(directory, texts)
+        return LexicalIndex(directory)
+
+    def test_drops_hits_below_threshold(self, unit_vectorstore):
+        """Test that only hits above the cosine threshold are injected."""
+        context = self._retrieve(unit_vectorstore, score_threshold=0.5, max_tokens=100)
+
+        assert context.chunks == ["exact match", "close match"]
+        assert context.scores == pytest.approx([1.0, 0.8])
+        assert context.candidates == 3
+        assert context.below_threshold == 1
+        assert context.tokens == 4
+
+    def test_stops_at_token_budget(self, unit_vectorstore):
+        """Test that chunks are added best first until the token budget is reached."""
+        context = self._retrieve(unit_vectorstore, score_threshold=0.5, max_tokens=3)
+
+        assert context.chunks == ["exact match"]
+        assert context.tokens == 2
+        assert context.over_budget == 1
+
+    def test_irrelevant_question_adds_nothing(self, unit_vectorstore):
+        """Test that a question the KB cannot answer injects no context."""
+        context = self._retrieve(unit_vectorstore, score_threshold=1.01, max_tokens=100)
+
+        assert context.chunks == []
+        assert context.text == ""
+        assert context.tokens == 0
+
+    def test_language_partition_searched_first(self, unit_vectorstore):
+        """Test that the partition of the question's language is searched instead of the whole index."""
+        with patch('src.rag.retriever.get_vector_store_manager') as mock_get_manager:
+            manager = mock_get_manager.return_value
+            manager.index_name = "kb"
+            manager.exists.return_value = True
+            manager.current_version.return_value = "v2"
+            manager.source_version.return_value = "v2"
+            manager.get_search_indexes.return_value = (unit_vectorstore, None)
+
+            context = retrieve_context("where is my order", k=3, score_threshold=0.5, language="es")
+
+        manager.get_search_indexes.assert_called_once_with("kb/lang/es")
+        assert context.language == "es"
+        assert context.chunks == ["exact match", "close match"]
+
+    def test_out_of_date_language_partition_skipped(self, unit_vectorstore):
+        """Test that a partition built from another version of the index is not searched."""
+        with patch('src.rag.retriever.get_vector_store_manager') as mock_get_manager:
+            manager = mock_get_manager.return_value
+            manager.index_name = "kb"
+            manager.exists.return_value = True
+            manager.current_version.return_value = "v2"
+            manager.source_version.return_value = "v1"
+            manager.get_search_indexes.return_value = (unit_vectorstore, None)
+
+            context = retrieve_context("where is my order", k=3, score_threshold=0.5, language="es")
+
+        manager.get_search_indexes.assert_called_once_with(None)
+        assert context.language is None
+
+    def test_language_partition_falls_back_to_index(self, unit_vectorstore):
+        """Test that the whole index is searched when the partition is missing or has nothing relevant."""
+        with patch('src.rag.retriever.get_vector_store_manager') as mock_get_manager:
+            manager = mock_get_manager.return_value
+            manager.index_name = "kb"
+            manager.exists.side_effect = lambda name: name == "kb/lang/es"
+            manager.current_version.return_value = "v2"
+            manager.source_version.return_value = "v2"
+            manager.get_search_indexes.side_effect = lambda name: (None, None) if name == "kb/lang/es" \
+                else (unit_vectorstore, None)
+
+            context = retrieve_context("where is my order", k=3, score_threshold=0.5, language="es")
+            assert [call.args[0] for call in manager.get_search_indexes.call_args_list] == ["kb/lang/es", None]
+            assert context.language is None
+            assert context.chunks == ["exact match", "close match"]
+
+            manager.get_search_indexes.reset_mock()
+            retrieve_context("where is my order", k=3, score_threshold=0.5, language="en")
+            assert [call.args[0] for call in manager.get_search_indexes.call_args_list] == [None]
+
+    def test_lexical_fast_path_skips_embedding(self, unit_vectorstore, tmp_path):
+        """Test that a confident BM25 hit answers without embedding the question."""
+        lexical_index = self._lexical_index(unit_vectorstore, tmp_path)
+
+        context = self._retrieve(unit_vectorstore, lexical_index, question="exact match?",
+                                 score_threshold=0.5, max_tokens=100)
+
+        assert context.retrieval == "lexical"
+        assert context.chunks[0] == "exact match"
+        unit_vectorstore.embedding_function.embed_query.assert_not_called()
+
+    def test_greeting_left_to_score_threshold(self, tmp_path):
+        """Test that a one-word greeting matching a chunk is not injected unless its vector scores."""
+        vectors = {"hola, bienvenido al soporte": [0.0, 1.0], "exact match": [1.0, 0.0]}
+        vectorstore, _ = create_empty_vectorstore(Mock(), list(vectors.values()))
+        vectorstore.add_embeddings(list(vectors.items()), ids=list(vectors))
+        vectorstore.embedding_function = Mock()
+        vectorstore.embedding_function.embed_query.return_value = [1.0, 0.0]
+        lexical_index = self._lexical_index(vectorstore, tmp_path)
+
+        context = self._retrieve(vectorstore, lexical_index, question="¡Hola!", score_threshold=0.5, max_tokens=100)
+
+        assert context.retrieval == "hybrid"
+        assert context.chunks == ["exact match"]
+        assert context.below_threshold == 1
+
+    def test_identifier_can_use_lexical_fast_path(self, tmp_path):
+        """Test that a single identifier, such as an order id, still answers from BM25 alone."""
+        vectors = {"El pedido ABC123 salió ayer": [0.0, 1.0], "exact match": [1.0, 0.0]}
+        vectorstore, _ = create_empty_vectorstore(Mock(), list(vectors.values()))
+        vectorstore.add_embeddings(list(vectors.items()), ids=list(vectors))
+        vectorstore.embedding_function = Mock()
+        lexical_index = self._lexical_index(vectorstore, tmp_path)
+
+        context = self._retrieve(vectorstore, lexical_index, question="ABC123", score_threshold=0.5, max_tokens=100)
+
+        assert context.retrieval == "lexical"
+        assert context.chunks == ["El pedido ABC123 salió ayer"]
+
+    def test_ambiguous_lexical_hits_are_fused(self, unit_vectorstore, tmp_path):
+        """Test that BM25 hits without a clear winner are fused with the vector ranking."""
+        lexical_index = self._lexical_index(unit_vectorstore, tmp_path)
+
+        context = self._retrieve(unit_vectorstore, lexical_index, question="match",
+                                 score_threshold=0.5, max_tokens=100)
+
+        assert context.retrieval == "hybrid"
+        assert context.chunks == ["exact match", "close match"]
+        assert context.below_threshold == 1
+        unit_vectorstore.embedding_function.embed_query.assert_called_once()
+
+    def test_vector_mode_ignores_lexical_index(self, unit_vectorstore, tmp_path):
+        """Test that vector mode never consults the BM25 index."""
+        lexical_index = self._lexical_index(unit_vectorstore, tmp_path)
+
+        with patch('src.rag.retriever.settings.rag_retrieval_mode', "vector"):
+            context = self._retrieve(unit_vectorstore, lexical_index, question="unrelated?",
+                                     score_threshold=0.5, max_tokens=100)
+
+        assert context.retrieval == "vector"
+        assert context.chunks == ["exact match", "close match"]
+
+
+class TestQueryEmbeddingCache:
+    """Tests for the query embedding cache."""
+
+    def test_normalize_query(self):
+        """Test that trivial variations share the same key."""
+        assert normalize_query("  Hola!! ") == normalize_query("hola")
+        assert normalize_query("Mi pedido   no ha\nllegado") == "mi pedido no ha llegado"
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = QueryEmbeddingCache(max_size=2, ttl_seconds=0)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert cache.get("c") == [3.0]
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are treated as misses."""
+        cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60)
+        cache.put("hola", [1.0])
+
+        with patch('src.rag.query_cache.time.monotonic', return_value=10**9):
+            assert cache.get("hola") is None
+
+        assert cache.stats()["misses"] == 1
+
+    @patch('src.rag.retriever.get_vector_store_manager')
+    def test_query_knowledge_base_reuses_embedding(self, mock_get_manager):
+        """Test that repeated questions are embedded only once."""
+        mock_vectorstore = Mock()
+        mock_vectorstore.embedding_function.embed_query.return_value = [0.1, 0.2]
+        mock_vectorstore.similarity_search_by_vector.return_value = [Mock(page_content="Doc")]
+        mock_get_manager.return_value.get_vectorstore.return_value = mock_vectorstore
+
+        query_knowledge_base("Hola")
+        query_knowledge_base("hola ")
+
+        mock_vectorstore.embedding_function.embed_query.assert_called_once_with("hola")
+
+
+class TestAsyncRetrieval:
+    """Tests for the non-blocking retrieval API."""
+
+    @pytest.fixture
+    def slow_vectorstore(self):
+        """Vectorstore whose async embedding call takes 0.2s, like a remote provider."""
+        vectors = {"exact match": [1.0, 0.0], "unrelated": [0.0, 1.0]}
+        vectorstore, _ = create_empty_vectorstore(Mock(), list(vectors.values()))
+        vectorstore.add_embeddings(list(vectors.items()), ids=list(vectors))
+
+        async def aembed_query(text):
+            await asyncio.sleep(0.2)
+            return [1.0, 0.0]
+
+        vectorstore.embedding_function = Mock()
+        vectorstore.embedding_function.aembed_query = AsyncMock(side_effect=aembed_query)
+        return vectorstore
+
+    @pytest.mark.asyncio
+    @patch('src.rag.retriever.get_vector_store_manager')
+    async def test_aretrieve_context(self, mock_get_manager, slow_vectorstore):
+        """Test that async retrieval selects the same context as the sync path."""
+        mock_get_manager.return_value.get_search_indexes.return_value = (slow_vectorstore, None)
+
+        context = await aretrieve_context("async order status", k=2, score_threshold=0.5, max_tokens=100)
+
+        assert context.chunks == ["exact match"]
+        assert context.below_threshold == 1
+        slow_vectorstore.embedding_function.embed_query.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('src.rag.retriever.get_vector_store_manager')
+    async def test_concurrent_queries_do_not_block(self, mock_get_manager, slow_vectorstore):
+        """Test that slow embedding calls overlap instead of running one after another."""
+        mock_get_manager.return_value.get_search_indexes.return_value = (slow_vectorstore, None)
+
+        start = time.perf_counter()
+        contexts = await asyncio.gather(*(
+            aretrieve_context(f"concurrent question {i}", k=2, score_threshold=0.5) for i in range(10)
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert all(context.chunks == ["exact match"] for context in contexts)
+        assert elapsed < 1.0
+
+    @pytest.mark.asyncio
+    @patch('src.rag.retriever.get_vector_store_manager')
+    async def test_aquery_knowledge_base(self, mock_get_manager, slow_vectorstore):
+        """Test the async top-k query."""
+        mock_get_manager.return_value.get_vectorstore.return_value = slow_vectorstore
+
+        assert await aquery_knowledge_base("async top k", k=1) == ["exact match"]
+
+    @pytest.mark.asyncio
+    @patch('src.rag.retriever.get_vector_store_manager')
+    async def test_language_partition_off_event_loop(self, mock_get_manager, slow_vectorstore):
+        """Test that the language partition lookup, which reads index files, runs off the event loop."""
+        mock_get_manager.return_value.get_search_indexes.return_value = (slow_vectorstore, None)
+        threads = []
+
+        def language_partition(index_name, language):
+            threads.append(threading.get_ident())
+            return None
+
+        with patch('src.rag.retriever._language_partition', side_effect=language_partition):
+            context = await aretrieve_context("partition lookup", k=2, score_threshold=0.5, language="en")
+
+        assert context.chunks == ["exact match"]
+        assert threads and threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    @patch('src.rag.retriever.get_vector_store_manager')
+    async def test_aretrieve_context_without_vectorstore(self, mock_get_manager):
+        """Test that async retrieval returns empty context without an index."""
+        mock_get_manager.return_value.get_search_indexes.return_value = (None, None)
+
+        assert (await aretrieve_context("anything")).chunks == []
+
+
 class TestRAGIntegration:
     """Integration tests for RAG system."""
     
@@ -330,16 +1049,19 @@ class TestRAGIntegration:
         """Test complete RAG pipeline: ingest -> store -> retrieve."""
         # Mock embeddings - debe devolver arrays reales
         mock_embeddings = Mock()
-        mock_embeddings.embed_documents.return_value = [[0.1] * 1536]
+        mock_embeddings.embed_documents.side_effect = lambda texts: [[0.1] * 1536 for _ in texts]
         mock_emb.return_value = mock_embeddings
         
         # Mock FAISS
         mock_vectorstore = Mock()
-        mock_faiss.from_documents.return_value = mock_vectorstore
+        mock_faiss.from_embeddings.return_value = mock_vectorstore
         
         # Mock vector store manager
         mock_manager = Mock()
-        mock_manager.load_vectorstore.return_value = mock_vectorstore
+        mock_manager.load_manifest.return_value = None
+        mock_manager.store_path = Path(temp_vectorstore_dir)
+        mock_manager.index_name = "test_index"
+        mock_manager.get_vectorstore.return_value = mock_vectorstore
         mock_get_manager.return_value = mock_manager
         
         with patch('src.config.settings.settings') as mock_settings:
@@ -356,21 +1078,18 @@ class TestRAGIntegration:
             assert mock_manager.save_vectorstore.called
     
     @patch('src.rag.retriever.get_vector_store_manager')
-    @patch('src.rag.retriever.get_embeddings')
-    def test_similarity_search_relevance(self, mock_emb, mock_get_manager):
+    def test_similarity_search_relevance(self, mock_get_manager):
         """Test that similarity search returns relevant results."""
-        mock_emb.return_value = Mock()
-        
         # Simulate relevant document
         relevant_doc = Mock()
         relevant_doc.page_content = "Shipping takes 5-7 business days"
         relevant_doc.metadata = {"score": 0.95}
         
         mock_vectorstore = Mock()
-        mock_vectorstore.similarity_search.return_value = [relevant_doc]
+        mock_vectorstore.similarity_search_by_vector.return_value = [relevant_doc]
         
         mock_manager = Mock()
-        mock_manager.load_vectorstore.return_value = mock_vectorstore
+        mock_manager.get_vectorstore.return_value = mock_vectorstore
         mock_get_manager.return_value = mock_manager
         
         results = query_knowledge_base("How long does shipping take?")
@@ -408,17 +1127,14 @@ class TestRAGErrorHandling:
                     pass
     
     @patch('src.rag.retriever.get_vector_store_manager')
-    @patch('src.rag.retriever.get_embeddings')
-    def test_query_with_api_error(self, mock_embeddings, mock_get_manager):
+    def test_query_with_api_error(self, mock_get_manager):
         """Test query when vectorstore similarity search fails."""
-        mock_embeddings.return_value = Mock()
-        
         # Mock vectorstore that raises error
         mock_vectorstore = Mock()
-        mock_vectorstore.similarity_search.side_effect = Exception("API Error")
+        mock_vectorstore.similarity_search_by_vector.side_effect = Exception("API Error")
         
         mock_manager = Mock()
-        mock_manager.load_vectorstore.return_value = mock_vectorstore
+        mock_manager.get_vectorstore.return_value = mock_vectorstore
         mock_get_manager.return_value = mock_manager
         
         # Should return empty list on error
@@ -4,7 +4,7 @@ Unit tests for summarization.py service.
 import pytest
 import sys
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 
 # Add src to path
 src_path = Path(__file__).parent.parent / "src"
@@ -209,6 +209,21 @@ User: Alta, lo necesito urgente"""
         assert extracted_dict['category'] == "technical"
 
 
+    @pytest.mark.asyncio
+    async def test_agenerate_summary(self, summarization_service, mock_chain_manager):
+        """Test that async summaries await the chain manager."""
+        mock_chain_manager.agenerate_summary = AsyncMock(return_value="Resumen")
+        data = ExtractedData(order_id="ABC123456")
+
+        summary = await summarization_service.agenerate_summary("User: Hola", data, language="es")
+
+        assert summary == "Resumen"
+        mock_chain_manager.agenerate_summary.assert_awaited_once_with(
+            conversation="User: Hola", extracted_data=data.model_dump(), language="es"
+        )
+        mock_chain_manager.generate_summary.assert_not_called()
+
+
 class TestSummarizationServiceSingleton:
     """Tests for summarization service singleton pattern."""
     
@@ -0,0 +1,24 @@
+"""
+Tests for token counting.
+"""
+from unittest.mock import patch
+from src.utils.tokens import count_tokens
+
+
+class TestCountTokens:
+    """Tests for count_tokens."""
+
+    def test_empty_text(self):
+        """Test that empty text has no tokens."""
+        assert count_tokens("") == 0
+
+    def test_fallback_without_tokenizer(self):
+        """Test the character estimate used when no tokenizer can be loaded."""
+        with patch('src.utils.tokens._get_encoding', return_value=None):
+            assert count_tokens("a" * 40) == 11
+
+    def test_uses_tokenizer(self):
+        """Test that the tokenizer count is returned when available."""
+        with patch('src.utils.tokens._get_encoding') as mock_encoding:
+            mock_encoding.return_value.encode.return_value = [1, 2, 3]
+            assert count_tokens("hola mundo") == 3
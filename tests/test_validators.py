@@ -14,6 +14,7 @@ from utils.validators import (
     validate_category,
     validate_urgency,
     validate_description,
+    validate_index_name,
     normalize_category,
     normalize_urgency
 )
@@ -210,3 +211,37 @@ class TestDescriptionValidation:
         is_valid, error = validate_description("Short", min_length=20)
         assert is_valid is False
         assert "at least 20 characters" in error
+
+
+class TestIndexNameValidation:
+    """Tests for vector index name validation."""
+
+    def test_valid_index_names(self):
+        """Test valid index names, nested paths included."""
+        for name in ["faiss_index", "kb/es", "tenants/acme-2", "brand.v2/en"]:
+            is_valid, error = validate_index_name(name)
+            assert is_valid is True
+            assert error is None
+
+    def test_invalid_index_names(self):
+        """Test names that could escape the vector store directory."""
+        for name in ["../kb", "/etc/passwd", "kb/../../x", "kb//es", "kb/", "kb\\es"]:
+            is_valid, error = validate_index_name(name)
+            assert is_valid is False
+            assert error is not None
+
+    def test_partition_segment_reserved(self):
+        """Test that names cannot reach into another index's language partitions."""
+        for name in ["foo/lang/es", "lang", "kb/lang"]:
+            is_valid, error = validate_index_name(name)
+            assert is_valid is False
+            assert "lang" in error
+
+        assert validate_index_name("foo/lang/es", allow_partitions=True) == (True, None)
+        assert validate_index_name("language/es") == (True, None)
+
+    def test_invalid_index_name_empty(self):
+        """Test invalid index name - empty."""
+        is_valid, error = validate_index_name("")
+        assert is_valid is False
+        assert "cannot be empty" in error
@@ -0,0 +1,101 @@
+"""
+Tests for the worker warm-up.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.server.server import create_app
+from src.services.warmup import WarmupService
+
+
+@pytest.fixture
+def warmup_patches():
+    """Patch every warm-up stage dependency."""
+    with patch('src.services.warmup.settings') as mock_settings, \
+            patch('src.services.warmup.get_chain_manager') as mock_chain_manager, \
+            patch('src.services.warmup.get_embeddings'), \
+            patch('src.services.warmup.get_conversation_service') as mock_service, \
+            patch('src.services.warmup.get_vector_store_manager') as mock_store, \
+            patch('src.services.warmup.analyze_sentiment', return_value=("neutral", 0.0)) as mock_sentiment, \
+            patch('src.services.warmup.get_language_data', new_callable=AsyncMock) as mock_language, \
+            patch('src.services.warmup.aretrieve_context', new_callable=AsyncMock) as mock_retrieve:
+        mock_settings.warmup_enabled = True
+        mock_settings.warmup_dry_request = True
+        mock_settings.warmup_message = "¿Cuánto tarda el envío?"
+        mock_settings.warmup_index_names_list = ["kb/en"]
+        mock_settings.supported_languages_list = ["es", "en"]
+        mock_store.return_value.get_search_indexes.return_value = (MagicMock(), None)
+        mock_language.return_value = {"idioma_detectado": "es", "texto_traducido": "How long does shipping take?"}
+        mock_retrieve.return_value.text = ""
+        mock_service.return_value.extraction_service.aextract_from_message = AsyncMock()
+        mock_service.return_value.chain_manager.agenerate_response = AsyncMock(return_value="Reply")
+        yield {
+            "settings": mock_settings,
+            "chain_manager": mock_chain_manager,
+            "service": mock_service,
+            "store": mock_store,
+            "sentiment": mock_sentiment,
+            "retrieve": mock_retrieve
+        }
+
+
+class TestWarmupService:
+    """Tests for WarmupService."""
+
+    @pytest.mark.asyncio
+    async def test_runs_every_stage(self, warmup_patches):
+        """Test that all stages run and are timed, and the dry request goes through the pipeline."""
+        service = WarmupService()
+        assert not service.ready
+
+        state = await service.run()
+
+        assert service.ready
+        assert list(state.stage_seconds) == ["models", "services", "prompts", "indexes", "sentiment", "dry_request"]
+        assert state.failed_stages == []
+        warmup_patches["store"].return_value.get_search_indexes.assert_any_call("kb/en")
+        warmup_patches["retrieve"].assert_awaited_once()
+        conversation = warmup_patches["service"].return_value
+        conversation.extraction_service.aextract_from_message.assert_awaited_once()
+        conversation.chain_manager.agenerate_response.assert_awaited_once()
+        conversation.storage_service.add_turn.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_stage_does_not_block_readiness(self, warmup_patches):
+        """Test that a failing stage is reported and the worker still becomes ready."""
+        warmup_patches["settings"].warmup_dry_request = False
+        warmup_patches["chain_manager"].side_effect = ValueError("missing API key")
+
+        state = await WarmupService().run()
+
+        assert state.status == "ready"
+        assert state.failed_stages == ["models"]
+        assert "dry_request" not in state.stage_seconds
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, warmup_patches):
+        """Test that a disabled warm-up is ready at once."""
+        warmup_patches["settings"].warmup_enabled = False
+
+        state = await WarmupService().run()
+
+        assert state.status == "ready"
+        assert state.stage_seconds == {}
+        warmup_patches["chain_manager"].assert_not_called()
+
+
+def test_readiness_endpoint():
+    """Test that the readiness check is 503 until the warm-up completes."""
+    service = WarmupService()
+    with patch('routes.health.ep_health.get_warmup_service', return_value=service):
+        client = TestClient(create_app())
+
+        response = client.get("/api/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "pending"
+        assert client.get("/api/health").json()["ready"] is False
+
+        service.state.status = "ready"
+        response = client.get("/api/health/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"